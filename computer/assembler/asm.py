@@ -3,15 +3,35 @@ Neiler-8 Assembler
 Converts assembly language to machine code
 
 Usage: python asm.py input.asm -o output.bin
+
+The module is fully annotated and can be compiled to a C extension
+with mypyc for faster assembly of large sources:
+
+    pip install mypy && mypyc asm.py
 """
 
 import sys
 import re
+from typing import Dict, List, Optional, Pattern, Tuple
+
+# Forward label reference: (operand address, label, operand width)
+Fixup = Tuple[int, str, int]
+
+# Operands that may name a label (register names are never labels)
+LABEL_RE = re.compile(r'^(?![ABCDXY]$)[A-Z_][A-Z0-9_]*$')
+
+# Operand bytes following each opcode (same layout as the CPU's table)
+_widths = bytearray(256)
+for _op in (0x01, 0x02, 0x03, 0x04, 0x05, 0x06, 0x41, 0x43, 0x61, 0x90, 0x91):
+    _widths[_op] = 1  # 8-bit immediate / port
+for _op in (0x20, 0x21, 0x22, 0x23, 0x70, 0x71, 0x72, 0x73, 0x74, 0x75, 0x80):
+    _widths[_op] = 2  # 16-bit address
+_OPERAND_BYTES = bytes(_widths)
 
 class Neiler8Assembler:
-    def __init__(self):
+    def __init__(self) -> None:
         # Opcode mapping (mnemonic -> opcode)
-        self.opcodes = {
+        self.opcodes: Dict[str, int] = {
             'NOP': 0x00,
             'MOV A,': 0x01,
             'MOV B,': 0x02,
@@ -64,24 +84,32 @@ class Neiler8Assembler:
             'HLT': 0xFF,
         }
 
-        self.labels = {}
+        # One anchored alternation over every mnemonic, longest first so
+        # that 'MOV A, B' wins over 'MOV A,'
+        mnemonics = sorted(self.opcodes, key=len, reverse=True)
+        self._mnemonic_re: Pattern[str] = re.compile('|'.join(map(re.escape, mnemonics)))
+
+        self.labels: Dict[str, int] = {}
         self.current_address = 0x0200
 
-    def parse_value(self, value_str):
+    def parse_value(self, value_str: str,
+                    labels: Optional[Dict[str, int]] = None) -> int:
         """Parse numeric value (hex, decimal, or label)"""
+        if labels is None:
+            labels = self.labels
         value_str = value_str.strip()
 
-        # Hex value
-        if value_str.startswith('0x') or value_str.startswith('$'):
+        # Hex value (either case: source lines are uppercased)
+        if value_str.startswith(('0x', '0X', '$')):
             return int(value_str.replace('$', '0x'), 16)
 
         # Binary value
-        if value_str.startswith('0b') or value_str.startswith('%'):
+        if value_str.startswith(('0b', '0B', '%')):
             return int(value_str.replace('%', '0b'), 2)
 
         # Label reference
-        if value_str in self.labels:
-            return self.labels[value_str]
+        if value_str in labels:
+            return labels[value_str]
 
         # Decimal value
         try:
@@ -89,89 +117,111 @@ class Neiler8Assembler:
         except:
             raise ValueError(f"Cannot parse value: {value_str}")
 
-    def assemble_line(self, line):
-        """Assemble single line of code"""
+    def assemble_line(self, line: str,
+                      fixups: Optional[List[Fixup]] = None) -> List[int]:
+        """Assemble single line of code
+
+        Operands naming a label that is not defined yet get a zero
+        placeholder and an (address, label, width) entry in fixups.
+        """
+        return self._encode(line.upper(), self.labels, fixups)
+
+    def _encode(self, line: str, labels: Dict[str, int],
+                fixups: Optional[List[Fixup]]) -> List[int]:
+        """Assemble a line that is already uppercased"""
         # Remove comments
         if ';' in line:
             line = line[:line.index(';')]
 
-        line = line.strip().upper()
+        line = line.strip()
 
         if not line:
             return []
 
         # Check for label definition
         if line.endswith(':'):
-            label = line[:-1]
-            self.labels[label] = self.current_address
+            labels[line[:-1]] = self.current_address
             return []
 
         # Find matching opcode
-        machine_code = []
-
-        for mnemonic, opcode in self.opcodes.items():
-            if line.startswith(mnemonic):
-                machine_code.append(opcode)
-
-                # Extract operand if present
-                operand_part = line[len(mnemonic):].strip()
-
-                if operand_part:
-                    # Handle different operand types
-                    if ',' in operand_part:
-                        parts = operand_part.split(',')
-                        operand = parts[-1].strip()
-                    else:
-                        operand = operand_part
-
-                    # Parse operand value
-                    try:
-                        value = self.parse_value(operand)
-
-                        # Check if it's a word (2 bytes) or byte
-                        if opcode in [0x70, 0x71, 0x72, 0x73, 0x74, 0x75, 0x80]:  # Jump/Call
-                            # 16-bit address
-                            machine_code.append(value & 0xFF)  # Low byte
-                            machine_code.append((value >> 8) & 0xFF)  # High byte
-                        else:
-                            # 8-bit immediate
-                            machine_code.append(value & 0xFF)
-                    except:
-                        pass
-
-                break
+        match = self._mnemonic_re.match(line)
+        if not match:
+            return []
 
-        return machine_code
+        mnemonic = match.group()
+        opcode = self.opcodes[mnemonic]
+        machine_code = [opcode]
 
-    def assemble(self, source_code):
-        """Assemble complete program"""
-        lines = source_code.split('\n')
+        # Extract operand if present
+        operand_part = line[len(mnemonic):].strip()
 
-        # First pass: collect labels
-        self.current_address = 0x0200
-        for line in lines:
-            stripped = line.strip()
-            if stripped.endswith(':'):
-                label = stripped[:-1].upper()
-                self.labels[label] = self.current_address
+        if operand_part:
+            # Handle different operand types
+            if ',' in operand_part:
+                parts = operand_part.split(',')
+                operand = parts[-1].strip()
             else:
-                # Estimate instruction size
-                temp_code = self.assemble_line(line)
-                self.current_address += len(temp_code)
+                operand = operand_part
+
+            # Parse operand value
+            width = _OPERAND_BYTES[opcode]
+            try:
+                value = self.parse_value(operand, labels)
+            except ValueError:
+                if fixups is None or not LABEL_RE.match(operand):
+                    return machine_code
+                # Forward reference: patched once the label is known (an
+                # opcode without operand bytes has nothing to patch)
+                if width:
+                    fixups.append((self.current_address + 1, operand, width))
+                value = 0
+
+            if width == 2:
+                # 16-bit address
+                machine_code.append(value & 0xFF)  # Low byte
+                machine_code.append((value >> 8) & 0xFF)  # High byte
+            elif width == 1:
+                # 8-bit immediate
+                machine_code.append(value & 0xFF)
+
+        return machine_code
 
-        # Second pass: generate machine code
+    def assemble(self, source_code: str) -> bytearray:
+        """Assemble complete program"""
+        # Single pass: emit code, back-patch forward label references after
+        labels: Dict[str, int] = {}
+        self.labels = labels
         self.current_address = 0x0200
-        machine_code = []
+        # Normalize case once for the whole source
+        lines = source_code.upper().split('\n')
+        fixups: List[Fixup] = []
+
+        # No line emits more than 3 bytes: allocate once, trim at the end
+        machine_code = bytearray(3 * len(lines))
+        pos = 0
 
         for line in lines:
-            code = self.assemble_line(line)
-            machine_code.extend(code)
+            code = self._encode(line, labels, fixups)
+            end = pos + len(code)
+            machine_code[pos:end] = code
+            pos = end
             self.current_address += len(code)
 
-        return bytearray(machine_code)
+        del machine_code[pos:]
+
+        for address, label, width in fixups:
+            if label not in labels:
+                raise ValueError(f"Undefined label: {label}")
+            value = labels[label]
+            offset = address - 0x0200
+            machine_code[offset] = value & 0xFF
+            if width == 2:
+                machine_code[offset + 1] = (value >> 8) & 0xFF
+
+        return machine_code
 
 
-def main():
+def main() -> None:
     if len(sys.argv) < 2:
         print("Usage: python asm.py input.asm [-o output.bin]")
         sys.exit(1)
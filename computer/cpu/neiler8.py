@@ -11,95 +11,237 @@ Features:
 - Interrupt support
 """
 
+import struct
+
+try:
+    import numpy as np
+    from numba import njit
+except ImportError:  # JIT backend is optional
+    np = None
+    njit = None
+
+# Little-endian 16-bit word codec
+_U16 = struct.Struct('<H')
+
+# Register file indices
+REG_A, REG_B, REG_C, REG_D, REG_X, REG_Y = range(6)
+REGISTER_NAMES = ('A', 'B', 'C', 'D', 'X', 'Y')
+REGISTER_INDEX = {name: index for index, name in enumerate(REGISTER_NAMES)}
+
+# Flag bits in the packed status register P
+P_ZERO = 0x01
+P_CARRY = 0x02
+P_NEGATIVE = 0x04
+P_OVERFLOW = 0x08
+P_INTERRUPT = 0x10
+
+# Operand bytes following each opcode, indexed directly by opcode byte
+_OPERAND_BYTES = bytearray(256)
+for _op in (0x01, 0x02, 0x03, 0x04, 0x05, 0x06, 0x41, 0x43, 0x61, 0x90, 0x91):
+    _OPERAND_BYTES[_op] = 1  # 8-bit immediate / port
+for _op in (0x20, 0x21, 0x22, 0x23, 0x70, 0x71, 0x72, 0x73, 0x74, 0x75, 0x80):
+    _OPERAND_BYTES[_op] = 2  # 16-bit address
+_OPERAND_BYTES = bytes(_OPERAND_BYTES)
+
+# Longest byte span of a decoded superinstruction
+# (ADD A, imm; CMP A, imm; JNZ addr)
+_MAX_SPAN = 7
+
+# Opcodes that end a basic block: control flow, HLT, and memory writes
+# (a store may rewrite the code that follows it)
+_ENDS_BLOCK = bytearray(256)
+for _op in (0x22, 0x23, 0x26, 0x27, 0x30, 0x31,
+            0x70, 0x71, 0x72, 0x73, 0x74, 0x75, 0x80, 0x81, 0xFF):
+    _ENDS_BLOCK[_op] = 1
+_ENDS_BLOCK = bytes(_ENDS_BLOCK)
+
+# Longest basic block, in instructions
+_MAX_BLOCK = 32
+
+# Compiled basic block bodies, keyed by their generated source
+_BODY_CODE = {}
+_BODY_CODE_LIMIT = 4096
+
+
+def _compile_body(body):
+    """Turn (handler, arg) pairs into one function running them in order
+
+    The handlers become default arguments (fast locals) and the operands
+    literal constants, so the body runs without a dispatch loop.
+    """
+    params = ', '.join(f'h{i}=h{i}' for i in range(len(body)))
+    calls = ''.join(f'\n    h{i}({arg!r})' for i, (_, arg) in enumerate(body))
+    source = f'def body({params}):' + (calls or '\n    pass')
+    code = _BODY_CODE.get(source)
+    if code is None:
+        if len(_BODY_CODE) >= _BODY_CODE_LIMIT:
+            _BODY_CODE.clear()
+        code = _BODY_CODE[source] = compile(source, '<neiler8 block>', 'exec')
+    namespace = {f'h{i}': handler for i, (handler, _) in enumerate(body)}
+    exec(code, namespace)
+    return namespace['body']
+
+
+class _Halt(Exception):
+    """Raised by HLT and unknown opcodes to leave the interpreter loop.
+
+    cycles is 1 if the halting instruction counts towards CPU cycles
+    (HLT) and 0 if it does not (unknown opcode).
+    """
+
+    def __init__(self, cycles):
+        super().__init__(cycles)
+        self.cycles = cycles
+
+
+def _register_property(index):
+    """Expose a register file slot as a named attribute"""
+    def getter(self):
+        return self.R[index]
+
+    def setter(self, value):
+        self.R[index] = value & 0xFF
+
+    return property(getter, setter)
+
+
+def _flag_property(mask):
+    """Expose one bit of the status register P as a 0/1 attribute"""
+    def getter(self):
+        return 1 if self.P & mask else 0
+
+    def setter(self, value):
+        if value:
+            self.P |= mask
+        else:
+            self.P &= ~mask
+
+    return property(getter, setter)
+
+
 class Neiler8CPU:
+    __slots__ = ('R', 'PC', 'SP', 'P', 'memory', '_stack', 'io_ports',
+                 'out_log', 'halted', 'cycles', 'opcodes', '_dispatch',
+                 '_dcache', '_dcache_pages', '_blocks', '_block_pages')
+
+    A = _register_property(REG_A)
+    B = _register_property(REG_B)
+    C = _register_property(REG_C)
+    D = _register_property(REG_D)
+    X = _register_property(REG_X)
+    Y = _register_property(REG_Y)
+
+    FLAG_ZERO = _flag_property(P_ZERO)
+    FLAG_CARRY = _flag_property(P_CARRY)
+    FLAG_OVERFLOW = _flag_property(P_OVERFLOW)
+    FLAG_NEGATIVE = _flag_property(P_NEGATIVE)
+    FLAG_INTERRUPT = _flag_property(P_INTERRUPT)
+
     def __init__(self, memory_size=65536):
-        # Registers (8-bit)
-        self.A = 0  # Accumulator
-        self.B = 0  # Accumulator
-        self.C = 0  # General purpose
-        self.D = 0  # General purpose
-        self.X = 0  # Index register
-        self.Y = 0  # Index register
+        # Registers (8-bit): A, B accumulators, C, D general purpose,
+        # X, Y index registers
+        self.R = bytearray(6)
 
         # Special registers
         self.PC = 0x0200  # Program counter (starts after zero page and stack)
         self.SP = 0xFF    # Stack pointer (stack at 0x0100-0x01FF)
 
-        # Flags
-        self.FLAG_ZERO = 0
-        self.FLAG_CARRY = 0
-        self.FLAG_OVERFLOW = 0
-        self.FLAG_NEGATIVE = 0
-        self.FLAG_INTERRUPT = 0
+        # Flags, packed into one status byte (see P_*)
+        self.P = 0
 
         # Memory (64KB)
         self.memory = bytearray(memory_size)
+        self._stack = memoryview(self.memory)[0x0100:0x0200]  # stack page
 
         # I/O ports
-        self.io_ports = [0] * 256
+        self.io_ports = bytearray(256)
+
+        # Optional record of OUT writes: set to a bytearray to have every
+        # OUT append its (port, value) byte pair, in execution order
+        self.out_log = None
 
         # State
         self.halted = False
         self.cycles = 0
 
+        # Decode cache: address -> (handler, arg, next_pc, fused), filled
+        # the first time an instruction executes. fused is an optional
+        # superinstruction (handler, arg, next_pc, instruction_count) that
+        # run() may take instead. _dcache_pages flags the 256-byte pages
+        # holding any entry so write_byte only invalidates when code may
+        # have changed; code writing self.memory directly must call
+        # _flush_decode_cache().
+        self._dcache = [None] * memory_size
+        self._dcache_pages = bytearray((memory_size + 0xFF) >> 8)
+
+        # Basic blocks for run(): start address -> (body, handler, arg,
+        # next_pc, body_count, count). body is a compiled function running
+        # the straight-line instructions; handler/arg is the instruction
+        # (or superinstruction) ending the block, run with PC already at
+        # next_pc. An empty tuple marks a block of a single instruction,
+        # which run() steps through the decode cache instead. Blocks are
+        # dropped whenever a page they cover (_block_pages) is written.
+        self._blocks = {}
+        self._block_pages = bytearray(len(self._dcache_pages))
+
         # Instruction set
         self.opcodes = {
             # Data movement
             0x00: ('NOP', 0, self.nop),
-            0x01: ('MOV A, imm', 1, lambda: self.mov_reg_imm('A')),
-            0x02: ('MOV B, imm', 1, lambda: self.mov_reg_imm('B')),
-            0x03: ('MOV C, imm', 1, lambda: self.mov_reg_imm('C')),
-            0x04: ('MOV D, imm', 1, lambda: self.mov_reg_imm('D')),
-            0x05: ('MOV X, imm', 1, lambda: self.mov_reg_imm('X')),
-            0x06: ('MOV Y, imm', 1, lambda: self.mov_reg_imm('Y')),
-
-            0x10: ('MOV A, B', 0, lambda: self.mov_reg_reg('A', 'B')),
-            0x11: ('MOV A, C', 0, lambda: self.mov_reg_reg('A', 'C')),
-            0x12: ('MOV B, A', 0, lambda: self.mov_reg_reg('B', 'A')),
-            0x13: ('MOV C, A', 0, lambda: self.mov_reg_reg('C', 'A')),
+            0x01: ('MOV A, imm', 1, self._op_01),
+            0x02: ('MOV B, imm', 1, self._op_02),
+            0x03: ('MOV C, imm', 1, self._op_03),
+            0x04: ('MOV D, imm', 1, self._op_04),
+            0x05: ('MOV X, imm', 1, self._op_05),
+            0x06: ('MOV Y, imm', 1, self._op_06),
+
+            0x10: ('MOV A, B', 0, self._op_10),
+            0x11: ('MOV A, C', 0, self._op_11),
+            0x12: ('MOV B, A', 0, self._op_12),
+            0x13: ('MOV C, A', 0, self._op_13),
 
             # Load/Store
-            0x20: ('LOAD A, [addr]', 2, lambda: self.load_reg_addr('A')),
-            0x21: ('LOAD B, [addr]', 2, lambda: self.load_reg_addr('B')),
-            0x22: ('STORE A, [addr]', 2, lambda: self.store_reg_addr('A')),
-            0x23: ('STORE B, [addr]', 2, lambda: self.store_reg_addr('B')),
+            0x20: ('LOAD A, [addr]', 2, self._op_20),
+            0x21: ('LOAD B, [addr]', 2, self._op_21),
+            0x22: ('STORE A, [addr]', 2, self._op_22),
+            0x23: ('STORE B, [addr]', 2, self._op_23),
 
-            0x24: ('LOAD A, [X]', 0, lambda: self.load_reg_indexed('A', 'X')),
-            0x25: ('LOAD A, [Y]', 0, lambda: self.load_reg_indexed('A', 'Y')),
-            0x26: ('STORE A, [X]', 0, lambda: self.store_reg_indexed('A', 'X')),
-            0x27: ('STORE A, [Y]', 0, lambda: self.store_reg_indexed('A', 'Y')),
+            0x24: ('LOAD A, [X]', 0, self._op_24),
+            0x25: ('LOAD A, [Y]', 0, self._op_25),
+            0x26: ('STORE A, [X]', 0, self._op_26),
+            0x27: ('STORE A, [Y]', 0, self._op_27),
 
             # Stack operations
-            0x30: ('PUSH A', 0, lambda: self.push('A')),
-            0x31: ('PUSH B', 0, lambda: self.push('B')),
-            0x32: ('POP A', 0, lambda: self.pop('A')),
-            0x33: ('POP B', 0, lambda: self.pop('B')),
+            0x30: ('PUSH A', 0, self._op_30),
+            0x31: ('PUSH B', 0, self._op_31),
+            0x32: ('POP A', 0, self._op_32),
+            0x33: ('POP B', 0, self._op_33),
 
             # Arithmetic
-            0x40: ('ADD A, B', 0, lambda: self.add_reg_reg('A', 'B')),
-            0x41: ('ADD A, imm', 1, lambda: self.add_reg_imm('A')),
-            0x42: ('SUB A, B', 0, lambda: self.sub_reg_reg('A', 'B')),
-            0x43: ('SUB A, imm', 1, lambda: self.sub_reg_imm('A')),
-            0x44: ('INC A', 0, lambda: self.inc('A')),
-            0x45: ('INC B', 0, lambda: self.inc('B')),
-            0x46: ('INC X', 0, lambda: self.inc('X')),
-            0x47: ('INC Y', 0, lambda: self.inc('Y')),
-            0x48: ('DEC A', 0, lambda: self.dec('A')),
-            0x49: ('DEC B', 0, lambda: self.dec('B')),
-            0x4A: ('DEC X', 0, lambda: self.dec('X')),
-            0x4B: ('DEC Y', 0, lambda: self.dec('Y')),
+            0x40: ('ADD A, B', 0, self._op_40),
+            0x41: ('ADD A, imm', 1, self._op_41),
+            0x42: ('SUB A, B', 0, self._op_42),
+            0x43: ('SUB A, imm', 1, self._op_43),
+            0x44: ('INC A', 0, self._op_44),
+            0x45: ('INC B', 0, self._op_45),
+            0x46: ('INC X', 0, self._op_46),
+            0x47: ('INC Y', 0, self._op_47),
+            0x48: ('DEC A', 0, self._op_48),
+            0x49: ('DEC B', 0, self._op_49),
+            0x4A: ('DEC X', 0, self._op_4A),
+            0x4B: ('DEC Y', 0, self._op_4B),
 
             # Logic
-            0x50: ('AND A, B', 0, lambda: self.and_reg_reg('A', 'B')),
-            0x51: ('OR A, B', 0, lambda: self.or_reg_reg('A', 'B')),
-            0x52: ('XOR A, B', 0, lambda: self.xor_reg_reg('A', 'B')),
-            0x53: ('NOT A', 0, lambda: self.not_reg('A')),
-            0x54: ('SHL A', 0, lambda: self.shl('A')),
-            0x55: ('SHR A', 0, lambda: self.shr('A')),
+            0x50: ('AND A, B', 0, self._op_50),
+            0x51: ('OR A, B', 0, self._op_51),
+            0x52: ('XOR A, B', 0, self._op_52),
+            0x53: ('NOT A', 0, self._op_53),
+            0x54: ('SHL A', 0, self._op_54),
+            0x55: ('SHR A', 0, self._op_55),
 
             # Comparison
-            0x60: ('CMP A, B', 0, lambda: self.cmp_reg_reg('A', 'B')),
-            0x61: ('CMP A, imm', 1, lambda: self.cmp_reg_imm('A')),
+            0x60: ('CMP A, B', 0, self._op_60),
+            0x61: ('CMP A, imm', 1, self._op_61),
 
             # Jumps
             0x70: ('JMP addr', 2, self.jmp),
@@ -114,26 +256,38 @@ class Neiler8CPU:
             0x81: ('RET', 0, self.ret),
 
             # I/O
-            0x90: ('IN A, port', 1, lambda: self.in_reg('A')),
-            0x91: ('OUT port, A', 1, lambda: self.out_reg('A')),
+            0x90: ('IN A, port', 1, self._op_90),
+            0x91: ('OUT port, A', 1, self._op_91),
 
             # System
             0xFF: ('HLT', 0, self.hlt),
         }
 
+        # Dispatch table indexed directly by opcode byte
+        self._dispatch = [self._illegal] * 256
+        for opcode, (name, param_bytes, func) in self.opcodes.items():
+            self._dispatch[opcode] = func
+
     def get_register(self, reg_name):
         """Get register value by name"""
-        return getattr(self, reg_name)
+        return self.R[REGISTER_INDEX[reg_name]]
 
     def set_register(self, reg_name, value):
         """Set register value by name"""
-        setattr(self, reg_name, value & 0xFF)
-        self.update_flags(value & 0xFF)
+        self.write_register(REGISTER_INDEX[reg_name], value)
+
+    def write_register(self, reg, value):
+        """Set register value by index and update flags"""
+        value &= 0xFF
+        self.R[reg] = value
+        self.P = ((self.P & ~(P_ZERO | P_NEGATIVE))
+                  | (value == 0) | ((value >> 5) & P_NEGATIVE))
 
     def update_flags(self, value):
         """Update CPU flags based on value"""
-        self.FLAG_ZERO = 1 if (value & 0xFF) == 0 else 0
-        self.FLAG_NEGATIVE = 1 if (value & 0x80) else 0
+        value &= 0xFF
+        self.P = ((self.P & ~(P_ZERO | P_NEGATIVE))
+                  | (value == 0) | ((value >> 5) & P_NEGATIVE))
 
     def read_byte(self, address):
         """Read byte from memory"""
@@ -141,10 +295,17 @@ class Neiler8CPU:
 
     def write_byte(self, address, value):
         """Write byte to memory"""
-        self.memory[address & 0xFFFF] = value & 0xFF
+        address &= 0xFFFF
+        self.memory[address] = value & 0xFF
+        if self._dcache_pages[address >> 8]:
+            self._invalidate(address)
 
     def read_word(self, address):
         """Read 16-bit word (little-endian)"""
+        address &= 0xFFFF
+        if address < len(self.memory) - 1:
+            return _U16.unpack_from(self.memory, address)[0]
+        # Word straddles the end of memory: wrap byte by byte
         low = self.read_byte(address)
         high = self.read_byte(address + 1)
         return (high << 8) | low
@@ -157,208 +318,281 @@ class Neiler8CPU:
 
     def fetch_word(self):
         """Fetch next word from PC"""
+        pc = self.PC
+        if pc < len(self.memory) - 1:
+            self.PC = (pc + 2) & 0xFFFF
+            return _U16.unpack_from(self.memory, pc)[0]
         low = self.fetch_byte()
         high = self.fetch_byte()
         return (high << 8) | low
 
     # === INSTRUCTION IMPLEMENTATIONS ===
 
-    def nop(self):
+    def nop(self, _):
         """No operation"""
         pass
 
-    def mov_reg_imm(self, reg):
-        """MOV reg, immediate"""
-        value = self.fetch_byte()
-        self.set_register(reg, value)
-
-    def mov_reg_reg(self, dst, src):
-        """MOV dst, src"""
-        value = self.get_register(src)
-        self.set_register(dst, value)
-
-    def load_reg_addr(self, reg):
-        """LOAD reg, [address]"""
-        addr = self.fetch_word()
-        value = self.read_byte(addr)
-        self.set_register(reg, value)
-
-    def store_reg_addr(self, reg):
-        """STORE reg, [address]"""
-        addr = self.fetch_word()
-        value = self.get_register(reg)
-        self.write_byte(addr, value)
-
-    def load_reg_indexed(self, reg, index_reg):
-        """LOAD reg, [index]"""
-        addr = self.get_register(index_reg)
-        value = self.read_byte(addr)
-        self.set_register(reg, value)
-
-    def store_reg_indexed(self, reg, index_reg):
-        """STORE reg, [index]"""
-        addr = self.get_register(index_reg)
-        value = self.get_register(reg)
-        self.write_byte(addr, value)
-
-    def push(self, reg):
-        """PUSH register to stack"""
-        value = self.get_register(reg)
-        stack_addr = 0x0100 + self.SP
-        self.write_byte(stack_addr, value)
+    def _op_01(self, imm):
+        """MOV A, imm"""
+        self.write_register(REG_A, imm)
+
+    def _op_02(self, imm):
+        """MOV B, imm"""
+        self.write_register(REG_B, imm)
+
+    def _op_03(self, imm):
+        """MOV C, imm"""
+        self.write_register(REG_C, imm)
+
+    def _op_04(self, imm):
+        """MOV D, imm"""
+        self.write_register(REG_D, imm)
+
+    def _op_05(self, imm):
+        """MOV X, imm"""
+        self.write_register(REG_X, imm)
+
+    def _op_06(self, imm):
+        """MOV Y, imm"""
+        self.write_register(REG_Y, imm)
+
+    def _op_10(self, _):
+        """MOV A, B"""
+        self.write_register(REG_A, self.R[REG_B])
+
+    def _op_11(self, _):
+        """MOV A, C"""
+        self.write_register(REG_A, self.R[REG_C])
+
+    def _op_12(self, _):
+        """MOV B, A"""
+        self.write_register(REG_B, self.R[REG_A])
+
+    def _op_13(self, _):
+        """MOV C, A"""
+        self.write_register(REG_C, self.R[REG_A])
+
+    def _op_20(self, addr):
+        """LOAD A, [addr]"""
+        self.write_register(REG_A, self.read_byte(addr))
+
+    def _op_21(self, addr):
+        """LOAD B, [addr]"""
+        self.write_register(REG_B, self.read_byte(addr))
+
+    def _op_22(self, addr):
+        """STORE A, [addr]"""
+        self.write_byte(addr, self.R[REG_A])
+
+    def _op_23(self, addr):
+        """STORE B, [addr]"""
+        self.write_byte(addr, self.R[REG_B])
+
+    def _op_24(self, _):
+        """LOAD A, [X]"""
+        self.write_register(REG_A, self.read_byte(self.R[REG_X]))
+
+    def _op_25(self, _):
+        """LOAD A, [Y]"""
+        self.write_register(REG_A, self.read_byte(self.R[REG_Y]))
+
+    def _op_26(self, _):
+        """STORE A, [X]"""
+        self.write_byte(self.R[REG_X], self.R[REG_A])
+
+    def _op_27(self, _):
+        """STORE A, [Y]"""
+        self.write_byte(self.R[REG_Y], self.R[REG_A])
+
+    def _op_30(self, _):
+        """PUSH A"""
+        self.write_byte(0x0100 + self.SP, self.R[REG_A])
         self.SP = (self.SP - 1) & 0xFF
 
-    def pop(self, reg):
-        """POP from stack to register"""
+    def _op_31(self, _):
+        """PUSH B"""
+        self.write_byte(0x0100 + self.SP, self.R[REG_B])
+        self.SP = (self.SP - 1) & 0xFF
+
+    def _op_32(self, _):
+        """POP A"""
         self.SP = (self.SP + 1) & 0xFF
-        stack_addr = 0x0100 + self.SP
-        value = self.read_byte(stack_addr)
-        self.set_register(reg, value)
-
-    def add_reg_reg(self, dst, src):
-        """ADD dst, src"""
-        a = self.get_register(dst)
-        b = self.get_register(src)
-        result = a + b
-        self.FLAG_CARRY = 1 if result > 0xFF else 0
-        self.FLAG_OVERFLOW = 1 if ((a ^ result) & (b ^ result) & 0x80) else 0
-        self.set_register(dst, result)
-
-    def add_reg_imm(self, reg):
-        """ADD reg, immediate"""
-        a = self.get_register(reg)
-        b = self.fetch_byte()
+        self.write_register(REG_A, self.read_byte(0x0100 + self.SP))
+
+    def _op_33(self, _):
+        """POP B"""
+        self.SP = (self.SP + 1) & 0xFF
+        self.write_register(REG_B, self.read_byte(0x0100 + self.SP))
+
+    def _op_40(self, _):
+        """ADD A, B"""
+        a = self.R[REG_A]
+        b = self.R[REG_B]
         result = a + b
-        self.FLAG_CARRY = 1 if result > 0xFF else 0
-        self.set_register(reg, result)
-
-    def sub_reg_reg(self, dst, src):
-        """SUB dst, src"""
-        a = self.get_register(dst)
-        b = self.get_register(src)
-        result = a - b
-        self.FLAG_CARRY = 1 if result < 0 else 0
-        self.set_register(dst, result)
-
-    def sub_reg_imm(self, reg):
-        """SUB reg, immediate"""
-        a = self.get_register(reg)
-        b = self.fetch_byte()
-        result = a - b
-        self.FLAG_CARRY = 1 if result < 0 else 0
-        self.set_register(reg, result)
-
-    def inc(self, reg):
-        """INC register"""
-        value = self.get_register(reg)
-        self.set_register(reg, value + 1)
-
-    def dec(self, reg):
-        """DEC register"""
-        value = self.get_register(reg)
-        self.set_register(reg, value - 1)
-
-    def and_reg_reg(self, dst, src):
-        """AND dst, src"""
-        a = self.get_register(dst)
-        b = self.get_register(src)
-        self.set_register(dst, a & b)
-
-    def or_reg_reg(self, dst, src):
-        """OR dst, src"""
-        a = self.get_register(dst)
-        b = self.get_register(src)
-        self.set_register(dst, a | b)
-
-    def xor_reg_reg(self, dst, src):
-        """XOR dst, src"""
-        a = self.get_register(dst)
-        b = self.get_register(src)
-        self.set_register(dst, a ^ b)
-
-    def not_reg(self, reg):
-        """NOT register"""
-        value = self.get_register(reg)
-        self.set_register(reg, ~value)
-
-    def shl(self, reg):
-        """SHL register (shift left)"""
-        value = self.get_register(reg)
-        self.FLAG_CARRY = 1 if (value & 0x80) else 0
-        self.set_register(reg, value << 1)
-
-    def shr(self, reg):
-        """SHR register (shift right)"""
-        value = self.get_register(reg)
-        self.FLAG_CARRY = 1 if (value & 0x01) else 0
-        self.set_register(reg, value >> 1)
-
-    def cmp_reg_reg(self, reg1, reg2):
-        """CMP reg1, reg2 (compare by subtraction)"""
-        a = self.get_register(reg1)
-        b = self.get_register(reg2)
-        result = a - b
-        self.update_flags(result)
-        self.FLAG_CARRY = 1 if result < 0 else 0
-
-    def cmp_reg_imm(self, reg):
-        """CMP reg, immediate"""
-        a = self.get_register(reg)
-        b = self.fetch_byte()
-        result = a - b
-        self.update_flags(result)
-        self.FLAG_CARRY = 1 if result < 0 else 0
-
-    def jmp(self):
+        self.P = ((self.P & ~(P_CARRY | P_OVERFLOW))
+                  | ((result >> 7) & P_CARRY)
+                  | (((a ^ result) & (b ^ result) & 0x80) >> 4))
+        self.write_register(REG_A, result)
+
+    def _op_41(self, imm):
+        """ADD A, imm"""
+        result = self.R[REG_A] + imm
+        self.P = (self.P & ~P_CARRY) | ((result >> 7) & P_CARRY)
+        self.write_register(REG_A, result)
+
+    def _op_42(self, _):
+        """SUB A, B"""
+        result = self.R[REG_A] - self.R[REG_B]
+        self.P = (self.P & ~P_CARRY) | ((result >> 7) & P_CARRY)
+        self.write_register(REG_A, result)
+
+    def _op_43(self, imm):
+        """SUB A, imm"""
+        result = self.R[REG_A] - imm
+        self.P = (self.P & ~P_CARRY) | ((result >> 7) & P_CARRY)
+        self.write_register(REG_A, result)
+
+    def _op_44(self, _):
+        """INC A"""
+        self.write_register(REG_A, self.R[REG_A] + 1)
+
+    def _op_45(self, _):
+        """INC B"""
+        self.write_register(REG_B, self.R[REG_B] + 1)
+
+    def _op_46(self, _):
+        """INC X"""
+        self.write_register(REG_X, self.R[REG_X] + 1)
+
+    def _op_47(self, _):
+        """INC Y"""
+        self.write_register(REG_Y, self.R[REG_Y] + 1)
+
+    def _op_48(self, _):
+        """DEC A"""
+        self.write_register(REG_A, self.R[REG_A] - 1)
+
+    def _op_49(self, _):
+        """DEC B"""
+        self.write_register(REG_B, self.R[REG_B] - 1)
+
+    def _op_4A(self, _):
+        """DEC X"""
+        self.write_register(REG_X, self.R[REG_X] - 1)
+
+    def _op_4B(self, _):
+        """DEC Y"""
+        self.write_register(REG_Y, self.R[REG_Y] - 1)
+
+    def _op_50(self, _):
+        """AND A, B"""
+        R = self.R
+        self.write_register(REG_A, R[REG_A] & R[REG_B])
+
+    def _op_51(self, _):
+        """OR A, B"""
+        R = self.R
+        self.write_register(REG_A, R[REG_A] | R[REG_B])
+
+    def _op_52(self, _):
+        """XOR A, B"""
+        R = self.R
+        self.write_register(REG_A, R[REG_A] ^ R[REG_B])
+
+    def _op_53(self, _):
+        """NOT A"""
+        self.write_register(REG_A, ~self.R[REG_A])
+
+    def _op_54(self, _):
+        """SHL A"""
+        value = self.R[REG_A]
+        self.P = (self.P & ~P_CARRY) | ((value >> 6) & P_CARRY)
+        self.write_register(REG_A, value << 1)
+
+    def _op_55(self, _):
+        """SHR A"""
+        value = self.R[REG_A]
+        self.P = (self.P & ~P_CARRY) | ((value & 0x01) << 1)
+        self.write_register(REG_A, value >> 1)
+
+    def _op_60(self, _):
+        """CMP A, B"""
+        result = self.R[REG_A] - self.R[REG_B]
+        value = result & 0xFF
+        self.P = ((self.P & ~(P_ZERO | P_CARRY | P_NEGATIVE))
+                  | (value == 0) | ((result >> 7) & P_CARRY)
+                  | ((value >> 5) & P_NEGATIVE))
+
+    def _op_61(self, imm):
+        """CMP A, imm"""
+        result = self.R[REG_A] - imm
+        value = result & 0xFF
+        self.P = ((self.P & ~(P_ZERO | P_CARRY | P_NEGATIVE))
+                  | (value == 0) | ((result >> 7) & P_CARRY)
+                  | ((value >> 5) & P_NEGATIVE))
+
+    def _op_90(self, imm):
+        """IN A, port"""
+        self.write_register(REG_A, self.io_ports[imm])
+
+    def _op_91(self, imm):
+        """OUT port, A"""
+        self.io_ports[imm] = value = self.R[REG_A]
+        if self.out_log is not None:
+            self.out_log.extend((imm, value))
+
+    def jmp(self, addr):
         """JMP address (unconditional jump)"""
-        addr = self.fetch_word()
         self.PC = addr
 
-    def jz(self):
+    def jz(self, addr):
         """JZ address (jump if zero)"""
-        addr = self.fetch_word()
-        if self.FLAG_ZERO:
+        if self.P & P_ZERO:
             self.PC = addr
 
-    def jnz(self):
+    def jnz(self, addr):
         """JNZ address (jump if not zero)"""
-        addr = self.fetch_word()
-        if not self.FLAG_ZERO:
+        if not self.P & P_ZERO:
             self.PC = addr
 
-    def jc(self):
+    def jc(self, addr):
         """JC address (jump if carry)"""
-        addr = self.fetch_word()
-        if self.FLAG_CARRY:
+        if self.P & P_CARRY:
             self.PC = addr
 
-    def jnc(self):
+    def jnc(self, addr):
         """JNC address (jump if not carry)"""
-        addr = self.fetch_word()
-        if not self.FLAG_CARRY:
+        if not self.P & P_CARRY:
             self.PC = addr
 
-    def jn(self):
+    def jn(self, addr):
         """JN address (jump if negative)"""
-        addr = self.fetch_word()
-        if self.FLAG_NEGATIVE:
+        if self.P & P_NEGATIVE:
             self.PC = addr
 
-    def call(self):
+    def call(self, addr):
         """CALL address (call subroutine)"""
-        addr = self.fetch_word()
         # Push return address to stack
         ret_addr = self.PC
         self.push_word(ret_addr)
         self.PC = addr
 
-    def ret(self):
+    def ret(self, _):
         """RET (return from subroutine)"""
         ret_addr = self.pop_word()
         self.PC = ret_addr
 
     def push_word(self, value):
         """Push 16-bit word to stack"""
+        sp = self.SP
+        if 0 < sp < len(self._stack):
+            # High byte at SP, low byte at SP-1: one little-endian word
+            _U16.pack_into(self._stack, sp - 1, value & 0xFFFF)
+            if self._dcache_pages[0x01]:
+                self._invalidate(0x0100 + sp)
+            self.SP = sp - 2 & 0xFF
+            return
+        # Word wraps around the stack page
         self.write_byte(0x0100 + self.SP, (value >> 8) & 0xFF)
         self.SP = (self.SP - 1) & 0xFF
         self.write_byte(0x0100 + self.SP, value & 0xFF)
@@ -366,62 +600,329 @@ class Neiler8CPU:
 
     def pop_word(self):
         """Pop 16-bit word from stack"""
+        sp = self.SP
+        if sp + 3 <= len(self._stack):
+            self.SP = sp + 2
+            return _U16.unpack_from(self._stack, sp + 1)[0]
         self.SP = (self.SP + 1) & 0xFF
         low = self.read_byte(0x0100 + self.SP)
         self.SP = (self.SP + 1) & 0xFF
         high = self.read_byte(0x0100 + self.SP)
         return (high << 8) | low
 
-    def in_reg(self, reg):
-        """IN register, port (read from I/O port)"""
-        port = self.fetch_byte()
-        value = self.io_ports[port]
-        self.set_register(reg, value)
-
-    def out_reg(self, reg):
-        """OUT port, register (write to I/O port)"""
-        port = self.fetch_byte()
-        value = self.get_register(reg)
-        self.io_ports[port] = value
-
-    def hlt(self):
+    def hlt(self, _):
         """HLT (halt CPU)"""
         self.halted = True
+        raise _Halt(1)
+
+    def _illegal(self, _):
+        """Unknown opcode (halts the CPU)"""
+        opcode = self.memory[(self.PC - 1) & 0xFFFF]
+        print(f"Unknown opcode: 0x{opcode:02X} at PC=0x{self.PC-1:04X}")
+        self.halted = True
+        raise _Halt(0)
 
     def step(self):
         """Execute one instruction"""
         if self.halted:
             return False
 
-        # Fetch opcode
-        opcode = self.fetch_byte()
-
-        # Decode and execute
-        if opcode in self.opcodes:
-            name, param_bytes, func = self.opcodes[opcode]
-            func()
-            self.cycles += 1
-            return True
-        else:
-            print(f"Unknown opcode: 0x{opcode:02X} at PC=0x{self.PC-1:04X}")
-            self.halted = True
-            return False
+        # Fetch and decode (cached per address)
+        entry = self._dcache[self.PC]
+        if entry is None:
+            entry = self._decode(self.PC)
+
+        # Execute
+        handler, arg, self.PC, _ = entry
+        try:
+            handler(arg)
+        except _Halt as halt:
+            self.cycles += halt.cycles
+            return halt.cycles == 1
+        self.cycles += 1
+        return True
 
     def run(self, max_cycles=None):
         """Run until halted or max_cycles reached"""
+        # A negative budget runs nothing (0 or None means no limit)
+        if max_cycles is not None and max_cycles < 0:
+            return 0
+
+        if _run_jit is not None and len(self.memory) == 0x10000:
+            return self._run_native(max_cycles or 0)
+
+        if self.halted:
+            return 0
+
+        # Whole basic blocks while the budget allows, then the same loop
+        # as step() with the hot attributes bound to locals. HLT and
+        # unknown opcodes leave the loop by raising _Halt, so there is no
+        # halted check per instruction.
+        blocks = self._blocks
+        build_block = self._build_block
+        dcache = self._dcache
+        decode = self._decode
+        limit = max(max_cycles, 0) if max_cycles else -1
         cycle_count = 0
-        while not self.halted:
-            if max_cycles and cycle_count >= max_cycles:
-                break
-            self.step()
+        halt_cycles = 0
+        try:
+            while cycle_count != limit:
+                block = blocks.get(self.PC)
+                if block is None:
+                    block = build_block(self.PC)
+                if block and (limit < 0 or limit - cycle_count >= block[5]):
+                    body, handler, arg, next_pc, body_count, count = block
+                    body()
+                    cycle_count += body_count
+                    self.PC = next_pc
+                    handler(arg)
+                    cycle_count += count - body_count
+                    continue
+                entry = dcache[self.PC]
+                if entry is None:
+                    entry = decode(self.PC)
+                fused = entry[3]
+                if fused is not None and (limit < 0 or
+                                          limit - cycle_count >= fused[3]):
+                    handler, arg, self.PC, count = fused
+                    handler(arg)
+                    cycle_count += count
+                    continue
+                handler, arg, self.PC, _ = entry
+                handler(arg)
+                cycle_count += 1
+        except _Halt as halt:
+            # run() counts the halting instruction, cycles only for HLT
             cycle_count += 1
+            halt_cycles = halt.cycles - 1
+        finally:
+            self.cycles += cycle_count + halt_cycles
         return cycle_count
 
+    def _run_native(self, max_cycles):
+        """Run through the Numba-compiled interpreter loop"""
+        if self.halted:
+            return 0
+
+        mem = np.frombuffer(self.memory, dtype=np.uint8)
+        regs = np.frombuffer(self.R, dtype=np.uint8)
+        io = np.frombuffer(self.io_ports, dtype=np.uint8)
+        state = np.array([self.PC, self.SP,
+                          self.FLAG_ZERO, self.FLAG_CARRY,
+                          self.FLAG_OVERFLOW, self.FLAG_NEGATIVE,
+                          0, 0, 0], dtype=np.int64)
+
+        # The compiled loop stops whenever its OUT buffer fills up, so
+        # the log is drained and the loop resumed until the budget is spent
+        out_log = self.out_log
+        outs = np.empty((_OUT_BUFFER_SIZE if out_log is not None else 0, 2),
+                        dtype=np.uint8)
+        executed = 0
+        while True:
+            state[_ST_OUTS] = 0
+            executed += _run_jit(mem, regs, io, state,
+                                 max_cycles - executed if max_cycles > 0 else 0,
+                                 outs)
+            count = state[_ST_OUTS]
+            if count:
+                out_log += outs[:count].tobytes()
+            if (count < _OUT_BUFFER_SIZE or state[_ST_HALTED]
+                    or 0 < max_cycles <= executed):
+                break
+
+        (self.PC, self.SP, self.FLAG_ZERO, self.FLAG_CARRY,
+         self.FLAG_OVERFLOW, self.FLAG_NEGATIVE) = state[:6].tolist()
+        self.cycles += executed
+
+        # The compiled loop writes memory directly
+        if any(self._dcache_pages):
+            self._flush_decode_cache()
+
+        if state[_ST_ILLEGAL]:
+            try:
+                self._illegal(None)
+            except _Halt:
+                pass
+            return executed + 1
+        if state[_ST_HALTED]:
+            self.halted = True
+        return executed
+
+    def reset(self):
+        """Return to the power-on state, reusing memory, ports and caches"""
+        self.R[:] = bytes(len(self.R))
+        self.PC = 0x0200
+        self.SP = 0xFF
+        self.P = 0
+        self.memory[:] = bytes(len(self.memory))
+        self.io_ports[:] = bytes(len(self.io_ports))
+        if self.out_log is not None:
+            self.out_log.clear()
+        self.halted = False
+        self.cycles = 0
+        self._flush_decode_cache()
+
     def load_program(self, program, start_address=0x0200):
         """Load program into memory"""
-        for i, byte in enumerate(program):
-            self.memory[start_address + i] = byte
+        end = start_address + len(program)
+        if end > len(self.memory):
+            raise IndexError("program does not fit in memory")
+        self.memory[start_address:end] = program
         self.PC = start_address
+        self._flush_decode_cache()
+
+    # === DECODE CACHE ===
+
+    def _decode(self, address):
+        """Decode the instruction at address and cache the result"""
+        mem = self.memory
+        opcode = mem[address]
+        width = _OPERAND_BYTES[opcode]
+        if width == 0:
+            arg = None
+        elif width == 1:
+            arg = mem[(address + 1) & 0xFFFF]
+        else:
+            arg = self.read_word(address + 1)
+        fused = self._decode_super(address)
+        entry = (self._dispatch[opcode], arg, (address + 1 + width) & 0xFFFF,
+                 fused)
+
+        # Bytes the entry depends on, including any fused instructions.
+        # Instructions wrapping past the end of memory are not cached.
+        if fused is not None:
+            span = (fused[2] - address) & 0xFFFF
+        else:
+            span = 1 + width
+        if address + span <= len(mem):
+            self._dcache[address] = entry
+            self._dcache_pages[address >> 8] = 1
+            self._dcache_pages[(address + span - 1) >> 8] = 1
+        return entry
+
+    def _decode_super(self, address):
+        """Decode a fused superinstruction starting at address, if any"""
+        mem = self.memory
+        if address + _MAX_SPAN > len(mem):
+            return None
+        op = mem[address]
+        if op == 0x41 and mem[address + 2] == 0x61 and mem[address + 4] == 0x72:
+            entry = (self._super_add_cmp_jnz,
+                     (mem[address + 1], mem[address + 3],
+                      _U16.unpack_from(mem, address + 5)[0]), 7, 3)
+        elif op == 0x61 and mem[address + 2] == 0x72:
+            entry = (self._super_cmp_jnz,
+                     (mem[address + 1], _U16.unpack_from(mem, address + 3)[0]), 5, 2)
+        elif op == 0x61 and mem[address + 2] == 0x71:
+            entry = (self._super_cmp_jz,
+                     (mem[address + 1], _U16.unpack_from(mem, address + 3)[0]), 5, 2)
+        elif op == 0x49 and mem[address + 1] == 0x72:
+            entry = (self._super_dec_b_jnz,
+                     _U16.unpack_from(mem, address + 2)[0], 4, 2)
+        else:
+            return None
+        handler, arg, span, count = entry
+        return (handler, arg, (address + span) & 0xFFFF, count)
+
+    def _build_block(self, address):
+        """Decode the basic block starting at address and cache it
+
+        NOPs inside the block are counted but not kept in its body.
+        """
+        dcache = self._dcache
+        body = []
+        body_count = 0
+        pc = address
+        end = address
+        while True:
+            entry = dcache[pc]
+            if entry is None:
+                entry = self._decode(pc)
+                if dcache[pc] is None:
+                    return None  # wraps past the end of memory
+            handler, arg, next_pc, fused = entry
+            count = 1
+            if fused is not None:
+                handler, arg, next_pc, count = fused
+            end += (next_pc - pc) & 0xFFFF
+            opcode = self.memory[pc]
+            if (fused is not None or _ENDS_BLOCK[opcode]
+                    or opcode not in self.opcodes
+                    or body_count == _MAX_BLOCK - 1):
+                break
+            if opcode != 0x00:
+                body.append((handler, arg))
+            body_count += 1
+            pc = next_pc
+
+        if body_count:
+            block = (_compile_body(body), handler, arg, next_pc, body_count,
+                     body_count + count)
+        else:
+            block = ()  # single instruction: step through the decode cache
+        self._blocks[address] = block
+        self._block_pages[address >> 8:((end - 1) >> 8) + 1] = \
+            b'\x01' * (((end - 1) >> 8) + 1 - (address >> 8))
+        return block
+
+    def _invalidate(self, address):
+        """Drop decoded entries whose bytes cover address"""
+        low = max(address - (_MAX_SPAN - 1), 0)
+        self._dcache[low:address + 1] = [None] * (address + 1 - low)
+        if self._block_pages[address >> 8]:
+            self._blocks.clear()
+            self._block_pages[:] = bytes(len(self._block_pages))
+
+    def _flush_decode_cache(self):
+        """Drop every decoded entry"""
+        self._dcache[:] = [None] * len(self._dcache)
+        self._dcache_pages[:] = bytes(len(self._dcache_pages))
+        self._blocks.clear()
+        self._block_pages[:] = bytes(len(self._block_pages))
+
+    def _super_add_cmp_jnz(self, arg):
+        """ADD A, imm; CMP A, imm; JNZ addr"""
+        imm, cmp_imm, target = arg
+        R = self.R
+        a = (R[REG_A] + imm) & 0xFF
+        R[REG_A] = a
+        # CMP overwrites every flag ADD A, imm sets
+        result = a - cmp_imm
+        value = result & 0xFF
+        self.P = ((self.P & ~(P_ZERO | P_CARRY | P_NEGATIVE))
+                  | (value == 0) | ((result >> 7) & P_CARRY)
+                  | ((value >> 5) & P_NEGATIVE))
+        if value:
+            self.PC = target
+
+    def _super_cmp_jnz(self, arg):
+        """CMP A, imm; JNZ addr"""
+        cmp_imm, target = arg
+        result = self.R[REG_A] - cmp_imm
+        value = result & 0xFF
+        self.P = ((self.P & ~(P_ZERO | P_CARRY | P_NEGATIVE))
+                  | (value == 0) | ((result >> 7) & P_CARRY)
+                  | ((value >> 5) & P_NEGATIVE))
+        if value:
+            self.PC = target
+
+    def _super_cmp_jz(self, arg):
+        """CMP A, imm; JZ addr"""
+        cmp_imm, target = arg
+        result = self.R[REG_A] - cmp_imm
+        value = result & 0xFF
+        self.P = ((self.P & ~(P_ZERO | P_CARRY | P_NEGATIVE))
+                  | (value == 0) | ((result >> 7) & P_CARRY)
+                  | ((value >> 5) & P_NEGATIVE))
+        if not value:
+            self.PC = target
+
+    def _super_dec_b_jnz(self, target):
+        """DEC B; JNZ addr"""
+        value = (self.R[REG_B] - 1) & 0xFF
+        self.write_register(REG_B, value)
+        if value:
+            self.PC = target
 
     def dump_registers(self):
         """Print register state"""
@@ -431,6 +932,212 @@ class Neiler8CPU:
         print(f"Cycles: {self.cycles}")
 
 
+# === COMPILED INTERPRETER LOOP ===
+
+# Layout of the state vector shared with the compiled loop
+(_ST_PC, _ST_SP, _ST_Z, _ST_C, _ST_O, _ST_N,
+ _ST_HALTED, _ST_ILLEGAL, _ST_OUTS) = range(9)
+
+# OUT writes recorded per call of the compiled loop when out_log is set
+_OUT_BUFFER_SIZE = 4096
+
+
+def _run_kernel(mem, regs, io, state, max_cycles, outs):
+    """Interpret instructions until HLT, an unknown opcode or max_cycles.
+
+    Operates on uint8 arrays for memory, registers and I/O ports plus an
+    int64 state vector (see _ST_*). max_cycles <= 0 means no limit.
+    OUT writes are recorded as (port, value) rows in the uint8 array outs,
+    counting in state[_ST_OUTS]; the loop returns early once it is full
+    (a zero-row outs records nothing).
+    Returns the number of instructions executed.
+    """
+    a = np.int64(regs[0])
+    b = np.int64(regs[1])
+    c = np.int64(regs[2])
+    d = np.int64(regs[3])
+    x = np.int64(regs[4])
+    y = np.int64(regs[5])
+    pc = state[_ST_PC]
+    sp = state[_ST_SP]
+    fz = state[_ST_Z]
+    fc = state[_ST_C]
+    fo = state[_ST_O]
+    fn = state[_ST_N]
+
+    n_outs = state[_ST_OUTS]
+    outs_full = False
+    executed = 0
+    while max_cycles <= 0 or executed < max_cycles:
+        op = np.int64(mem[pc])
+        pc = (pc + 1) & 0xFFFF
+        v = -1  # value written to a register, drives Z/N
+
+        if op == 0x00:
+            pass
+        elif op == 0x01:
+            a = v = np.int64(mem[pc]); pc = (pc + 1) & 0xFFFF
+        elif op == 0x02:
+            b = v = np.int64(mem[pc]); pc = (pc + 1) & 0xFFFF
+        elif op == 0x03:
+            c = v = np.int64(mem[pc]); pc = (pc + 1) & 0xFFFF
+        elif op == 0x04:
+            d = v = np.int64(mem[pc]); pc = (pc + 1) & 0xFFFF
+        elif op == 0x05:
+            x = v = np.int64(mem[pc]); pc = (pc + 1) & 0xFFFF
+        elif op == 0x06:
+            y = v = np.int64(mem[pc]); pc = (pc + 1) & 0xFFFF
+        elif op == 0x10:
+            a = v = b
+        elif op == 0x11:
+            a = v = c
+        elif op == 0x12:
+            b = v = a
+        elif op == 0x13:
+            c = v = a
+        elif op >= 0x20 and op <= 0x23:
+            addr = np.int64(mem[pc]) | (np.int64(mem[(pc + 1) & 0xFFFF]) << 8)
+            pc = (pc + 2) & 0xFFFF
+            if op == 0x20:
+                a = v = np.int64(mem[addr])
+            elif op == 0x21:
+                b = v = np.int64(mem[addr])
+            elif op == 0x22:
+                mem[addr] = a
+            else:
+                mem[addr] = b
+        elif op == 0x24:
+            a = v = np.int64(mem[x])
+        elif op == 0x25:
+            a = v = np.int64(mem[y])
+        elif op == 0x26:
+            mem[x] = a
+        elif op == 0x27:
+            mem[y] = a
+        elif op == 0x30:
+            mem[0x0100 + sp] = a; sp = (sp - 1) & 0xFF
+        elif op == 0x31:
+            mem[0x0100 + sp] = b; sp = (sp - 1) & 0xFF
+        elif op == 0x32:
+            sp = (sp + 1) & 0xFF; a = v = np.int64(mem[0x0100 + sp])
+        elif op == 0x33:
+            sp = (sp + 1) & 0xFF; b = v = np.int64(mem[0x0100 + sp])
+        elif op == 0x40:
+            r = a + b
+            fc = 1 if r > 0xFF else 0
+            fo = 1 if ((a ^ r) & (b ^ r) & 0x80) else 0
+            a = v = r & 0xFF
+        elif op == 0x41:
+            r = a + np.int64(mem[pc]); pc = (pc + 1) & 0xFFFF
+            fc = 1 if r > 0xFF else 0
+            a = v = r & 0xFF
+        elif op == 0x42:
+            r = a - b
+            fc = 1 if r < 0 else 0
+            a = v = r & 0xFF
+        elif op == 0x43:
+            r = a - np.int64(mem[pc]); pc = (pc + 1) & 0xFFFF
+            fc = 1 if r < 0 else 0
+            a = v = r & 0xFF
+        elif op == 0x44:
+            a = v = (a + 1) & 0xFF
+        elif op == 0x45:
+            b = v = (b + 1) & 0xFF
+        elif op == 0x46:
+            x = v = (x + 1) & 0xFF
+        elif op == 0x47:
+            y = v = (y + 1) & 0xFF
+        elif op == 0x48:
+            a = v = (a - 1) & 0xFF
+        elif op == 0x49:
+            b = v = (b - 1) & 0xFF
+        elif op == 0x4A:
+            x = v = (x - 1) & 0xFF
+        elif op == 0x4B:
+            y = v = (y - 1) & 0xFF
+        elif op == 0x50:
+            a = v = a & b
+        elif op == 0x51:
+            a = v = a | b
+        elif op == 0x52:
+            a = v = a ^ b
+        elif op == 0x53:
+            a = v = ~a & 0xFF
+        elif op == 0x54:
+            fc = 1 if a & 0x80 else 0
+            a = v = (a << 1) & 0xFF
+        elif op == 0x55:
+            fc = 1 if a & 0x01 else 0
+            a = v = a >> 1
+        elif op == 0x60 or op == 0x61:
+            if op == 0x60:
+                r = a - b
+            else:
+                r = a - np.int64(mem[pc]); pc = (pc + 1) & 0xFFFF
+            fc = 1 if r < 0 else 0
+            v = r & 0xFF
+        elif op >= 0x70 and op <= 0x75:
+            addr = np.int64(mem[pc]) | (np.int64(mem[(pc + 1) & 0xFFFF]) << 8)
+            pc = (pc + 2) & 0xFFFF
+            if (op == 0x70 or (op == 0x71 and fz) or (op == 0x72 and not fz)
+                    or (op == 0x73 and fc) or (op == 0x74 and not fc)
+                    or (op == 0x75 and fn)):
+                pc = addr
+        elif op == 0x80:
+            addr = np.int64(mem[pc]) | (np.int64(mem[(pc + 1) & 0xFFFF]) << 8)
+            pc = (pc + 2) & 0xFFFF
+            mem[0x0100 + sp] = pc >> 8; sp = (sp - 1) & 0xFF
+            mem[0x0100 + sp] = pc & 0xFF; sp = (sp - 1) & 0xFF
+            pc = addr
+        elif op == 0x81:
+            sp = (sp + 1) & 0xFF; low = np.int64(mem[0x0100 + sp])
+            sp = (sp + 1) & 0xFF; high = np.int64(mem[0x0100 + sp])
+            pc = (high << 8) | low
+        elif op == 0x90:
+            a = v = np.int64(io[np.int64(mem[pc])]); pc = (pc + 1) & 0xFFFF
+        elif op == 0x91:
+            port = np.int64(mem[pc]); pc = (pc + 1) & 0xFFFF
+            io[port] = a
+            if outs.shape[0]:
+                outs[n_outs, 0] = port
+                outs[n_outs, 1] = a
+                n_outs += 1
+                outs_full = n_outs == outs.shape[0]
+        elif op == 0xFF:
+            executed += 1
+            state[_ST_HALTED] = 1
+            break
+        else:
+            state[_ST_HALTED] = 1
+            state[_ST_ILLEGAL] = 1
+            break
+
+        if v >= 0:
+            fz = 1 if v == 0 else 0
+            fn = 1 if v & 0x80 else 0
+        executed += 1
+        if outs_full:
+            break
+
+    regs[0] = a
+    regs[1] = b
+    regs[2] = c
+    regs[3] = d
+    regs[4] = x
+    regs[5] = y
+    state[_ST_PC] = pc
+    state[_ST_SP] = sp
+    state[_ST_Z] = fz
+    state[_ST_C] = fc
+    state[_ST_O] = fo
+    state[_ST_N] = fn
+    state[_ST_OUTS] = n_outs
+    return executed
+
+
+_run_jit = njit(cache=True, nogil=True)(_run_kernel) if njit is not None else None
+
+
 if __name__ == "__main__":
     # Test program: Count from 0 to 10 and halt
     cpu = Neiler8CPU()
@@ -0,0 +1,375 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+"""
+Neiler-8: compiled CPU core
+Drop-in replacement for neiler8.Neiler8CPU with typed C state
+
+Build:
+    python setup.py build_ext --inplace
+
+Usage:
+    from neiler8_core import Neiler8CPU
+
+Registers, flags and the program counter are C integers, memory and I/O
+ports are typed views over bytearrays, and opcodes dispatch through a
+256-entry table of C function pointers.
+"""
+
+cimport cython
+
+ctypedef void (*op_fn)(Neiler8CPU cpu) noexcept
+
+cdef op_fn DISPATCH[256]
+
+
+cdef class Neiler8CPU:
+    # Registers (8-bit)
+    cdef public unsigned char A, B, C, D, X, Y
+
+    # Special registers
+    cdef public unsigned short PC
+    cdef public unsigned char SP
+
+    # Flags
+    cdef public unsigned char FLAG_ZERO, FLAG_CARRY, FLAG_OVERFLOW
+    cdef public unsigned char FLAG_NEGATIVE, FLAG_INTERRUPT
+
+    # State
+    cdef public bint halted
+    cdef public unsigned long long cycles
+
+    # Memory (64KB) and I/O ports
+    cdef readonly bytearray memory
+    cdef readonly bytearray io_ports
+    cdef unsigned char[::1] mem
+    cdef unsigned char[::1] io
+
+    def __init__(self, memory_size=65536):
+        if memory_size != 0x10000:
+            raise ValueError("compiled core requires a 64KB address space")
+
+        self.PC = 0x0200
+        self.SP = 0xFF
+
+        self.memory = bytearray(0x10000)
+        self.io_ports = bytearray(256)
+        self.mem = self.memory
+        self.io = self.io_ports
+
+    # === MEMORY ACCESS ===
+
+    cdef inline unsigned char fetch_byte(self) noexcept:
+        cdef unsigned char value = self.mem[self.PC]
+        self.PC += 1
+        return value
+
+    cdef inline unsigned short fetch_word(self) noexcept:
+        cdef unsigned short low = self.fetch_byte()
+        cdef unsigned short high = self.fetch_byte()
+        return (high << 8) | low
+
+    cdef inline void update_flags(self, unsigned char value) noexcept:
+        self.FLAG_ZERO = value == 0
+        self.FLAG_NEGATIVE = value >> 7
+
+    def read_byte(self, address):
+        """Read byte from memory"""
+        return self.mem[address & 0xFFFF]
+
+    def write_byte(self, address, value):
+        """Write byte to memory"""
+        self.mem[address & 0xFFFF] = value & 0xFF
+
+    def read_word(self, address):
+        """Read 16-bit word (little-endian)"""
+        return self.mem[address & 0xFFFF] | (self.mem[(address + 1) & 0xFFFF] << 8)
+
+    def get_register(self, reg_name):
+        """Get register value by name"""
+        return getattr(self, reg_name)
+
+    def set_register(self, reg_name, value):
+        """Set register value by name"""
+        setattr(self, reg_name, value & 0xFF)
+        self.update_flags(value & 0xFF)
+
+    # === EXECUTION ===
+
+    cdef inline bint _step(self) noexcept:
+        cdef unsigned char opcode = self.fetch_byte()
+        cdef op_fn handler = DISPATCH[opcode]
+        if handler == NULL:
+            self.halted = True
+            return False
+        handler(self)
+        self.cycles += 1
+        return True
+
+    def step(self):
+        """Execute one instruction"""
+        if self.halted:
+            return False
+        if not self._step():
+            self._report_illegal()
+            return False
+        return True
+
+    def run(self, max_cycles=None):
+        """Run until halted or max_cycles reached"""
+        cdef unsigned long long limit
+        cdef unsigned long long cycle_count = 0
+        # A negative budget runs nothing (0 or None means no limit)
+        if max_cycles is not None and max_cycles < 0:
+            return 0
+        limit = max_cycles or 0
+        while not self.halted:
+            if limit and cycle_count >= limit:
+                break
+            cycle_count += 1
+            if not self._step():
+                self._report_illegal()
+        return cycle_count
+
+    def _report_illegal(self):
+        pc = (self.PC - 1) & 0xFFFF
+        print(f"Unknown opcode: 0x{self.mem[pc]:02X} at PC=0x{pc:04X}")
+
+    def load_program(self, program, start_address=0x0200):
+        """Load program into memory"""
+        data = bytes(program)
+        self.memory[start_address:start_address + len(data)] = data
+        self.PC = start_address
+
+    def dump_registers(self):
+        """Print register state"""
+        print(f"A={self.A:02X} B={self.B:02X} C={self.C:02X} D={self.D:02X}")
+        print(f"X={self.X:02X} Y={self.Y:02X} SP={self.SP:02X} PC={self.PC:04X}")
+        print(f"Flags: Z={self.FLAG_ZERO} C={self.FLAG_CARRY} N={self.FLAG_NEGATIVE}")
+        print(f"Cycles: {self.cycles}")
+
+
+# === INSTRUCTION IMPLEMENTATIONS ===
+
+cdef inline unsigned char _add(Neiler8CPU c, unsigned int a, unsigned int b) noexcept:
+    cdef unsigned int result = a + b
+    c.FLAG_CARRY = result > 0xFF
+    c.update_flags(<unsigned char>result)
+    return <unsigned char>result
+
+cdef inline unsigned char _sub(Neiler8CPU c, int a, int b) noexcept:
+    cdef int result = a - b
+    c.FLAG_CARRY = result < 0
+    c.update_flags(<unsigned char>result)
+    return <unsigned char>result
+
+cdef inline void _push(Neiler8CPU c, unsigned char value) noexcept:
+    c.mem[0x0100 + c.SP] = value
+    c.SP -= 1
+
+cdef inline unsigned char _pop(Neiler8CPU c) noexcept:
+    c.SP += 1
+    return c.mem[0x0100 + c.SP]
+
+cdef void op_nop(Neiler8CPU c) noexcept:
+    pass
+
+cdef void op_mov_a_imm(Neiler8CPU c) noexcept:
+    c.A = c.fetch_byte(); c.update_flags(c.A)
+cdef void op_mov_b_imm(Neiler8CPU c) noexcept:
+    c.B = c.fetch_byte(); c.update_flags(c.B)
+cdef void op_mov_c_imm(Neiler8CPU c) noexcept:
+    c.C = c.fetch_byte(); c.update_flags(c.C)
+cdef void op_mov_d_imm(Neiler8CPU c) noexcept:
+    c.D = c.fetch_byte(); c.update_flags(c.D)
+cdef void op_mov_x_imm(Neiler8CPU c) noexcept:
+    c.X = c.fetch_byte(); c.update_flags(c.X)
+cdef void op_mov_y_imm(Neiler8CPU c) noexcept:
+    c.Y = c.fetch_byte(); c.update_flags(c.Y)
+
+cdef void op_mov_a_b(Neiler8CPU c) noexcept:
+    c.A = c.B; c.update_flags(c.A)
+cdef void op_mov_a_c(Neiler8CPU c) noexcept:
+    c.A = c.C; c.update_flags(c.A)
+cdef void op_mov_b_a(Neiler8CPU c) noexcept:
+    c.B = c.A; c.update_flags(c.B)
+cdef void op_mov_c_a(Neiler8CPU c) noexcept:
+    c.C = c.A; c.update_flags(c.C)
+
+cdef void op_load_a_addr(Neiler8CPU c) noexcept:
+    c.A = c.mem[c.fetch_word()]; c.update_flags(c.A)
+cdef void op_load_b_addr(Neiler8CPU c) noexcept:
+    c.B = c.mem[c.fetch_word()]; c.update_flags(c.B)
+cdef void op_store_a_addr(Neiler8CPU c) noexcept:
+    c.mem[c.fetch_word()] = c.A
+cdef void op_store_b_addr(Neiler8CPU c) noexcept:
+    c.mem[c.fetch_word()] = c.B
+
+cdef void op_load_a_x(Neiler8CPU c) noexcept:
+    c.A = c.mem[c.X]; c.update_flags(c.A)
+cdef void op_load_a_y(Neiler8CPU c) noexcept:
+    c.A = c.mem[c.Y]; c.update_flags(c.A)
+cdef void op_store_a_x(Neiler8CPU c) noexcept:
+    c.mem[c.X] = c.A
+cdef void op_store_a_y(Neiler8CPU c) noexcept:
+    c.mem[c.Y] = c.A
+
+cdef void op_push_a(Neiler8CPU c) noexcept:
+    _push(c, c.A)
+cdef void op_push_b(Neiler8CPU c) noexcept:
+    _push(c, c.B)
+cdef void op_pop_a(Neiler8CPU c) noexcept:
+    c.A = _pop(c); c.update_flags(c.A)
+cdef void op_pop_b(Neiler8CPU c) noexcept:
+    c.B = _pop(c); c.update_flags(c.B)
+
+cdef void op_add_a_b(Neiler8CPU c) noexcept:
+    cdef unsigned int result = c.A + c.B
+    c.FLAG_OVERFLOW = ((c.A ^ result) & (c.B ^ result) & 0x80) != 0
+    c.A = _add(c, c.A, c.B)
+cdef void op_add_a_imm(Neiler8CPU c) noexcept:
+    c.A = _add(c, c.A, c.fetch_byte())
+cdef void op_sub_a_b(Neiler8CPU c) noexcept:
+    c.A = _sub(c, c.A, c.B)
+cdef void op_sub_a_imm(Neiler8CPU c) noexcept:
+    c.A = _sub(c, c.A, c.fetch_byte())
+
+cdef void op_inc_a(Neiler8CPU c) noexcept:
+    c.A += 1; c.update_flags(c.A)
+cdef void op_inc_b(Neiler8CPU c) noexcept:
+    c.B += 1; c.update_flags(c.B)
+cdef void op_inc_x(Neiler8CPU c) noexcept:
+    c.X += 1; c.update_flags(c.X)
+cdef void op_inc_y(Neiler8CPU c) noexcept:
+    c.Y += 1; c.update_flags(c.Y)
+cdef void op_dec_a(Neiler8CPU c) noexcept:
+    c.A -= 1; c.update_flags(c.A)
+cdef void op_dec_b(Neiler8CPU c) noexcept:
+    c.B -= 1; c.update_flags(c.B)
+cdef void op_dec_x(Neiler8CPU c) noexcept:
+    c.X -= 1; c.update_flags(c.X)
+cdef void op_dec_y(Neiler8CPU c) noexcept:
+    c.Y -= 1; c.update_flags(c.Y)
+
+cdef void op_and_a_b(Neiler8CPU c) noexcept:
+    c.A &= c.B; c.update_flags(c.A)
+cdef void op_or_a_b(Neiler8CPU c) noexcept:
+    c.A |= c.B; c.update_flags(c.A)
+cdef void op_xor_a_b(Neiler8CPU c) noexcept:
+    c.A ^= c.B; c.update_flags(c.A)
+cdef void op_not_a(Neiler8CPU c) noexcept:
+    c.A = ~c.A; c.update_flags(c.A)
+cdef void op_shl_a(Neiler8CPU c) noexcept:
+    c.FLAG_CARRY = c.A >> 7
+    c.A <<= 1; c.update_flags(c.A)
+cdef void op_shr_a(Neiler8CPU c) noexcept:
+    c.FLAG_CARRY = c.A & 0x01
+    c.A >>= 1; c.update_flags(c.A)
+
+cdef void op_cmp_a_b(Neiler8CPU c) noexcept:
+    _sub(c, c.A, c.B)
+cdef void op_cmp_a_imm(Neiler8CPU c) noexcept:
+    _sub(c, c.A, c.fetch_byte())
+
+cdef void op_jmp(Neiler8CPU c) noexcept:
+    c.PC = c.fetch_word()
+cdef void op_jz(Neiler8CPU c) noexcept:
+    cdef unsigned short addr = c.fetch_word()
+    if c.FLAG_ZERO:
+        c.PC = addr
+cdef void op_jnz(Neiler8CPU c) noexcept:
+    cdef unsigned short addr = c.fetch_word()
+    if not c.FLAG_ZERO:
+        c.PC = addr
+cdef void op_jc(Neiler8CPU c) noexcept:
+    cdef unsigned short addr = c.fetch_word()
+    if c.FLAG_CARRY:
+        c.PC = addr
+cdef void op_jnc(Neiler8CPU c) noexcept:
+    cdef unsigned short addr = c.fetch_word()
+    if not c.FLAG_CARRY:
+        c.PC = addr
+cdef void op_jn(Neiler8CPU c) noexcept:
+    cdef unsigned short addr = c.fetch_word()
+    if c.FLAG_NEGATIVE:
+        c.PC = addr
+
+cdef void op_call(Neiler8CPU c) noexcept:
+    cdef unsigned short addr = c.fetch_word()
+    _push(c, c.PC >> 8)
+    _push(c, c.PC & 0xFF)
+    c.PC = addr
+cdef void op_ret(Neiler8CPU c) noexcept:
+    cdef unsigned short low = _pop(c)
+    cdef unsigned short high = _pop(c)
+    c.PC = (high << 8) | low
+
+cdef void op_in_a(Neiler8CPU c) noexcept:
+    c.A = c.io[c.fetch_byte()]; c.update_flags(c.A)
+cdef void op_out_a(Neiler8CPU c) noexcept:
+    c.io[c.fetch_byte()] = c.A
+
+cdef void op_hlt(Neiler8CPU c) noexcept:
+    c.halted = True
+
+
+cdef void _init_dispatch() noexcept:
+    cdef int i
+    for i in range(256):
+        DISPATCH[i] = NULL
+
+    DISPATCH[0x00] = op_nop
+    DISPATCH[0x01] = op_mov_a_imm
+    DISPATCH[0x02] = op_mov_b_imm
+    DISPATCH[0x03] = op_mov_c_imm
+    DISPATCH[0x04] = op_mov_d_imm
+    DISPATCH[0x05] = op_mov_x_imm
+    DISPATCH[0x06] = op_mov_y_imm
+    DISPATCH[0x10] = op_mov_a_b
+    DISPATCH[0x11] = op_mov_a_c
+    DISPATCH[0x12] = op_mov_b_a
+    DISPATCH[0x13] = op_mov_c_a
+    DISPATCH[0x20] = op_load_a_addr
+    DISPATCH[0x21] = op_load_b_addr
+    DISPATCH[0x22] = op_store_a_addr
+    DISPATCH[0x23] = op_store_b_addr
+    DISPATCH[0x24] = op_load_a_x
+    DISPATCH[0x25] = op_load_a_y
+    DISPATCH[0x26] = op_store_a_x
+    DISPATCH[0x27] = op_store_a_y
+    DISPATCH[0x30] = op_push_a
+    DISPATCH[0x31] = op_push_b
+    DISPATCH[0x32] = op_pop_a
+    DISPATCH[0x33] = op_pop_b
+    DISPATCH[0x40] = op_add_a_b
+    DISPATCH[0x41] = op_add_a_imm
+    DISPATCH[0x42] = op_sub_a_b
+    DISPATCH[0x43] = op_sub_a_imm
+    DISPATCH[0x44] = op_inc_a
+    DISPATCH[0x45] = op_inc_b
+    DISPATCH[0x46] = op_inc_x
+    DISPATCH[0x47] = op_inc_y
+    DISPATCH[0x48] = op_dec_a
+    DISPATCH[0x49] = op_dec_b
+    DISPATCH[0x4A] = op_dec_x
+    DISPATCH[0x4B] = op_dec_y
+    DISPATCH[0x50] = op_and_a_b
+    DISPATCH[0x51] = op_or_a_b
+    DISPATCH[0x52] = op_xor_a_b
+    DISPATCH[0x53] = op_not_a
+    DISPATCH[0x54] = op_shl_a
+    DISPATCH[0x55] = op_shr_a
+    DISPATCH[0x60] = op_cmp_a_b
+    DISPATCH[0x61] = op_cmp_a_imm
+    DISPATCH[0x70] = op_jmp
+    DISPATCH[0x71] = op_jz
+    DISPATCH[0x72] = op_jnz
+    DISPATCH[0x73] = op_jc
+    DISPATCH[0x74] = op_jnc
+    DISPATCH[0x75] = op_jn
+    DISPATCH[0x80] = op_call
+    DISPATCH[0x81] = op_ret
+    DISPATCH[0x90] = op_in_a
+    DISPATCH[0x91] = op_out_a
+    DISPATCH[0xFF] = op_hlt
+
+
+_init_dispatch()
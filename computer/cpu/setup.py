@@ -0,0 +1,21 @@
+"""
+Build script for the compiled Neiler-8 CPU core
+
+Usage: python setup.py build_ext --inplace
+"""
+
+from setuptools import setup
+from Cython.Build import cythonize
+
+setup(
+    name="neiler8-core",
+    ext_modules=cythonize(
+        "neiler8_core.pyx",
+        compiler_directives={
+            'language_level': 3,
+            'boundscheck': False,
+            'wraparound': False,
+            'cdivision': True,
+        },
+    ),
+)
@@ -7,7 +7,10 @@ Complete emulator with visual display, CPU state, and memory viewer
 import sys
 import os
 import pygame
+import numpy as np
 import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Add parent directory to path
@@ -26,6 +29,7 @@ except ImportError:
 SCREEN_WIDTH = 1280
 SCREEN_HEIGHT = 720
 FPS = 60
+IDLE_FPS = 10  # while paused, stepping, halted or in the background
 
 # Neiler display size (320x200 or 640x480)
 NEILER_WIDTH = 320
@@ -42,6 +46,18 @@ RED = (200, 0, 0)
 GRAY = (50, 50, 50)
 LIGHT_GRAY = (100, 100, 100)
 
+# CPU state shown by the panels, copied so drawing can overlap a CPU run
+CPUView = namedtuple('CPUView', ['A', 'B', 'C', 'D', 'X', 'Y', 'PC', 'SP',
+                                 'FLAG_ZERO', 'FLAG_CARRY', 'FLAG_NEGATIVE',
+                                 'FLAG_OVERFLOW', 'halted', 'memory'])
+
+
+def _latest_write(ports, values, port, initial):
+    """Value of port after each logged write (initial before the first)"""
+    last = np.where(ports == port, np.arange(len(ports)), -1)
+    np.maximum.accumulate(last, out=last)
+    return np.where(last >= 0, values[last], initial)
+
 
 class NeilerEmulator:
     """Complete Neiler-64 emulator with graphical interface"""
@@ -53,14 +69,37 @@ class NeilerEmulator:
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("Neiler-64 Emulator")
 
+        # Only queue the events handle_input() acts on (no mouse motion etc.)
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed([pygame.QUIT, pygame.KEYDOWN, pygame.VIDEOEXPOSE])
+
         # Create Neiler CPU and GPU
-        self.cpu = Neiler8CPU()
+        self.reset_cpu()
         self.gpu = NeilerGPU() if NeilerGPU else None
 
-        # Create Neiler display surface
-        self.neiler_display = pygame.Surface((NEILER_WIDTH, NEILER_HEIGHT))
+        # Create Neiler display surface (32-bit, matching the framebuffer)
+        self.neiler_display = pygame.Surface((NEILER_WIDTH, NEILER_HEIGHT), 0, 32)
         self.neiler_display.fill(BLACK)
 
+        # Scaled copy of the display, redrawn only when the framebuffer changes
+        self.scaled_display = pygame.Surface((NEILER_WIDTH * NEILER_SCALE,
+                                              NEILER_HEIGHT * NEILER_SCALE))
+
+        # Color index -> RGB palette, and the same colors as display pixels
+        idx = np.arange(256, dtype=np.uint16)
+        self.palette = np.stack([(idx * 37) & 255,
+                                 (idx * 73) & 255,
+                                 (idx * 109) & 255], axis=1).astype(np.uint8)
+        self.palette32 = np.array([self.neiler_display.map_rgb(tuple(rgb))
+                                   for rgb in self.palette.tolist()],
+                                  dtype=np.uint32)
+
+        # Framebuffer (rows, columns) of display pixels, copied to the
+        # surface as-is once per frame
+        self.fb = np.full((NEILER_HEIGHT, NEILER_WIDTH),
+                          self.neiler_display.map_rgb(BLACK), dtype=np.uint32)
+        self.fb_dirty = True
+
         # Emulator state
         self.running = True
         self.paused = False
@@ -69,6 +108,42 @@ class NeilerEmulator:
         self.font = pygame.font.Font(None, 24)
         self.small_font = pygame.font.Font(None, 18)
 
+        # Text that never changes, rendered once
+        help_line = ("[SPACE] Pause | [S] Step Mode | [N] Next | [R] Reset | "
+                     "[+/-] Speed | [ESC] Quit")
+        self.static_text = {
+            'display_label': self.font.render("Neiler-64 Display", True, GREEN),
+            'cpu_state': self.font.render("CPU STATE", True, WHITE),
+            'mem_viewer': self.font.render("MEMORY VIEWER", True, WHITE),
+        }
+        for status in ('PAUSED', 'HALTED', 'RUNNING'):
+            self.static_text[status] = self.small_font.render(
+                f"Status: {status} | {help_line}", True, LIGHT_GRAY)
+
+        # Byte glyphs "00".."FF" for the memory viewer, on a fixed pitch
+        self.hex_glyphs = [self.small_font.render(f"{b:02X}", True, LIGHT_GRAY)
+                           for b in range(256)]
+        self.hex_pitch = (max(glyph.get_width() for glyph in self.hex_glyphs)
+                          + self.small_font.size(" ")[0])
+
+        # CPU panel pieces: "A: 0x" labels followed by byte glyphs, the
+        # " (decimal)" suffixes, and every possible flags line
+        self.reg_label_surfs = {
+            name: self.small_font.render(f"{name}: 0x", True, LIGHT_GRAY)
+            for name in ('A', 'B', 'C', 'D', 'X', 'Y', 'PC', 'SP')}
+        self.dec_glyphs = [self.small_font.render(f" ({b:3d})", True, LIGHT_GRAY)
+                           for b in range(256)]
+        self.flag_lines = {
+            (first, second, a, b): self.small_font.render(
+                f"  {first}:{a} {second}:{b}", True, LIGHT_GRAY)
+            for first, second in (('Z', 'C'), ('N', 'O'))
+            for a in (0, 1) for b in (0, 1)}
+        self.static_text['flags'] = self.small_font.render("Flags:", True, LIGHT_GRAY)
+
+        # Status bar background, blitted under the text each time it changes
+        self.status_bg = pygame.Surface((SCREEN_WIDTH, 60))
+        self.status_bg.fill(GRAY)
+
         # Performance tracking
         self.cycles_per_frame = 1000  # CPU cycles per frame
         self.total_cycles = 0
@@ -77,9 +152,25 @@ class NeilerEmulator:
         # Memory viewer
         self.memory_offset = 0
         self.memory_view_size = 256
+        self._addr_labels = None  # (memory_offset, rendered address column)
+
+        # Dirty tracking: what each panel last drew (None forces a redraw)
+        self.redraw_all = True
+        self._drawn_regs = None
+        self._drawn_memory = None
+        self._drawn_status = None
+
+        # Worker thread running the CPU while the previous frame is drawn
+        self.cpu_worker = ThreadPoolExecutor(max_workers=1)
 
         # Load demo program
         self.load_demo_program()
+        self.snapshot_cpu()
+
+    def reset_cpu(self):
+        """Create a fresh CPU that records its OUT writes for the GPU"""
+        self.cpu = Neiler8CPU()
+        self.cpu.out_log = bytearray()
 
     def load_demo_program(self):
         """Load a demo program"""
@@ -118,7 +209,7 @@ class NeilerEmulator:
         """Load program from binary file"""
         try:
             with open(filename, 'rb') as f:
-                program = list(f.read())
+                program = f.read()
             self.cpu.load_program(program)
             print(f"Loaded {filename} ({len(program)} bytes)")
         except Exception as e:
@@ -130,6 +221,9 @@ class NeilerEmulator:
             if event.type == pygame.QUIT:
                 self.running = False
 
+            elif event.type == pygame.VIDEOEXPOSE:
+                self.redraw_all = True
+
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     self.running = False
@@ -139,11 +233,10 @@ class NeilerEmulator:
                     self.step_mode = not self.step_mode
                 elif event.key == pygame.K_n and (self.paused or self.step_mode):
                     # Single step
-                    self.cpu.step()
-                    self.total_cycles += 1
+                    self.run_cpu(1)
                 elif event.key == pygame.K_r:
                     # Reset
-                    self.cpu = Neiler8CPU()
+                    self.reset_cpu()
                     self.load_demo_program()
                     self.total_cycles = 0
                 elif event.key == pygame.K_UP:
@@ -159,44 +252,95 @@ class NeilerEmulator:
                 elif event.key == pygame.K_MINUS:
                     self.cycles_per_frame = max(1, self.cycles_per_frame - 100)
 
-    def update_cpu(self):
-        """Update CPU state"""
-        if not self.paused and not self.step_mode and not self.cpu.halted:
-            for _ in range(self.cycles_per_frame):
-                if self.cpu.halted:
-                    break
-                self.cpu.step()
-                self.total_cycles += 1
-
-                # Handle GPU output
-                self.handle_gpu_output()
-
-    def handle_gpu_output(self):
-        """Handle GPU I/O port writes from CPU"""
+    def run_cpu(self, cycles):
+        """Run the CPU for up to cycles instructions and apply its draws"""
+        io = self.cpu.io_ports
+        pen = (io[0x80], io[0x81])
+        self.total_cycles += self.cpu.run(cycles)
+
+        # Handle GPU output
+        self.flush_draws(pen)
+        self.snapshot_cpu()
+
+    def start_cpu(self):
+        """Start this frame's CPU run on the worker thread
+
+        Returns the pending run for finish_cpu(), or None when the CPU is
+        not running. Until then the CPU belongs to the worker: drawing
+        only reads the snapshot and the framebuffer.
+        """
+        self.snapshot_cpu()
+        if self.paused or self.step_mode or self.cpu.halted:
+            return None
+        io = self.cpu.io_ports
+        pen = (io[0x80], io[0x81])
+        return pen, self.cpu_worker.submit(self.cpu.run, self.cycles_per_frame)
+
+    def finish_cpu(self, pending):
+        """Wait for a run from start_cpu() and apply its draws"""
+        if pending is None:
+            return
+        pen, run = pending
+        self.total_cycles += run.result()
+        self.flush_draws(pen)
+
+    def snapshot_cpu(self):
+        """Copy the CPU state shown by the panels into cpu_view"""
+        cpu = self.cpu
+        offset = self.memory_offset
+        self.cpu_view = CPUView(
+            cpu.A, cpu.B, cpu.C, cpu.D, cpu.X, cpu.Y, cpu.PC, cpu.SP,
+            cpu.FLAG_ZERO, cpu.FLAG_CARRY, cpu.FLAG_NEGATIVE, cpu.FLAG_OVERFLOW,
+            cpu.halted, bytes(cpu.memory[offset:offset + self.memory_view_size]))
+
+    def flush_draws(self, pen):
+        """Apply the GPU draw commands in the CPU's OUT log
+
+        pen is the (X, Y) port pair as it was before the logged writes.
+        """
         # GPU ports: 0x80 = X, 0x81 = Y, 0x82 = Draw pixel
-        if self.cpu.io_ports[0x82] != 0:  # Draw command
-            x = self.cpu.io_ports[0x80] % NEILER_WIDTH
-            y = self.cpu.io_ports[0x81] % NEILER_HEIGHT
-            color_index = self.cpu.io_ports[0x82]
+        log = self.cpu.out_log
+        if not log:
+            return
 
-            # Generate color from index
-            r = (color_index * 37) % 256
-            g = (color_index * 73) % 256
-            b = (color_index * 109) % 256
+        writes = np.frombuffer(log, dtype=np.uint8).astype(np.intp).reshape(-1, 2)
+        log.clear()
+        ports = writes[:, 0]
+        values = writes[:, 1]
 
-            # Draw pixel
-            self.neiler_display.set_at((x, y), (r, g, b))
+        # Draw commands take the latest X/Y written before them
+        draws = np.flatnonzero((ports == 0x82) & (values != 0))
+        if draws.size:
+            x = _latest_write(ports, values, 0x80, pen[0])[draws] % NEILER_WIDTH
+            y = _latest_write(ports, values, 0x81, pen[1])[draws] % NEILER_HEIGHT
+            color_index = values[draws]
 
-            # Clear draw command
-            self.cpu.io_ports[0x82] = 0
+            # Draw pixels (later draws to the same pixel win)
+            self.fb[y, x] = self.palette32[color_index]
+            self.fb_dirty = True
+
+        # Clear draw command
+        self.cpu.io_ports[0x82] = 0
 
     def draw_neiler_screen(self):
-        """Draw the Neiler display"""
-        # Scale and blit Neiler display
-        scaled_display = pygame.transform.scale(
-            self.neiler_display,
-            (NEILER_WIDTH * NEILER_SCALE, NEILER_HEIGHT * NEILER_SCALE)
-        )
+        """Draw the Neiler display, returning the rect drawn (None if unchanged)"""
+        if not (self.fb_dirty or self.redraw_all):
+            return None
+
+        if self.fb_dirty:
+            # Publish the framebuffer (surfarray is indexed [x, y])
+            pygame.surfarray.blit_array(self.neiler_display, self.fb.T)
+
+            # Scale into the persistent display surface
+            pygame.transform.scale(self.neiler_display,
+                                   self.scaled_display.get_size(),
+                                   self.scaled_display)
+            self.fb_dirty = False
+
+        # Draw display
+        display_rect = self.screen.blit(self.scaled_display, (12, 12))
+        if not self.redraw_all:
+            return display_rect
 
         # Draw border
         border_rect = pygame.Rect(10, 10,
@@ -204,105 +348,134 @@ class NeilerEmulator:
                                   NEILER_HEIGHT * NEILER_SCALE + 4)
         pygame.draw.rect(self.screen, GREEN, border_rect, 2)
 
-        # Draw display
-        self.screen.blit(scaled_display, (12, 12))
-
         # Label
-        label = self.font.render("Neiler-64 Display", True, GREEN)
-        self.screen.blit(label, (12, border_rect.bottom + 5))
+        label_rect = self.screen.blit(self.static_text['display_label'],
+                                      (12, border_rect.bottom + 5))
+        return border_rect.union(label_rect)
 
     def draw_cpu_state(self):
-        """Draw CPU register state"""
+        """Draw CPU register state, returning the rect drawn (None if unchanged)"""
+        cpu = self.cpu_view
+        regs = cpu[:-1]  # everything but the memory window
+        if regs == self._drawn_regs and not self.redraw_all:
+            return None
+        self._drawn_regs = regs
+
         x_offset = NEILER_WIDTH * NEILER_SCALE + 40
         y_offset = 20
+        panel = pygame.Rect(x_offset, y_offset, SCREEN_WIDTH - x_offset, 300)
+        self.screen.fill(BLACK, panel)
 
         # Title
-        title = self.font.render("CPU STATE", True, WHITE)
-        self.screen.blit(title, (x_offset, y_offset))
+        self.screen.blit(self.static_text['cpu_state'], (x_offset, y_offset))
         y_offset += 30
 
-        # Registers
-        registers = [
-            f"A: 0x{self.cpu.A:02X} ({self.cpu.A:3d})",
-            f"B: 0x{self.cpu.B:02X} ({self.cpu.B:3d})",
-            f"C: 0x{self.cpu.C:02X} ({self.cpu.C:3d})",
-            f"D: 0x{self.cpu.D:02X} ({self.cpu.D:3d})",
-            f"X: 0x{self.cpu.X:02X} ({self.cpu.X:3d})",
-            f"Y: 0x{self.cpu.Y:02X} ({self.cpu.Y:3d})",
-            "",
-            f"PC: 0x{self.cpu.PC:04X}",
-            f"SP: 0x{self.cpu.SP:02X}",
-            "",
-            f"Flags:",
-            f"  Z:{self.cpu.FLAG_ZERO} C:{self.cpu.FLAG_CARRY}",
-            f"  N:{self.cpu.FLAG_NEGATIVE} O:{self.cpu.FLAG_OVERFLOW}",
-        ]
-
-        for i, line in enumerate(registers):
-            color = LIGHT_GRAY if line else GRAY
-            text = self.small_font.render(line, True, color)
-            self.screen.blit(text, (x_offset, y_offset + i * 20))
+        # Registers: cached labels and glyphs, one blits() call
+        labels = self.reg_label_surfs
+        hex_glyphs = self.hex_glyphs
+        seq = []
+        for row, name in enumerate(('A', 'B', 'C', 'D', 'X', 'Y')):
+            value = getattr(cpu, name)
+            y = y_offset + row * 20
+            x = x_offset + labels[name].get_width()
+            seq += [(labels[name], (x_offset, y)),
+                    (hex_glyphs[value], (x, y)),
+                    (self.dec_glyphs[value], (x + hex_glyphs[value].get_width(), y))]
+
+        y = y_offset + 7 * 20
+        x = x_offset + labels['PC'].get_width()
+        high = hex_glyphs[cpu.PC >> 8]
+        seq += [(labels['PC'], (x_offset, y)),
+                (high, (x, y)),
+                (hex_glyphs[cpu.PC & 0xFF], (x + high.get_width(), y))]
+
+        y = y_offset + 8 * 20
+        seq += [(labels['SP'], (x_offset, y)),
+                (hex_glyphs[cpu.SP], (x_offset + labels['SP'].get_width(), y))]
+
+        seq += [(self.static_text['flags'], (x_offset, y_offset + 10 * 20)),
+                (self.flag_lines['Z', 'C', cpu.FLAG_ZERO, cpu.FLAG_CARRY],
+                 (x_offset, y_offset + 11 * 20)),
+                (self.flag_lines['N', 'O', cpu.FLAG_NEGATIVE, cpu.FLAG_OVERFLOW],
+                 (x_offset, y_offset + 12 * 20))]
+        self.screen.blits(seq, doreturn=False)
+
+        return panel
 
     def draw_memory_viewer(self):
-        """Draw memory viewer"""
+        """Draw memory viewer, returning the rect drawn (None if unchanged)"""
+        window = (self.memory_offset, self.cpu_view.memory)
+        if window == self._drawn_memory and not self.redraw_all:
+            return None
+        self._drawn_memory = window
+
         x_offset = NEILER_WIDTH * NEILER_SCALE + 40
         y_offset = 320
+        panel = pygame.Rect(x_offset, y_offset, SCREEN_WIDTH - x_offset,
+                            SCREEN_HEIGHT - 60 - y_offset)
+        self.screen.fill(BLACK, panel)
 
         # Title
-        title = self.font.render("MEMORY VIEWER", True, WHITE)
-        self.screen.blit(title, (x_offset, y_offset))
+        self.screen.blit(self.static_text['mem_viewer'], (x_offset, y_offset))
         y_offset += 30
 
-        # Memory dump
-        for row in range(16):
-            addr = self.memory_offset + (row * 16)
-
-            # Address
-            addr_text = self.small_font.render(f"{addr:04X}:", True, BLUE)
-            self.screen.blit(addr_text, (x_offset, y_offset + row * 18))
-
-            # Bytes
-            bytes_str = ""
-            for col in range(16):
-                byte_addr = addr + col
-                if byte_addr < len(self.cpu.memory):
-                    byte = self.cpu.memory[byte_addr]
-                    bytes_str += f"{byte:02X} "
-
-            bytes_text = self.small_font.render(bytes_str, True, LIGHT_GRAY)
-            self.screen.blit(bytes_text, (x_offset + 50, y_offset + row * 18))
+        # Address column, re-rendered only when the view scrolls
+        offset = self.memory_offset
+        if self._addr_labels is None or self._addr_labels[0] != offset:
+            self._addr_labels = (offset, [
+                self.small_font.render(f"{offset + row * 16:04X}:", True, BLUE)
+                for row in range(16)])
+        labels = self._addr_labels[1]
+
+        # Memory dump: one pre-rendered glyph per byte
+        glyphs = self.hex_glyphs
+        pitch = self.hex_pitch
+        data = self.cpu_view.memory
+        seq = [(labels[row], (x_offset, y_offset + row * 18)) for row in range(16)]
+        seq += [(glyphs[byte], (x_offset + 50 + (i & 15) * pitch,
+                                y_offset + (i >> 4) * 18))
+                for i, byte in enumerate(data)]
+        self.screen.blits(seq, doreturn=False)
+        return panel
 
     def draw_status_bar(self):
-        """Draw status bar with info"""
+        """Draw status bar with info, returning the rect drawn (None if unchanged)"""
+        status = 'PAUSED' if self.paused else 'HALTED' if self.cpu_view.halted else 'RUNNING'
+        info = (f"Cycles: {self.total_cycles:,} | Speed: {self.cycles_per_frame} "
+                f"cyc/frame | FPS: {self.fps:.1f}")
+        if (info, status) == self._drawn_status and not self.redraw_all:
+            return None
+        self._drawn_status = (info, status)
+
         y_offset = SCREEN_HEIGHT - 60
 
         # Background
-        pygame.draw.rect(self.screen, GRAY, (0, y_offset, SCREEN_WIDTH, 60))
+        bar = self.screen.blit(self.status_bg, (0, y_offset))
 
         # Status info
-        status_lines = [
-            f"Cycles: {self.total_cycles:,} | Speed: {self.cycles_per_frame} cyc/frame | FPS: {self.fps:.1f}",
-            f"Status: {'PAUSED' if self.paused else 'HALTED' if self.cpu.halted else 'RUNNING'} | "
-            f"[SPACE] Pause | [S] Step Mode | [N] Next | [R] Reset | [+/-] Speed | [ESC] Quit"
-        ]
-
-        for i, line in enumerate(status_lines):
-            text = self.small_font.render(line, True, WHITE if i == 0 else LIGHT_GRAY)
-            self.screen.blit(text, (10, y_offset + 10 + i * 20))
+        self.screen.blit(self.small_font.render(info, True, WHITE),
+                         (10, y_offset + 10))
+        self.screen.blit(self.static_text[status], (10, y_offset + 30))
+        return bar
 
     def draw(self):
-        """Draw everything"""
+        """Draw everything that changed since the last frame"""
         # Clear screen
-        self.screen.fill(BLACK)
+        if self.redraw_all:
+            self.screen.fill(BLACK)
 
         # Draw components
-        self.draw_neiler_screen()
-        self.draw_cpu_state()
-        self.draw_memory_viewer()
-        self.draw_status_bar()
+        rects = [self.draw_neiler_screen(), self.draw_cpu_state(),
+                 self.draw_memory_viewer(), self.draw_status_bar()]
 
         # Update display
-        pygame.display.flip()
+        if self.redraw_all:
+            pygame.display.flip()
+            self.redraw_all = False
+        else:
+            dirty = [rect for rect in rects if rect is not None]
+            if dirty:
+                pygame.display.update(dirty)
 
     def run(self):
         """Main emulator loop"""
@@ -323,16 +496,23 @@ class NeilerEmulator:
             # Handle input
             self.handle_input()
 
-            # Update CPU
-            self.update_cpu()
-
-            # Draw
-            self.draw()
+            idle = (self.paused or self.step_mode or self.cpu.halted
+                    or not pygame.key.get_focused())
+            if idle:
+                # Nothing runs: just keep panels in sync with input
+                self.snapshot_cpu()
+                self.draw()
+            else:
+                # Run the CPU on the worker thread while drawing
+                pending = self.start_cpu()
+                self.draw()
+                self.finish_cpu(pending)
 
             # Maintain FPS
             self.fps = self.clock.get_fps()
-            self.clock.tick(FPS)
+            self.clock.tick(IDLE_FPS if idle else FPS)
 
+        self.cpu_worker.shutdown()
         pygame.quit()
         print("\nEmulator stopped.")
         print(f"Total cycles executed: {self.total_cycles:,}")
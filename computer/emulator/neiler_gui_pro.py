@@ -6,17 +6,18 @@ Advanced emulator with complete visualization of CPU, GPU, Memory, and more
 
 import sys
 import os
+import asyncio
 import pygame
+import numpy as np
 import time
 from pathlib import Path
-from collections import deque
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent / 'cpu'))
 sys.path.insert(0, str(Path(__file__).parent.parent / 'gpu'))
 
 try:
-    from neiler8 import Neiler8CPU
+    from neiler8 import Neiler8CPU, P_ZERO, P_CARRY, P_NEGATIVE, P_OVERFLOW
 except ImportError:
     print("Error: Could not import Neiler CPU module")
     sys.exit(1)
@@ -25,6 +26,10 @@ except ImportError:
 SCREEN_WIDTH = 1920
 SCREEN_HEIGHT = 1080
 FPS = 60
+IDLE_FPS = 10  # while the CPU is paused, stepping or halted
+DRAW_EVERY = 2  # frames per redraw (panels update at FPS / DRAW_EVERY)
+CPU_SLICE = 1000  # cycles run between yields to input handling
+INPUT_INTERVAL = 1 / 240  # seconds between event polls
 
 # Layout
 PANEL_MARGIN = 10
@@ -35,6 +40,13 @@ NEILER_WIDTH = 320
 NEILER_HEIGHT = 200
 NEILER_SCALE = 3
 
+# Flags shown in the CPU panel, as (name, bit in the status byte P)
+FLAG_BITS = (('Z', P_ZERO), ('C', P_CARRY), ('N', P_NEGATIVE), ('O', P_OVERFLOW))
+
+# History buffers (instruction ring size is a power of two)
+HISTORY_SIZE = 64
+FPS_HISTORY = 100
+
 # Colors - Professional dark theme
 BG_COLOR = (20, 20, 25)
 PANEL_BG = (30, 30, 35)
@@ -71,12 +83,31 @@ OPCODE_NAMES = {
 }
 
 
+def _latest_write(ports, values, port, initial):
+    """Value of port after each logged write (initial before the first)"""
+    last = np.where(ports == port, np.arange(len(ports)), -1)
+    np.maximum.accumulate(last, out=last)
+    return np.where(last >= 0, values[last], initial)
+
+
 class Panel:
     """Base panel class"""
     def __init__(self, x, y, width, height, title=""):
         self.rect = pygame.Rect(x, y, width, height)
         self.title = title
         self.surface = pygame.Surface((width, height))
+        self.state = None  # what the panel showed when last drawn
+
+    def needs_redraw(self, state):
+        """Record state, returning whether it differs from the last draw"""
+        if state == self.state:
+            return False
+        self.state = state
+        return True
+
+    def invalidate(self):
+        """Force a redraw on the next frame"""
+        self.state = None
 
     def draw_border(self, screen):
         """Draw panel border and background"""
@@ -102,29 +133,77 @@ class NeilerGUIPro:
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("Neiler-64 Professional Emulator - Full System View")
 
+        # Held keys repeat (speed, stepping); memory scrolling instead
+        # follows the arrow keys' held state once per frame
+        pygame.key.set_repeat(300, 20)
+
         # Fonts
         self.font_large = pygame.font.Font(None, 28)
         self.font_medium = pygame.font.Font(None, 24)
         self.font_small = pygame.font.Font(None, 20)
         self.font_mono = pygame.font.SysFont('courier', 18)
 
+        # Glyph atlases, rendered once: byte glyphs "00".."FF" in the colors
+        # the panels use, printable characters for the ASCII column, the
+        # stack rows' "01FF: 0x" labels and a mnemonic per opcode
+        mono = self.font_mono
+        self.hex_glyphs = {color: [mono.render(f"{b:02X}", True, color) for b in range(256)]
+                           for color in (TEXT_COLOR, TEXT_DIM, SUCCESS_COLOR)}
+        self.hex_pitch = mono.size("00 ")[0]
+        self.ascii_glyphs = [mono.render(chr(b) if 32 <= b < 127 else '.', True, TEXT_DIM)
+                             for b in range(256)]
+        self.ascii_pitch = mono.size("0")[0]
+        self.stack_labels = {color: [mono.render(f"{0x01FF - i:04X}: 0x", True, color)
+                                     for i in range(12)]
+                             for color in (TEXT_COLOR, SUCCESS_COLOR)}
+        self.sp_marker = mono.render("← SP", True, WARNING_COLOR)
+        self.pc_marker = mono.render("►", True, WARNING_COLOR)
+        self.disasm_name_surfs = [mono.render(OPCODE_NAMES.get(op, f"DB 0x{op:02X}"),
+                                              True, SUCCESS_COLOR)
+                                  for op in range(256)]
+
+        # "Z:0" / "Z:1" etc. for each flag; I/O port lines are cached by
+        # (port, value) the first time they are shown (at most 16 * 256)
+        self.flag_surfs = {(name, bit): mono.render(f"{name}:{bit}", True,
+                                                    SUCCESS_COLOR if bit else TEXT_DIM)
+                           for name, _ in FLAG_BITS for bit in (0, 1)}
+        self.flags_label = self.font_small.render("FLAGS:", True, TEXT_DIM)
+        self.io_line_cache = {}
+        self._addr_labels = None  # (memory_offset, address column surfaces)
+
         # Create CPU and surfaces
-        self.cpu = Neiler8CPU()
-        self.neiler_display = pygame.Surface((NEILER_WIDTH, NEILER_HEIGHT))
+        self.reset_cpu()
+        self.neiler_display = pygame.Surface((NEILER_WIDTH, NEILER_HEIGHT), 0, 32)
         self.neiler_display.fill((0, 0, 0))
+        self.display_dirty = True
+
+        # Scaled copy of the display, rescaled only when pixels change
+        self.scaled_display = pygame.Surface((NEILER_WIDTH * NEILER_SCALE,
+                                              NEILER_HEIGHT * NEILER_SCALE), 0, 32)
+
+        # Color index -> RGB palette
+        idx = np.arange(256, dtype=np.uint16)
+        self.palette = np.stack([(idx * 37) & 255,
+                                 (idx * 73) & 255,
+                                 (idx * 109) & 255], axis=1).astype(np.uint8)
 
         # State
         self.running = True
+        self.redraw_all = True
         self.paused = False
         self.step_mode = False
+        self.turbo = False  # run the CPU flat out without drawing
+        self.frame_idx = 0
         self.clock = pygame.time.Clock()
 
         # Performance
-        self.cycles_per_frame = 500
+        self.cycles_per_frame = 1000
         self.total_cycles = 0
         self.fps = 60
-        self.cycle_history = deque(maxlen=100)
-        self.fps_history = deque(maxlen=100))
+        # Last FPS_HISTORY frame rates, oldest first; fps_count are valid
+        self.fps_history = np.zeros(FPS_HISTORY)
+        self.fps_count = 0
+        self._graph_xs = np.empty(0)  # perf graph x positions, see draw_perf_panel
 
         # Memory/stack viewing
         self.memory_offset = 0x0200  # Start at program
@@ -133,8 +212,11 @@ class NeilerGUIPro:
         # Breakpoints
         self.breakpoints = set()
 
-        # History
-        self.instruction_history = deque(maxlen=50)
+        # History: ring of (PC, opcode) pairs; hist_head counts the pairs
+        # recorded, the next one goes to slot hist_head & (HISTORY_SIZE - 1)
+        self.hist_pc = np.zeros(HISTORY_SIZE, dtype=np.uint16)
+        self.hist_op = np.zeros(HISTORY_SIZE, dtype=np.uint8)
+        self.hist_head = 0
 
         # Layout panels
         self.create_panels()
@@ -142,6 +224,9 @@ class NeilerGUIPro:
         # Load demo
         self.load_demo_program()
 
+        # Compile the CPU loop now rather than in the first frame
+        Neiler8CPU().run(1)
+
     def create_panels(self):
         """Create UI panels"""
         # Main display (top left) - GPU output
@@ -211,6 +296,48 @@ class NeilerGUIPro:
             "CONTROLS"
         )
 
+        # Rects that never move: CRT border, register boxes, the margin
+        # strips cleared with the memory and disassembly panels, the graph
+        x = self.display_panel.rect.x + 20
+        y = self.display_panel.rect.y + 50
+        self.crt_rect = pygame.Rect(x - 2, y - 2,
+                                    NEILER_WIDTH * NEILER_SCALE + 4,
+                                    NEILER_HEIGHT * NEILER_SCALE + 4)
+        x = self.cpu_panel.rect.x + PANEL_PADDING
+        y = self.cpu_panel.rect.y + 50
+        self.reg_box_rects = [pygame.Rect(x + (i % 2) * 180, y + (i // 2) * 60, 160, 45)
+                              for i in range(6)]
+        rect = self.memory_panel.rect
+        self.memory_margin = pygame.Rect(rect.right, rect.y, PANEL_MARGIN, rect.height)
+        self.memory_update_rect = rect.union(self.memory_margin)
+        rect = self.disasm_panel.rect
+        self.disasm_margin = pygame.Rect(rect.x - PANEL_MARGIN, rect.y,
+                                         PANEL_MARGIN, rect.height)
+        self.disasm_update_rect = rect.union(self.disasm_margin)
+        self.graph_rect = pygame.Rect(self.perf_panel.rect.x + PANEL_PADDING,
+                                      self.perf_panel.rect.y + 170, 700, 80)
+
+        # Row highlight bars, moved by setting y before drawing
+        self._hl_rect_mem = pygame.Rect(self.memory_panel.rect.x + PANEL_PADDING, 0,
+                                        self.memory_panel.rect.width - 30, 20)
+        self._hl_rect_stack = pygame.Rect(self.stack_panel.rect.x + PANEL_PADDING, 0,
+                                          350, 20)
+        self._hl_rect_disasm = pygame.Rect(self.disasm_panel.rect.x + PANEL_PADDING, 0,
+                                           550, 20)
+
+        # Screen positions of the memory viewer's 20x16 byte and ASCII glyphs
+        x = self.memory_panel.rect.x + PANEL_PADDING
+        y = self.memory_panel.rect.y + 50
+        self.mem_hex_pos = [(x + 60 + col * self.hex_pitch, y + row * 20)
+                            for row in range(20) for col in range(16)]
+        self.mem_ascii_pos = [(x + 450 + col * self.ascii_pitch, y + row * 20)
+                              for row in range(20) for col in range(16)]
+
+    def reset_cpu(self):
+        """Create a fresh CPU that records its OUT writes for the GPU"""
+        self.cpu = Neiler8CPU()
+        self.cpu.out_log = bytearray()
+
     def load_demo_program(self):
         """Load demo program"""
         program = [
@@ -239,6 +366,9 @@ class NeilerGUIPro:
             if event.type == pygame.QUIT:
                 self.running = False
 
+            elif event.type == pygame.VIDEOEXPOSE:
+                self.redraw_all = True
+
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     self.running = False
@@ -246,76 +376,120 @@ class NeilerGUIPro:
                     self.paused = not self.paused
                 elif event.key == pygame.K_s:
                     self.step_mode = not self.step_mode
+                elif event.key == pygame.K_t:
+                    self.turbo = not self.turbo
                 elif event.key == pygame.K_n and (self.paused or self.step_mode):
-                    self.cpu.step()
-                    self.total_cycles += 1
+                    self.run_cpu(1)
                 elif event.key == pygame.K_r:
-                    self.cpu = Neiler8CPU()
+                    self.cpu.reset()
                     self.load_demo_program()
                     self.total_cycles = 0
-                    self.instruction_history.clear()
-                elif event.key == pygame.K_UP:
-                    self.memory_offset = max(0, self.memory_offset - 16)
-                elif event.key == pygame.K_DOWN:
-                    self.memory_offset = min(0xFF00, self.memory_offset + 16)
+                    self.hist_head = 0
                 elif event.key == pygame.K_EQUALS:
                     self.cycles_per_frame = min(10000, self.cycles_per_frame + 50)
                 elif event.key == pygame.K_MINUS:
                     self.cycles_per_frame = max(1, self.cycles_per_frame - 50)
 
-    def update_cpu(self):
-        """Update CPU"""
-        if not self.paused and not self.step_mode and not self.cpu.halted:
-            for _ in range(self.cycles_per_frame):
-                if self.cpu.halted:
-                    break
-
-                # Record instruction
-                pc = self.cpu.PC
-                opcode = self.cpu.memory[pc] if pc < len(self.cpu.memory) else 0
-
-                self.cpu.step()
-                self.total_cycles += 1
-
-                # Track instruction
-                self.instruction_history.append((pc, opcode))
-
-                # Handle GPU
-                if self.cpu.io_ports[0x82] != 0:
-                    x = self.cpu.io_ports[0x80] % NEILER_WIDTH
-                    y = self.cpu.io_ports[0x81] % NEILER_HEIGHT
-                    color = self.cpu.io_ports[0x82]
-
-                    r = (color * 37) % 256
-                    g = (color * 73) % 256
-                    b = (color * 109) % 256
-
-                    self.neiler_display.set_at((x, y), (r, g, b))
-                    self.cpu.io_ports[0x82] = 0
+    def scroll_memory(self):
+        """Scroll the memory viewer one row per frame while an arrow key is held"""
+        keys = pygame.key.get_pressed()
+        if keys[pygame.K_UP]:
+            self.memory_offset = max(0, self.memory_offset - 16)
+        elif keys[pygame.K_DOWN]:
+            self.memory_offset = min(0xFF00, self.memory_offset + 16)
+
+    def cpu_idle(self):
+        """Whether the CPU is not running on its own (paused, stepping or halted)"""
+        return self.paused or self.step_mode or self.cpu.halted
+
+    async def update_cpu(self):
+        """Run this frame's cycles in CPU_SLICE chunks, letting input in between"""
+        remaining = self.cycles_per_frame
+        while remaining > 0 and not self.cpu_idle():
+            cycles = min(remaining, CPU_SLICE)
+            self.run_cpu(cycles)
+            remaining -= cycles
+            await asyncio.sleep(0)
+
+    def run_cpu(self, cycles):
+        """Run the CPU for up to cycles instructions in one call and apply its draws"""
+        io = self.cpu.io_ports
+        pen = (io[0x80], io[0x81])
+
+        # Track instruction the batch starts at
+        pc = self.cpu.PC
+        head = self.hist_head
+        self.hist_pc[head & (HISTORY_SIZE - 1)] = pc
+        self.hist_op[head & (HISTORY_SIZE - 1)] = self.cpu.memory[pc]
+        self.hist_head = head + 1
+
+        self.total_cycles += self.cpu.run(cycles)
+
+        # Handle GPU
+        self.flush_draws(pen)
+
+    def flush_draws(self, pen):
+        """Plot the GPU draw commands in the CPU's OUT log in one store
+
+        pen is the (X, Y) port pair as it was before the logged writes.
+        """
+        log = self.cpu.out_log
+        if log:
+            writes = np.frombuffer(log, dtype=np.uint8).astype(np.intp).reshape(-1, 2)
+            log.clear()
+            ports = writes[:, 0]
+            values = writes[:, 1]
+
+            # Draw commands (port 0x82) take the latest X/Y written before them
+            draws = np.flatnonzero((ports == 0x82) & (values != 0))
+            if draws.size:
+                xs = _latest_write(ports, values, 0x80, pen[0])[draws] % NEILER_WIDTH
+                ys = _latest_write(ports, values, 0x81, pen[1])[draws] % NEILER_HEIGHT
+                rgb = self.palette[values[draws]]
+
+                # Later draws to the same pixel win; the surface stays
+                # locked while the pixel array exists
+                pixels = pygame.surfarray.pixels3d(self.neiler_display)
+                pixels[xs, ys] = rgb
+                del pixels
+                self.display_dirty = True
+
+        self.cpu.io_ports[0x82] = 0
 
     def draw_display_panel(self):
-        """Draw GPU display panel"""
-        self.display_panel.draw_border(self.screen)
-
-        # Scale and draw Neiler display
-        scaled = pygame.transform.scale(
-            self.neiler_display,
-            (NEILER_WIDTH * NEILER_SCALE, NEILER_HEIGHT * NEILER_SCALE)
-        )
+        """Draw GPU display panel, returning the rect drawn (None if unchanged)"""
+        first = self.display_panel.needs_redraw(())
+        if not (first or self.display_dirty):
+            return None
+
+        # Scale into the cached surface only when new pixels were plotted
+        if self.display_dirty:
+            pygame.transform.scale(self.neiler_display,
+                                   self.scaled_display.get_size(),
+                                   self.scaled_display)
+            self.display_dirty = False
 
         x = self.display_panel.rect.x + 20
         y = self.display_panel.rect.y + 50
 
+        # Pixels changed: only the display itself needs drawing
+        if not first:
+            return self.screen.blit(self.scaled_display, (x, y))
+
+        self.display_panel.draw_border(self.screen)
+
         # CRT-style border
-        border_rect = pygame.Rect(x - 2, y - 2,
-                                  NEILER_WIDTH * NEILER_SCALE + 4,
-                                  NEILER_HEIGHT * NEILER_SCALE + 4)
-        pygame.draw.rect(self.screen, (100, 100, 120), border_rect, 2)
+        pygame.draw.rect(self.screen, (100, 100, 120), self.crt_rect, 2)
 
-        self.screen.blit(scaled, (x, y))
+        self.screen.blit(self.scaled_display, (x, y))
+        return self.display_panel.rect
 
     def draw_cpu_panel(self):
-        """Draw CPU state panel"""
+        """Draw CPU state panel, returning the rect drawn (None if unchanged)"""
+        state = (bytes(self.cpu.R), self.cpu.PC, self.cpu.SP, self.cpu.P,
+                 self.cpu.halted, self.paused)
+        if not self.cpu_panel.needs_redraw(state):
+            return None
         self.cpu_panel.draw_border(self.screen)
 
         x = self.cpu_panel.rect.x + PANEL_PADDING
@@ -329,14 +503,9 @@ class NeilerGUIPro:
         ]
 
         for i, (name, value) in enumerate(registers):
-            row = i // 2
-            col = i % 2
-
-            reg_x = x + col * 180
-            reg_y = y + row * 60
-
             # Box
-            box_rect = pygame.Rect(reg_x, reg_y, 160, 45)
+            box_rect = self.reg_box_rects[i]
+            reg_x, reg_y = box_rect.topleft
             pygame.draw.rect(self.screen, HIGHLIGHT_COLOR, box_rect)
             pygame.draw.rect(self.screen, ACCENT_COLOR, box_rect, 2)
 
@@ -362,20 +531,13 @@ class NeilerGUIPro:
 
         # Flags
         y += 40
-        flag_text = self.font_small.render("FLAGS:", True, TEXT_DIM)
-        self.screen.blit(flag_text, (x, y))
+        self.screen.blit(self.flags_label, (x, y))
 
+        # All four flags come from the one status byte
         y += 25
-        flags = [
-            (f'Z:{self.cpu.FLAG_ZERO}', self.cpu.FLAG_ZERO),
-            (f'C:{self.cpu.FLAG_CARRY}', self.cpu.FLAG_CARRY),
-            (f'N:{self.cpu.FLAG_NEGATIVE}', self.cpu.FLAG_NEGATIVE),
-            (f'O:{self.cpu.FLAG_OVERFLOW}', self.cpu.FLAG_OVERFLOW),
-        ]
-
-        for i, (text, active) in enumerate(flags):
-            color = SUCCESS_COLOR if active else TEXT_DIM
-            flag_surf = self.font_mono.render(text, True, color)
+        status_byte = self.cpu.P
+        for i, (name, mask) in enumerate(FLAG_BITS):
+            flag_surf = self.flag_surfs[name, 1 if status_byte & mask else 0]
             self.screen.blit(flag_surf, (x + i * 80, y))
 
         # Status
@@ -384,51 +546,51 @@ class NeilerGUIPro:
         status_color = ERROR_COLOR if self.cpu.halted else WARNING_COLOR if self.paused else SUCCESS_COLOR
         status_surf = self.font_large.render(status, True, status_color)
         self.screen.blit(status_surf, (x, y))
+        return self.cpu_panel.rect
 
     def draw_memory_panel(self):
-        """Draw memory viewer"""
+        """Draw memory viewer, returning the rect drawn (None if unchanged)"""
+        offset = self.memory_offset
+        window = bytes(self.cpu.memory[offset:offset + 320])
+        if not self.memory_panel.needs_redraw((offset, self.cpu.PC, window)):
+            return None
+
+        # Long rows run on into the margin right of the panel
+        rect = self.memory_panel.rect
+        self.screen.fill(BG_COLOR, self.memory_margin)
         self.memory_panel.draw_border(self.screen)
 
-        x = self.memory_panel.rect.x + PANEL_PADDING
-        y = self.memory_panel.rect.y + 50
-
-        # Memory dump
-        for row in range(20):
-            addr = self.memory_offset + (row * 16)
-
-            # Highlight PC row
-            if self.cpu.PC >= addr and self.cpu.PC < addr + 16:
-                highlight_rect = pygame.Rect(x, y + row * 20 - 2,
-                                            self.memory_panel.rect.width - 30, 20)
-                pygame.draw.rect(self.screen, (60, 60, 80), highlight_rect)
-
-            # Address
-            addr_text = self.font_mono.render(f"{addr:04X}:", True, ACCENT_COLOR)
-            self.screen.blit(addr_text, (x, y + row * 20))
-
-            # Bytes
-            bytes_str = ""
-            ascii_str = ""
-            for col in range(16):
-                byte_addr = addr + col
-                if byte_addr < len(self.cpu.memory):
-                    byte = self.cpu.memory[byte_addr]
-                    bytes_str += f"{byte:02X} "
-
-                    # ASCII
-                    if 32 <= byte < 127:
-                        ascii_str += chr(byte)
-                    else:
-                        ascii_str += '.'
-
-            bytes_surf = self.font_mono.render(bytes_str, True, TEXT_COLOR)
-            self.screen.blit(bytes_surf, (x + 60, y + row * 20))
-
-            ascii_surf = self.font_mono.render(ascii_str, True, TEXT_DIM)
-            self.screen.blit(ascii_surf, (x + 450, y + row * 20))
+        x = rect.x + PANEL_PADDING
+        y = rect.y + 50
+
+        # Highlight PC row
+        pc_index = self.cpu.PC - offset
+        if 0 <= pc_index < 320:
+            highlight_rect = self._hl_rect_mem
+            highlight_rect.y = y + (pc_index >> 4) * 20 - 2
+            pygame.draw.rect(self.screen, (60, 60, 80), highlight_rect)
+
+        # Address column, re-rendered only when the view scrolls
+        if self._addr_labels is None or self._addr_labels[0] != offset:
+            self._addr_labels = (offset, [
+                self.font_mono.render(f"{offset + row * 16:04X}:", True, ACCENT_COLOR)
+                for row in range(20)])
+        labels = self._addr_labels[1]
+
+        # Bytes and ASCII: one pre-rendered glyph per byte at fixed
+        # positions, paired up and drawn in one blits() call
+        seq = [(labels[row], (x, y + row * 20)) for row in range(20)]
+        seq += zip(map(self.hex_glyphs[TEXT_COLOR].__getitem__, window), self.mem_hex_pos)
+        seq += zip(map(self.ascii_glyphs.__getitem__, window), self.mem_ascii_pos)
+        self.screen.blits(seq, doreturn=False)
+        return self.memory_update_rect
 
     def draw_stack_panel(self):
-        """Draw stack viewer"""
+        """Draw stack viewer, returning the rect drawn (None if unchanged)"""
+        # The 12 bytes shown, from 0x01F4 up to 0x01FF
+        stack = bytes(self.cpu.memory[0x01F4:0x0200])
+        if not self.stack_panel.needs_redraw((self.cpu.SP, stack)):
+            return None
         self.stack_panel.draw_border(self.screen)
 
         x = self.stack_panel.rect.x + PANEL_PADDING
@@ -437,82 +599,95 @@ class NeilerGUIPro:
         # Stack grows down from 0x01FF
         for i in range(12):
             addr = 0x01FF - i
-            byte = self.cpu.memory[addr] if addr < len(self.cpu.memory) else 0
+            byte = stack[11 - i]
 
             # Highlight SP
             if addr == 0x0100 + self.cpu.SP:
-                highlight_rect = pygame.Rect(x, y + i * 20 - 2, 350, 20)
+                highlight_rect = self._hl_rect_stack
+                highlight_rect.y = y + i * 20 - 2
                 pygame.draw.rect(self.screen, (60, 60, 80), highlight_rect)
-                marker = self.font_mono.render("← SP", True, WARNING_COLOR)
-                self.screen.blit(marker, (x + 250, y + i * 20))
+                self.screen.blit(self.sp_marker, (x + 250, y + i * 20))
 
-            stack_text = f"{addr:04X}: 0x{byte:02X}"
             color = SUCCESS_COLOR if addr == 0x0100 + self.cpu.SP else TEXT_COLOR
-            text_surf = self.font_mono.render(stack_text, True, color)
-            self.screen.blit(text_surf, (x, y + i * 20))
+            label = self.stack_labels[color][i]
+            self.screen.blit(label, (x, y + i * 20))
+            self.screen.blit(self.hex_glyphs[color][byte],
+                             (x + label.get_width(), y + i * 20))
+        return self.stack_panel.rect
 
     def draw_disasm_panel(self):
-        """Draw disassembly view"""
-        self.disasm_panel.draw_border(self.screen)
-
-        x = self.disasm_panel.rect.x + PANEL_PADDING
-        y = self.disasm_panel.rect.y + 50
-
+        """Draw disassembly view, returning the rect drawn (None if unchanged)"""
         # Disassemble around PC
         start_addr = max(0, self.cpu.PC - 5)
+        window = bytes(self.cpu.memory[start_addr:start_addr + 36])
+        if not self.disasm_panel.needs_redraw((self.cpu.PC, window)):
+            return None
+
+        # The PC marker sits in the margin left of the panel
+        rect = self.disasm_panel.rect
+        self.screen.fill(BG_COLOR, self.disasm_margin)
+        self.disasm_panel.draw_border(self.screen)
+
+        x = rect.x + PANEL_PADDING
+        y = rect.y + 50
 
         for i in range(12):
             addr = start_addr + i * 3  # Rough estimate
 
-            if addr >= len(self.cpu.memory):
+            if i * 3 >= len(window):
                 break
 
-            opcode = self.cpu.memory[addr]
-            mnemonic = OPCODE_NAMES.get(opcode, f"DB 0x{opcode:02X}")
+            opcode = window[i * 3]
 
             # Highlight current PC
             if addr == self.cpu.PC:
-                highlight_rect = pygame.Rect(x, y + i * 20 - 2, 550, 20)
+                highlight_rect = self._hl_rect_disasm
+                highlight_rect.y = y + i * 20 - 2
                 pygame.draw.rect(self.screen, (80, 80, 100), highlight_rect)
-                marker = self.font_mono.render("►", True, WARNING_COLOR)
-                self.screen.blit(marker, (x - 20, y + i * 20))
+                self.screen.blit(self.pc_marker, (x - 20, y + i * 20))
 
             # Address
             addr_surf = self.font_mono.render(f"{addr:04X}:", True, ACCENT_COLOR)
             self.screen.blit(addr_surf, (x, y + i * 20))
 
             # Opcode bytes
-            bytes_str = f"{opcode:02X}"
-            bytes_surf = self.font_mono.render(bytes_str, True, TEXT_DIM)
-            self.screen.blit(bytes_surf, (x + 70, y + i * 20))
+            self.screen.blit(self.hex_glyphs[TEXT_DIM][opcode], (x + 70, y + i * 20))
 
             # Mnemonic
-            instr_surf = self.font_mono.render(mnemonic, True, SUCCESS_COLOR)
-            self.screen.blit(instr_surf, (x + 120, y + i * 20))
+            self.screen.blit(self.disasm_name_surfs[opcode], (x + 120, y + i * 20))
+        return self.disasm_update_rect
 
     def draw_io_panel(self):
-        """Draw I/O ports"""
+        """Draw I/O ports, returning the rect drawn (None if unchanged)"""
+        ports = bytes(self.cpu.io_ports[:16])
+        if not self.io_panel.needs_redraw(ports):
+            return None
         self.io_panel.draw_border(self.screen)
 
         x = self.io_panel.rect.x + PANEL_PADDING
         y = self.io_panel.rect.y + 50
 
         # Show first 16 I/O ports
-        for i in range(16):
-            port = i
-            value = self.cpu.io_ports[port]
-
-            port_text = f"Port 0x{port:02X}: 0x{value:02X} ({value:3d})"
-            color = SUCCESS_COLOR if value != 0 else TEXT_DIM
-            text_surf = self.font_mono.render(port_text, True, color)
-            self.screen.blit(text_surf, (x, y + i * 18))
+        cache = self.io_line_cache
+        for port, value in enumerate(ports):
+            text_surf = cache.get((port, value))
+            if text_surf is None:
+                port_text = f"Port 0x{port:02X}: 0x{value:02X} ({value:3d})"
+                color = SUCCESS_COLOR if value != 0 else TEXT_DIM
+                text_surf = cache[port, value] = self.font_mono.render(port_text, True, color)
+            self.screen.blit(text_surf, (x, y + port * 18))
+        return self.io_panel.rect
 
     def draw_perf_panel(self):
-        """Draw performance graph"""
-        self.perf_panel.draw_border(self.screen)
-
-        x = self.perf_panel.rect.x + PANEL_PADDING
-        y = self.perf_panel.rect.y + 50
+        """Draw performance graph, returning the rect drawn (None if unchanged)"""
+        # Track FPS history (only while the CPU runs, so an idle panel
+        # stays unchanged)
+        history = self.fps_history
+        if not self.cpu_idle():
+            history[:-1] = history[1:]
+            history[-1] = self.fps
+            self.fps_count = min(self.fps_count + 1, FPS_HISTORY)
+        history = history[FPS_HISTORY - self.fps_count:]
 
         # Stats
         stats = [
@@ -522,6 +697,13 @@ class NeilerGUIPro:
             f"IPS: {self.cycles_per_frame * self.fps:,.0f}",
         ]
 
+        if not self.perf_panel.needs_redraw((stats, history.tobytes())):
+            return None
+        self.perf_panel.draw_border(self.screen)
+
+        x = self.perf_panel.rect.x + PANEL_PADDING
+        y = self.perf_panel.rect.y + 50
+
         for i, stat in enumerate(stats):
             stat_surf = self.font_small.render(stat, True, TEXT_COLOR)
             self.screen.blit(stat_surf, (x, y + i * 25))
@@ -532,26 +714,25 @@ class NeilerGUIPro:
         graph_height = 80
 
         # Background
-        graph_rect = pygame.Rect(x, graph_y, graph_width, graph_height)
+        graph_rect = self.graph_rect
         pygame.draw.rect(self.screen, (40, 40, 50), graph_rect)
         pygame.draw.rect(self.screen, PANEL_BORDER, graph_rect, 1)
 
-        # Track FPS history
-        self.fps_history.append(self.fps)
-
         # Draw graph
-        if len(self.fps_history) > 1:
-            points = []
-            for i, fps_val in enumerate(self.fps_history):
-                px = x + (i / len(self.fps_history)) * graph_width
-                py = graph_y + graph_height - (fps_val / 60.0 * graph_height)
-                points.append((px, py))
-
-            if len(points) > 1:
-                pygame.draw.lines(self.screen, SUCCESS_COLOR, False, points, 2)
+        if len(history) > 1:
+            # x positions depend only on the number of samples
+            if len(self._graph_xs) != len(history):
+                self._graph_xs = np.linspace(x, x + graph_width, len(history),
+                                             endpoint=False)
+            ys = graph_y + graph_height - (history / 60.0 * graph_height)
+            points = np.column_stack([self._graph_xs, ys]).tolist()
+            pygame.draw.lines(self.screen, SUCCESS_COLOR, False, points, 2)
+        return self.perf_panel.rect
 
     def draw_control_panel(self):
-        """Draw controls info"""
+        """Draw controls info, returning the rect drawn (None if unchanged)"""
+        if not self.control_panel.needs_redraw(()):
+            return None
         self.control_panel.draw_border(self.screen)
 
         x = self.control_panel.rect.x + PANEL_PADDING
@@ -561,6 +742,7 @@ class NeilerGUIPro:
             "SPACE - Pause/Resume",
             "S - Step Mode",
             "N - Next Instruction",
+            "T - Turbo (no drawing)",
             "R - Reset",
             "+ / - - Speed Control",
             "↑ / ↓ - Scroll Memory",
@@ -570,22 +752,30 @@ class NeilerGUIPro:
         for i, control in enumerate(controls):
             text_surf = self.font_small.render(control, True, TEXT_COLOR)
             self.screen.blit(text_surf, (x, y + i * 25))
+        return self.control_panel.rect
 
     def draw(self):
-        """Draw everything"""
-        self.screen.fill(BG_COLOR)
+        """Draw the panels whose contents changed since the last frame"""
+        if self.redraw_all:
+            self.screen.fill(BG_COLOR)
+            for panel in (self.display_panel, self.cpu_panel, self.memory_panel,
+                          self.stack_panel, self.disasm_panel, self.io_panel,
+                          self.perf_panel, self.control_panel):
+                panel.invalidate()
 
         # Draw all panels
-        self.draw_display_panel()
-        self.draw_cpu_panel()
-        self.draw_memory_panel()
-        self.draw_stack_panel()
-        self.draw_disasm_panel()
-        self.draw_io_panel()
-        self.draw_perf_panel()
-        self.draw_control_panel()
-
-        pygame.display.flip()
+        rects = [self.draw_display_panel(), self.draw_cpu_panel(),
+                 self.draw_memory_panel(), self.draw_stack_panel(),
+                 self.draw_disasm_panel(), self.draw_io_panel(),
+                 self.draw_perf_panel(), self.draw_control_panel()]
+
+        if self.redraw_all:
+            pygame.display.flip()
+            self.redraw_all = False
+        else:
+            dirty = [rect for rect in rects if rect is not None]
+            if dirty:
+                pygame.display.update(dirty)
 
     def run(self):
         """Main loop"""
@@ -595,17 +785,56 @@ class NeilerGUIPro:
         print("="*60)
         print("\nStarting...\n")
 
-        while self.running:
-            self.handle_input()
-            self.update_cpu()
-            self.draw()
-
-            self.fps = self.clock.get_fps() if self.clock.get_fps() > 0 else 60
-            self.clock.tick(FPS)
+        asyncio.run(self.main_loop())
 
         pygame.quit()
         print(f"\nTotal cycles: {self.total_cycles:,}")
 
+    async def main_loop(self):
+        """Run the CPU and drawing, with input polling and the frame timer as tasks"""
+        self.vsync = asyncio.Event()
+        tasks = [asyncio.create_task(self.poll_input()),
+                 asyncio.create_task(self.frame_timer())]
+        await asyncio.sleep(0)  # handle pending input before the first run
+        try:
+            while self.running:
+                await self.update_cpu()
+
+                if self.turbo:
+                    # No drawing or frame pacing, just let input in
+                    await asyncio.sleep(0)
+                else:
+                    await self.vsync.wait()
+                    self.vsync.clear()
+                    self.scroll_memory()
+                    # Idle frames are already slow (IDLE_FPS): draw each one,
+                    # which only touches panels that changed
+                    if self.cpu_idle() or self.frame_idx % DRAW_EVERY == 0:
+                        self.draw()
+                self.frame_idx += 1
+
+                self.clock.tick()
+                self.fps = self.clock.get_fps() if self.clock.get_fps() > 0 else 60
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def poll_input(self):
+        """Handle input every INPUT_INTERVAL, also in the middle of a frame"""
+        while self.running:
+            self.handle_input()
+            await asyncio.sleep(INPUT_INTERVAL)
+
+    async def frame_timer(self):
+        """Set the vsync event FPS times a second (IDLE_FPS while the CPU is idle)"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+        while True:
+            interval = 1 / (IDLE_FPS if self.cpu_idle() else FPS)
+            deadline = max(deadline + interval, loop.time() - interval)
+            await asyncio.sleep(deadline - loop.time())
+            self.vsync.set()
+
 
 def main():
     emulator = NeilerGUIPro()
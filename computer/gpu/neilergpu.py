@@ -13,6 +13,16 @@ Features:
 
 import numpy as np
 
+try:
+    from numba import njit, prange
+except ImportError:  # JIT backend is optional
+    njit = None
+
+try:
+    import cupy as cp
+except ImportError:  # CUDA readout is optional
+    cp = None
+
 class NeilerGPU:
     def __init__(self, mode='8bit'):
         self.mode = mode
@@ -28,9 +38,16 @@ class NeilerGPU:
 
         # Frame buffer
         self.framebuffer = np.zeros((self.height, self.width), dtype=np.uint16 if mode == '16bit' else np.uint8)
-
-        # Palette (256 colors, RGB565 format)
-        self.palette = np.zeros(256, dtype=np.uint16)
+        # RGB output of get_framebuffer_rgb, reused every frame
+        self._rgb_buffer = np.empty((self.height, self.width, 3), dtype=np.uint8)
+
+        # Palette (256 colors, RGB565 format) and its RGB888 expansion.
+        # Colors change only through set_palette_color, which keeps the two
+        # in step; the public arrays are read-only views
+        self._palette = np.zeros(256, dtype=np.uint16)
+        self._palette_rgb = np.zeros((256, 3), dtype=np.uint8)
+        self.palette = self._read_only(self._palette)
+        self.palette_rgb = self._read_only(self._palette_rgb)
         self._init_default_palette()
 
         # Sprite system
@@ -38,9 +55,24 @@ class NeilerGPU:
         self.sprite_width = 16
         self.sprite_height = 16
         self.sprite_data = np.zeros((self.num_sprites, self.sprite_height, self.sprite_width), dtype=np.uint8)
-        self.sprite_x = np.zeros(self.num_sprites, dtype=np.int16)
-        self.sprite_y = np.zeros(self.num_sprites, dtype=np.int16)
-        self.sprite_enabled = np.zeros(self.num_sprites, dtype=np.bool_)
+        # Positions and enable flags change only through set_sprite_position
+        # and enable_sprite, which keep the caches below current; the public
+        # arrays are read-only views
+        self._sprite_x = np.zeros(self.num_sprites, dtype=np.int16)
+        self._sprite_y = np.zeros(self.num_sprites, dtype=np.int16)
+        self._sprite_enabled = np.zeros(self.num_sprites, dtype=np.bool_)
+        self.sprite_x = self._read_only(self._sprite_x)
+        self.sprite_y = self._read_only(self._sprite_y)
+        self.sprite_enabled = self._read_only(self._sprite_enabled)
+        # Indices of enabled, on-screen sprites; rebuilt after the sprite
+        # setters mark them dirty
+        self._active_sprites = np.zeros(0, dtype=np.int64)
+        self._sprites_dirty = False
+        # Per sprite (framebuffer index, sprite_data index) of its visible
+        # part, or None when off-screen; kept by set_sprite_position
+        self._sprite_clip = [None] * self.num_sprites
+        for i in range(self.num_sprites):
+            self._recompute_clip(i)
 
         # Background layers
         self.bg_layer1 = np.zeros((self.height, self.width), dtype=np.uint8)
@@ -49,6 +81,8 @@ class NeilerGPU:
         self.bg1_scroll_y = 0
         self.bg2_scroll_x = 0
         self.bg2_scroll_y = 0
+        # Scrolled copy of a layer, reused by render_background
+        self._bg_scratch = np.empty((self.height, self.width), dtype=np.uint8)
 
         # Registers (memory-mapped)
         self.registers = {
@@ -59,24 +93,46 @@ class NeilerGPU:
             'BG2_EN': 0,      # Background layer 2 enabled
         }
 
-        # Video RAM (8KB for sprites, 16KB for backgrounds)
-        self.vram = bytearray(24 * 1024)
+        # Video RAM (8KB for sprites, 16KB for backgrounds): a uint8 array
+        # sharing its bytes with _vram_buf
+        self._vram_buf = bytearray(24 * 1024)
+        self.vram = np.frombuffer(self._vram_buf, dtype=np.uint8)
+
+        # 8x8 font, one glyph per character code (default: outlined box)
+        self.font = np.zeros((256, 8, 8), dtype=np.uint8)
+        self.font[:, [0, -1], :] = 1
+        self.font[:, :, [0, -1]] = 1
 
         # Frame counter
         self.frame_count = 0
 
+        # Compile the drawing kernels for this framebuffer type up front
+        # (no sprite is enabled yet and the shapes are off-screen, so
+        # nothing is drawn)
+        self.draw_line(-1, -1, -1, -1, 0)
+        self.draw_circle(-1, -1, -1, 0)
+        self.draw_all_sprites()
+
     def _init_default_palette(self):
         """Initialize default color palette"""
         # Black to white gradient
-        for i in range(256):
-            r = g = b = i
-            self.palette[i] = self.rgb_to_rgb565(r, g, b)
+        i = np.arange(256)
+        self._palette[:] = self.rgb_to_rgb565_v(i, i, i)
+        _unpack_rgb565_numpy(self._palette, self._palette_rgb)
 
     @staticmethod
     def rgb_to_rgb565(r, g, b):
         """Convert RGB888 to RGB565"""
         return ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
 
+    @staticmethod
+    def rgb_to_rgb565_v(r, g, b):
+        """Convert arrays of RGB888 channels to a uint16 RGB565 array"""
+        r = np.asarray(r, dtype=np.uint16)
+        g = np.asarray(g, dtype=np.uint16)
+        b = np.asarray(b, dtype=np.uint16)
+        return ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
+
     @staticmethod
     def rgb565_to_rgb(color):
         """Convert RGB565 to RGB888 tuple"""
@@ -87,7 +143,9 @@ class NeilerGPU:
 
     def set_palette_color(self, index, r, g, b):
         """Set palette color (0-255, RGB values 0-255)"""
-        self.palette[index] = self.rgb_to_rgb565(r, g, b)
+        color = self.rgb_to_rgb565(r, g, b)
+        self._palette[index] = color
+        self._palette_rgb[index] = self.rgb565_to_rgb(color)
 
     def set_pixel(self, x, y, color):
         """Set pixel color"""
@@ -106,74 +164,37 @@ class NeilerGPU:
 
     def draw_line(self, x0, y0, x1, y1, color):
         """Draw line (Bresenham's algorithm)"""
-        dx = abs(x1 - x0)
-        dy = abs(y1 - y0)
-        sx = 1 if x0 < x1 else -1
-        sy = 1 if y0 < y1 else -1
-        err = dx - dy
-
-        while True:
-            self.set_pixel(x0, y0, color)
-
-            if x0 == x1 and y0 == y1:
-                break
-
-            e2 = 2 * err
-            if e2 > -dy:
-                err -= dy
-                x0 += sx
-            if e2 < dx:
-                err += dx
-                y0 += sy
+        _draw_line(self.framebuffer, x0, y0, x1, y1, color,
+                   self.width, self.height)
 
     def draw_rect(self, x, y, width, height, color, fill=False):
         """Draw rectangle"""
+        fb = self.framebuffer
+        # Clip once to the screen, then store whole spans
+        x0 = max(x, 0)
+        y0 = max(y, 0)
+        x1 = min(x + width, self.width)
+        y1 = min(y + height, self.height)
+
         if fill:
-            for dy in range(height):
-                for dx in range(width):
-                    self.set_pixel(x + dx, y + dy, color)
+            if x1 > x0 and y1 > y0:
+                fb[y0:y1, x0:x1] = color
         else:
             # Top and bottom
-            for dx in range(width):
-                self.set_pixel(x + dx, y, color)
-                self.set_pixel(x + dx, y + height - 1, color)
+            if x1 > x0:
+                for row in (y, y + height - 1):
+                    if 0 <= row < self.height:
+                        fb[row, x0:x1] = color
             # Left and right
-            for dy in range(height):
-                self.set_pixel(x, y + dy, color)
-                self.set_pixel(x + width - 1, y + dy, color)
+            if y1 > y0:
+                for col in (x, x + width - 1):
+                    if 0 <= col < self.width:
+                        fb[y0:y1, col] = color
 
     def draw_circle(self, cx, cy, radius, color, fill=False):
         """Draw circle (Midpoint circle algorithm)"""
-        x = radius
-        y = 0
-        err = 0
-
-        while x >= y:
-            if fill:
-                # Draw horizontal lines
-                for dx in range(-x, x + 1):
-                    self.set_pixel(cx + dx, cy + y, color)
-                    self.set_pixel(cx + dx, cy - y, color)
-                for dx in range(-y, y + 1):
-                    self.set_pixel(cx + dx, cy + x, color)
-                    self.set_pixel(cx + dx, cy - x, color)
-            else:
-                # Draw circle outline
-                self.set_pixel(cx + x, cy + y, color)
-                self.set_pixel(cx + y, cy + x, color)
-                self.set_pixel(cx - y, cy + x, color)
-                self.set_pixel(cx - x, cy + y, color)
-                self.set_pixel(cx - x, cy - y, color)
-                self.set_pixel(cx - y, cy - x, color)
-                self.set_pixel(cx + y, cy - x, color)
-                self.set_pixel(cx + x, cy - y, color)
-
-            if err <= 0:
-                y += 1
-                err += 2 * y + 1
-            if err > 0:
-                x -= 1
-                err -= 2 * x + 1
+        _draw_circle(self.framebuffer, cx, cy, radius, color, fill,
+                     self.width, self.height)
 
     def load_sprite(self, sprite_id, sprite_data):
         """Load sprite data (16x16 pixels)"""
@@ -183,13 +204,42 @@ class NeilerGPU:
     def set_sprite_position(self, sprite_id, x, y):
         """Set sprite position"""
         if 0 <= sprite_id < self.num_sprites:
-            self.sprite_x[sprite_id] = x
-            self.sprite_y[sprite_id] = y
+            self._sprite_x[sprite_id] = x
+            self._sprite_y[sprite_id] = y
+            self._recompute_clip(sprite_id)
+            self._sprites_dirty = True
+
+    @staticmethod
+    def _read_only(array):
+        """Read-only view of array (writes go through the original)"""
+        view = array.view()
+        view.flags.writeable = False
+        return view
+
+    def _recompute_clip(self, sprite_id):
+        """Clip the sprite's 16x16 box against the screen"""
+        sx = int(self.sprite_x[sprite_id])
+        sy = int(self.sprite_y[sprite_id])
+
+        # Overlap of the sprite with the screen
+        dx0 = max(sx, 0)
+        dy0 = max(sy, 0)
+        dx1 = min(sx + self.sprite_width, self.width)
+        dy1 = min(sy + self.sprite_height, self.height)
+        if dx1 <= dx0 or dy1 <= dy0:
+            self._sprite_clip[sprite_id] = None
+            return
+
+        self._sprite_clip[sprite_id] = (
+            (slice(dy0, dy1), slice(dx0, dx1)),
+            (sprite_id, slice(dy0 - sy, dy1 - sy), slice(dx0 - sx, dx1 - sx)),
+        )
 
     def enable_sprite(self, sprite_id, enabled=True):
         """Enable/disable sprite"""
         if 0 <= sprite_id < self.num_sprites:
-            self.sprite_enabled[sprite_id] = enabled
+            self._sprite_enabled[sprite_id] = enabled
+            self._sprites_dirty = True
 
     def draw_sprite(self, sprite_id):
         """Draw sprite to framebuffer"""
@@ -198,23 +248,37 @@ class NeilerGPU:
         if not self.sprite_enabled[sprite_id]:
             return
 
-        sx = self.sprite_x[sprite_id]
-        sy = self.sprite_y[sprite_id]
+        clip = self._sprite_clip[sprite_id]
+        if clip is None:
+            return
 
-        for y in range(self.sprite_height):
-            for x in range(self.sprite_width):
-                color = self.sprite_data[sprite_id, y, x]
-                if color != 0:  # 0 is transparent
-                    px = sx + x
-                    py = sy + y
-                    if 0 <= px < self.width and 0 <= py < self.height:
-                        self.framebuffer[py, px] = color
+        dst, src = clip
+        src = self.sprite_data[src]
+        # 0 is transparent
+        np.copyto(self.framebuffer[dst], src, where=src != 0)
+
+    def _visible_sprites(self):
+        """Indices of enabled sprites overlapping the screen, in draw order"""
+        if self._sprites_dirty:
+            x = self.sprite_x
+            y = self.sprite_y
+            visible = (self.sprite_enabled
+                       & (x > -self.sprite_width) & (x < self.width)
+                       & (y > -self.sprite_height) & (y < self.height))
+            self._active_sprites = np.flatnonzero(visible)
+            self._sprites_dirty = False
+        return self._active_sprites
 
     def draw_all_sprites(self):
         """Draw all enabled sprites"""
-        for i in range(self.num_sprites):
-            if self.sprite_enabled[i]:
-                self.draw_sprite(i)
+        active = self._visible_sprites()
+        if _draw_sprites is not None:
+            _draw_sprites(self.framebuffer, self.sprite_data, self.sprite_x,
+                          self.sprite_y, active, self.width, self.height)
+            return
+
+        for i in active:
+            self.draw_sprite(i)
 
     def scroll_background(self, layer, dx, dy):
         """Scroll background layer"""
@@ -228,14 +292,22 @@ class NeilerGPU:
     def render_background(self, layer):
         """Render background layer with scrolling"""
         if layer == 1 and self.registers['BG1_EN']:
-            # Simple tile rendering with scroll offset
-            for y in range(self.height):
-                for x in range(self.width):
-                    src_x = (x + self.bg1_scroll_x) % self.width
-                    src_y = (y + self.bg1_scroll_y) % self.height
-                    color = self.bg_layer1[src_y, src_x]
-                    if color != 0:
-                        self.framebuffer[y, x] = color
+            # Wrap the layer by the scroll offset as four block copies
+            bg = self.bg_layer1
+            out = self._bg_scratch
+            h, w = self.height, self.width
+            sx = self.bg1_scroll_x % w
+            sy = self.bg1_scroll_y % h
+            out[:h - sy, :w - sx] = bg[sy:, sx:]
+            out[:h - sy, w - sx:] = bg[sy:, :sx]
+            out[h - sy:, :w - sx] = bg[:sy, sx:]
+            out[h - sy:, w - sx:] = bg[:sy, :sx]
+            # 0 is transparent
+            np.copyto(self.framebuffer, out, where=out != 0)
+
+    def vram_u16(self):
+        """Video RAM as little-endian 16-bit words (a view, not a copy)"""
+        return self.vram.view('<u2')
 
     def vsync(self):
         """Wait for vertical blank"""
@@ -243,35 +315,184 @@ class NeilerGPU:
         self.frame_count += 1
 
     def get_framebuffer_rgb(self):
-        """Get framebuffer as RGB array for display"""
+        """Get framebuffer as RGB array for display
+
+        The same array is filled and returned on every call; copy it to
+        keep a frame.
+        """
         if self.mode == '8bit':
-            # Convert palette indices to RGB
-            rgb_buffer = np.zeros((self.height, self.width, 3), dtype=np.uint8)
-            for y in range(self.height):
-                for x in range(self.width):
-                    color_idx = self.framebuffer[y, x]
-                    rgb = self.rgb565_to_rgb(self.palette[color_idx])
-                    rgb_buffer[y, x] = rgb
-            return rgb_buffer
+            # Palette indices map straight to RGB through the lookup table
+            np.take(self.palette_rgb, self.framebuffer, axis=0, out=self._rgb_buffer)
         else:
             # 16-bit true color
-            rgb_buffer = np.zeros((self.height, self.width, 3), dtype=np.uint8)
-            for y in range(self.height):
-                for x in range(self.width):
-                    rgb = self.rgb565_to_rgb(self.framebuffer[y, x])
-                    rgb_buffer[y, x] = rgb
-            return rgb_buffer
+            _unpack_rgb565(self.framebuffer, self._rgb_buffer)
+        return self._rgb_buffer
+
+    def get_framebuffer_rgb_gpu(self):
+        """Get framebuffer as an RGB CuPy array in CUDA device memory
+
+        Only the framebuffer itself (1 or 2 bytes per pixel) and the
+        palette are uploaded; the conversion to RGB runs on the device.
+        """
+        if cp is None:
+            raise RuntimeError("CuPy is required for get_framebuffer_rgb_gpu")
+
+        fb = cp.asarray(self.framebuffer)
+        if self.mode == '8bit':
+            return cp.take(cp.asarray(self.palette_rgb), fb, axis=0)
+
+        rgb = cp.empty((self.height, self.width, 3), dtype=cp.uint8)
+        _unpack_rgb565_gpu(fb, rgb[..., 0], rgb[..., 1], rgb[..., 2])
+        return rgb
 
     def blit_text(self, x, y, text, color, font_data=None):
-        """Blit text to screen (simple 8x8 font)"""
-        # Simple ASCII rendering (would need font data in real impl)
+        """Blit text to screen (8x8 font, one glyph per character code)"""
+        font = self.font if font_data is None else np.asarray(font_data).reshape(-1, 8, 8)
         char_width = 8
         char_height = 8
 
+        # Rows covered by the text line
+        dy0 = max(y, 0)
+        dy1 = min(y + char_height, self.height)
+        if dy1 <= dy0:
+            return
+
         for i, char in enumerate(text):
             char_x = x + i * char_width
-            # Draw simple rectangle as placeholder
-            self.draw_rect(char_x, y, char_width, char_height, color)
+            dx0 = max(char_x, 0)
+            dx1 = min(char_x + char_width, self.width)
+            if dx1 <= dx0:
+                continue
+            code = ord(char)
+            glyph = font[code if code < len(font) else ord('?')]
+            mask = glyph[dy0 - y:dy1 - y, dx0 - char_x:dx1 - char_x] != 0
+            np.copyto(self.framebuffer[dy0:dy1, dx0:dx1], color, where=mask)
+
+
+def _line_kernel(fb, x0, y0, x1, y1, color, w, h):
+    """Bresenham line into fb (h x w), skipping off-screen pixels."""
+    dx = abs(x1 - x0)
+    dy = abs(y1 - y0)
+    sx = 1 if x0 < x1 else -1
+    sy = 1 if y0 < y1 else -1
+    err = dx - dy
+
+    while True:
+        if 0 <= x0 < w and 0 <= y0 < h:
+            fb[y0, x0] = color
+
+        if x0 == x1 and y0 == y1:
+            break
+
+        e2 = 2 * err
+        if e2 > -dy:
+            err -= dy
+            x0 += sx
+        if e2 < dx:
+            err += dx
+            y0 += sy
+
+
+def _span(fb, x0, x1, y, color, w, h):
+    """Fill fb[y, x0..x1] clipped to the screen."""
+    if 0 <= y < h:
+        for x in range(max(x0, 0), min(x1 + 1, w)):
+            fb[y, x] = color
+
+
+def _plot(fb, x, y, color, w, h):
+    if 0 <= x < w and 0 <= y < h:
+        fb[y, x] = color
+
+
+def _circle_kernel(fb, cx, cy, radius, color, fill, w, h):
+    """Midpoint circle into fb (h x w), filled with spans or outlined."""
+    x = radius
+    y = 0
+    err = 0
+
+    while x >= y:
+        if fill:
+            # Draw horizontal lines
+            _span(fb, cx - x, cx + x, cy + y, color, w, h)
+            _span(fb, cx - x, cx + x, cy - y, color, w, h)
+            _span(fb, cx - y, cx + y, cy + x, color, w, h)
+            _span(fb, cx - y, cx + y, cy - x, color, w, h)
+        else:
+            # Draw circle outline
+            _plot(fb, cx + x, cy + y, color, w, h)
+            _plot(fb, cx + y, cy + x, color, w, h)
+            _plot(fb, cx - y, cy + x, color, w, h)
+            _plot(fb, cx - x, cy + y, color, w, h)
+            _plot(fb, cx - x, cy - y, color, w, h)
+            _plot(fb, cx - y, cy - x, color, w, h)
+            _plot(fb, cx + y, cy - x, color, w, h)
+            _plot(fb, cx + x, cy - y, color, w, h)
+
+        if err <= 0:
+            y += 1
+            err += 2 * y + 1
+        if err > 0:
+            x -= 1
+            err -= 2 * x + 1
+
+
+def _rgb565_kernel(src, out):
+    """Unpack RGB565 src (h x w) into out (h x w x 3) in one pass per row."""
+    h, w = src.shape
+    for y in prange(h):
+        for x in range(w):
+            c = src[y, x]
+            out[y, x, 0] = (c >> 8) & 0xF8
+            out[y, x, 1] = (c >> 3) & 0xFC
+            out[y, x, 2] = (c << 3) & 0xF8
+
+
+def _unpack_rgb565_numpy(src, out):
+    """Unpack RGB565 src into out with whole-array shifts."""
+    out[..., 0] = (src >> 8) & 0xF8
+    out[..., 1] = (src >> 3) & 0xFC
+    out[..., 2] = (src << 3) & 0xF8
+
+
+def _sprites_kernel(fb, data, xs, ys, order, w, h):
+    """Blit the sprites listed in order into fb (h x w); color 0 is
+    transparent.
+
+    Rows of the screen are independent, so they run in parallel; within a
+    row sprites are drawn in list order, later ones on top.
+    """
+    sh, sw = data.shape[1], data.shape[2]
+    for py in prange(h):
+        for i in order:
+            row = py - np.int64(ys[i])
+            if row < 0 or row >= sh:
+                continue
+            sx = np.int64(xs[i])
+            for col in range(max(0, -sx), min(sw, w - sx)):
+                color = data[i, row, col]
+                if color != 0:
+                    fb[py, sx + col] = color
+
+
+if njit is not None:
+    _draw_sprites = njit(cache=True, parallel=True)(_sprites_kernel)
+    _unpack_rgb565 = njit(cache=True, parallel=True)(_rgb565_kernel)
+    _span = njit(cache=True)(_span)
+    _plot = njit(cache=True)(_plot)
+    _draw_line = njit(cache=True)(_line_kernel)
+    _draw_circle = njit(cache=True)(_circle_kernel)
+else:
+    _draw_line = _line_kernel
+    _draw_circle = _circle_kernel
+    _draw_sprites = None
+    _unpack_rgb565 = _unpack_rgb565_numpy
+
+if cp is not None:
+    _unpack_rgb565_gpu = cp.ElementwiseKernel(
+        'uint16 c', 'uint8 r, uint8 g, uint8 b',
+        'r = (c >> 8) & 0xF8; g = (c >> 3) & 0xFC; b = (c << 3) & 0xF8',
+        'neiler_unpack_rgb565')
 
 
 if __name__ == "__main__":
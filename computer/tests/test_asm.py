@@ -0,0 +1,22 @@
+"""Tests for the Neiler-8 assembler"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'assembler'))
+
+from asm import Neiler8Assembler
+
+
+def assemble(source):
+    return bytes(Neiler8Assembler().assemble(source))
+
+
+def test_forward_reference_is_patched():
+    # JMP LATER; INC A; LATER: HLT
+    assert assemble('JMP LATER\nINC A\nLATER:\nHLT') == bytes([0x70, 0x04, 0x02, 0x44, 0xFF])
+
+
+def test_forward_reference_without_operand_bytes():
+    # RET takes no operand: the label must not overwrite INC A
+    assert assemble('RET LATER\nINC A\nLATER:\nHLT') == bytes([0x81, 0x44, 0xFF])
@@ -0,0 +1,56 @@
+"""Tests for the Neiler-8 CPU run loop across its backends"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'cpu'))
+
+import neiler8
+
+try:
+    import neiler8_core
+except ImportError:  # compiled core is optional
+    neiler8_core = None
+
+# INC A; JMP 0x0200 (never halts)
+LOOP = bytes([0x44, 0x70, 0x00, 0x02])
+
+
+def make_cpu(backend, monkeypatch):
+    if backend == 'python':
+        monkeypatch.setattr(neiler8, '_run_jit', None)
+    elif backend == 'numba' and neiler8._run_jit is None:
+        pytest.skip("Numba not installed")
+    elif backend == 'cython':
+        if neiler8_core is None:
+            pytest.skip("compiled core not built")
+        cpu = neiler8_core.Neiler8CPU()
+        cpu.load_program(LOOP)
+        return cpu
+    cpu = neiler8.Neiler8CPU()
+    cpu.load_program(LOOP)
+    return cpu
+
+
+BACKENDS = ['python', 'numba', 'cython']
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('max_cycles', [-1, -5])
+def test_negative_budget_runs_nothing(backend, max_cycles, monkeypatch):
+    cpu = make_cpu(backend, monkeypatch)
+    assert cpu.run(max_cycles) == 0
+    assert cpu.cycles == 0
+    assert cpu.PC == 0x0200
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('max_cycles', [1, 2, 7, 100])
+def test_backends_agree_on_budget(backend, max_cycles, monkeypatch):
+    cpu = make_cpu(backend, monkeypatch)
+    assert cpu.run(max_cycles) == max_cycles
+    reference = make_cpu('python', monkeypatch)
+    assert reference.run(max_cycles) == max_cycles
+    assert (cpu.PC, cpu.get_register('A')) == (reference.PC, reference.get_register('A'))
@@ -7,7 +7,7 @@ Usage: blender --python case_generator.py
 
 import bpy
 import bmesh
-from math import radians
+from math import radians, cos, sin, pi
 
 # Clear existing mesh objects
 bpy.ops.object.select_all(action='SELECT')
@@ -32,13 +32,50 @@ KEYBOARD_HEIGHT = 100
 KEYBOARD_OFFSET_X = 30
 KEYBOARD_OFFSET_Y = 130
 
+# Boolean solver for every cut: Manifold (Blender 4.5+) or Fast. The
+# cutters are closed primitives, so neither needs the Exact solver.
+BOOLEAN_SOLVER = 'MANIFOLD' if bpy.app.version >= (4, 5, 0) else 'FAST'
+
+# Unit cube centered on the origin, faces wound outwards
+CUBE_VERTS = [
+    (-0.5, -0.5, -0.5), (0.5, -0.5, -0.5), (0.5, 0.5, -0.5), (-0.5, 0.5, -0.5),
+    (-0.5, -0.5, 0.5), (0.5, -0.5, 0.5), (0.5, 0.5, 0.5), (-0.5, 0.5, 0.5),
+]
+CUBE_FACES = [
+    (0, 3, 2, 1), (4, 5, 6, 7), (0, 1, 5, 4),
+    (1, 2, 6, 5), (2, 3, 7, 6), (3, 0, 4, 7),
+]
+
+def add_mesh_object(name, verts, faces):
+    """Link a new object built straight from mesh data (no operator call)"""
+    mesh = bpy.data.meshes.new(name)
+    mesh.from_pydata(verts, [], faces)
+    mesh.update()
+    obj = bpy.data.objects.new(name, mesh)
+    bpy.context.collection.objects.link(obj)
+    return obj
+
+def add_cube(name, dimensions=(1, 1, 1)):
+    """Box of the given (x, y, z) dimensions centered on the origin"""
+    w, d, h = dimensions
+    verts = [(x * w, y * d, z * h) for x, y, z in CUBE_VERTS]
+    return add_mesh_object(name, verts, CUBE_FACES)
+
+def add_cylinder(name, radius, depth, vertices=32):
+    """Z-aligned capped cylinder centered on the origin"""
+    ring = [(radius * cos(2 * pi * i / vertices), radius * sin(2 * pi * i / vertices))
+            for i in range(vertices)]
+    verts = [(x, y, -depth/2) for x, y in ring] + [(x, y, depth/2) for x, y in ring]
+    faces = [tuple(range(vertices - 1, -1, -1)), tuple(range(vertices, 2 * vertices))]
+    faces += [(i, (i + 1) % vertices, vertices + (i + 1) % vertices, vertices + i)
+              for i in range(vertices)]
+    return add_mesh_object(name, verts, faces)
+
 def create_rounded_box(name, width, depth, height, radius):
     """Create a box with rounded corners"""
-    bpy.ops.mesh.primitive_cube_add(size=1)
-    obj = bpy.context.active_object
-    obj.name = name
-    obj.scale = (width/2, depth/2, height/2)
-    bpy.ops.object.transform_apply(scale=True)
+    # Half-size like the original scaled unit cube, so the cutters (scaled
+    # to the full wall thickness) still poke through both faces
+    obj = add_cube(name, (width/2, depth/2, height/2))
 
     # Add bevel modifier for rounded edges
     bevel = obj.modifiers.new(name="Bevel", type='BEVEL')
@@ -57,9 +94,7 @@ def create_top_panel():
     top.location = (0, 0, CASE_HEIGHT/2)
 
     # Display cutout
-    bpy.ops.mesh.primitive_cube_add(size=1)
-    display_cutout = bpy.context.active_object
-    display_cutout.name = "DisplayCutout"
+    display_cutout = add_cube("DisplayCutout")
     display_cutout.scale = (DISPLAY_WIDTH/2, DISPLAY_HEIGHT/2, WALL_THICKNESS)
     display_cutout.location = (
         DISPLAY_OFFSET_X - CASE_WIDTH/2 + DISPLAY_WIDTH/2,
@@ -70,12 +105,11 @@ def create_top_panel():
     # Boolean modifier to cut display hole
     bool_mod = top.modifiers.new(name="DisplayCut", type='BOOLEAN')
     bool_mod.operation = 'DIFFERENCE'
+    bool_mod.solver = BOOLEAN_SOLVER
     bool_mod.object = display_cutout
 
     # Keyboard cutout
-    bpy.ops.mesh.primitive_cube_add(size=1)
-    kb_cutout = bpy.context.active_object
-    kb_cutout.name = "KeyboardCutout"
+    kb_cutout = add_cube("KeyboardCutout")
     kb_cutout.scale = (KEYBOARD_WIDTH/2, KEYBOARD_HEIGHT/2, WALL_THICKNESS)
     kb_cutout.location = (
         KEYBOARD_OFFSET_X - CASE_WIDTH/2 + KEYBOARD_WIDTH/2,
@@ -85,6 +119,7 @@ def create_top_panel():
 
     bool_mod2 = top.modifiers.new(name="KeyboardCut", type='BOOLEAN')
     bool_mod2.operation = 'DIFFERENCE'
+    bool_mod2.solver = BOOLEAN_SOLVER
     bool_mod2.object = kb_cutout
 
     # Add ventilation grilles
@@ -95,15 +130,14 @@ def create_top_panel():
 def create_vent_grilles(parent, x, y, z):
     """Create ventilation grilles"""
     for i in range(10):
-        bpy.ops.mesh.primitive_cube_add(size=1)
-        vent = bpy.context.active_object
-        vent.name = f"Vent_{i}"
+        vent = add_cube(f"Vent_{i}")
         vent.scale = (2, 15, WALL_THICKNESS)
         vent.location = (x + i*5 - 25, y, z)
 
         # Boolean to cut vent
         bool_mod = parent.modifiers.new(name=f"VentCut_{i}", type='BOOLEAN')
         bool_mod.operation = 'DIFFERENCE'
+        bool_mod.solver = BOOLEAN_SOLVER
         bool_mod.object = vent
 
 def create_bottom_panel():
@@ -114,22 +148,19 @@ def create_bottom_panel():
     bottom.location = (0, 0, -CASE_HEIGHT/2)
 
     # Battery compartment (raised area)
-    bpy.ops.mesh.primitive_cube_add(size=1)
-    battery_comp = bpy.context.active_object
-    battery_comp.name = "BatteryCompartment"
+    battery_comp = add_cube("BatteryCompartment")
     battery_comp.scale = (150/2, 80/2, 5/2)
     battery_comp.location = (0, -30, -CASE_HEIGHT/2 + 5/2)
 
     # Add rubber feet mounting holes
     for x_pos in [-130, 130]:
         for y_pos in [-80, 80]:
-            bpy.ops.mesh.primitive_cylinder_add(radius=3, depth=WALL_THICKNESS*2)
-            foot_hole = bpy.context.active_object
-            foot_hole.name = f"FootHole_{x_pos}_{y_pos}"
+            foot_hole = add_cylinder(f"FootHole_{x_pos}_{y_pos}", radius=3, depth=WALL_THICKNESS*2)
             foot_hole.location = (x_pos, y_pos, -CASE_HEIGHT/2)
 
             bool_mod = bottom.modifiers.new(name=f"FootCut_{x_pos}_{y_pos}", type='BOOLEAN')
             bool_mod.operation = 'DIFFERENCE'
+            bool_mod.solver = BOOLEAN_SOLVER
             bool_mod.object = foot_hole
 
     return bottom
@@ -145,14 +176,13 @@ def create_side_panels():
     # USB port cutouts on left
     usb_positions = [(0, 50, 10), (0, 50, 25), (0, 50, 40)]
     for idx, (x, y, z) in enumerate(usb_positions):
-        bpy.ops.mesh.primitive_cube_add(size=1)
-        usb = bpy.context.active_object
-        usb.name = f"USB_{idx}"
+        usb = add_cube(f"USB_{idx}")
         usb.scale = (WALL_THICKNESS*2, 15/2, 8/2)
         usb.location = (-CASE_WIDTH/2, y, z)
 
         bool_mod = left.modifiers.new(name=f"USBCut_{idx}", type='BOOLEAN')
         bool_mod.operation = 'DIFFERENCE'
+        bool_mod.solver = BOOLEAN_SOLVER
         bool_mod.object = usb
 
     # Right panel
@@ -160,36 +190,33 @@ def create_side_panels():
     right.location = (CASE_WIDTH/2, 0, 0)
 
     # Ethernet port
-    bpy.ops.mesh.primitive_cube_add(size=1)
-    ethernet = bpy.context.active_object
-    ethernet.name = "EthernetPort"
+    ethernet = add_cube("EthernetPort")
     ethernet.scale = (WALL_THICKNESS*2, 16/2, 14/2)
     ethernet.location = (CASE_WIDTH/2, 50, 15)
 
     bool_mod = right.modifiers.new(name="EthernetCut", type='BOOLEAN')
     bool_mod.operation = 'DIFFERENCE'
+    bool_mod.solver = BOOLEAN_SOLVER
     bool_mod.object = ethernet
 
     # HDMI port
-    bpy.ops.mesh.primitive_cube_add(size=1)
-    hdmi = bpy.context.active_object
-    hdmi.name = "HDMIPort"
+    hdmi = add_cube("HDMIPort")
     hdmi.scale = (WALL_THICKNESS*2, 15/2, 6/2)
     hdmi.location = (CASE_WIDTH/2, 30, 15)
 
     bool_mod = right.modifiers.new(name="HDMICut", type='BOOLEAN')
     bool_mod.operation = 'DIFFERENCE'
+    bool_mod.solver = BOOLEAN_SOLVER
     bool_mod.object = hdmi
 
     # Power switch
-    bpy.ops.mesh.primitive_cylinder_add(radius=8, depth=WALL_THICKNESS*2)
-    power_switch = bpy.context.active_object
-    power_switch.name = "PowerSwitch"
+    power_switch = add_cylinder("PowerSwitch", radius=8, depth=WALL_THICKNESS*2)
     power_switch.rotation_euler = (0, radians(90), 0)
     power_switch.location = (CASE_WIDTH/2, -70, 30)
 
     bool_mod = right.modifiers.new(name="PowerSwitchCut", type='BOOLEAN')
     bool_mod.operation = 'DIFFERENCE'
+    bool_mod.solver = BOOLEAN_SOLVER
     bool_mod.object = power_switch
 
     return left, right
@@ -199,30 +226,25 @@ def create_internal_mounts():
     print("Creating internal mounts...")
 
     # Pi mounting plate
-    bpy.ops.mesh.primitive_cube_add(size=1)
-    pi_mount = bpy.context.active_object
-    pi_mount.name = "PiMount"
+    pi_mount = add_cube("PiMount")
     pi_mount.scale = (85/2, 56/2, 2/2)
     pi_mount.location = (-50, 40, -20)
 
     # Add mounting holes to Pi plate
     for x in [-58/2, 58/2]:
         for y in [-49/2, 49/2]:
-            bpy.ops.mesh.primitive_cylinder_add(radius=1.5, depth=4)
-            hole = bpy.context.active_object
-            hole.name = f"PiHole_{x}_{y}"
+            hole = add_cylinder(f"PiHole_{x}_{y}", radius=1.5, depth=4)
             hole.location = (-50 + x, 40 + y, -20)
 
             bool_mod = pi_mount.modifiers.new(name=f"PiHoleCut_{x}_{y}", type='BOOLEAN')
             bool_mod.operation = 'DIFFERENCE'
+            bool_mod.solver = BOOLEAN_SOLVER
             bool_mod.object = hole
 
     # Standoffs for display
     for x in [-DISPLAY_WIDTH/2 + 10, DISPLAY_WIDTH/2 - 10]:
         for y in [-DISPLAY_HEIGHT/2 + 10, DISPLAY_HEIGHT/2 - 10]:
-            bpy.ops.mesh.primitive_cylinder_add(radius=3, depth=8)
-            standoff = bpy.context.active_object
-            standoff.name = f"DisplayStandoff_{x}_{y}"
+            standoff = add_cylinder(f"DisplayStandoff_{x}_{y}", radius=3, depth=8)
             standoff.location = (
                 DISPLAY_OFFSET_X - CASE_WIDTH/2 + DISPLAY_WIDTH/2 + x,
                 CASE_DEPTH/2 - DISPLAY_OFFSET_Y - DISPLAY_HEIGHT/2 + y,
@@ -230,31 +252,29 @@ def create_internal_mounts():
             )
 
             # Add screw hole
-            bpy.ops.mesh.primitive_cylinder_add(radius=1.5, depth=10)
-            screw_hole = bpy.context.active_object
+            screw_hole = add_cylinder(f"DisplayScrewHole_{x}_{y}", radius=1.5, depth=10)
             screw_hole.location = standoff.location
 
             bool_mod = standoff.modifiers.new(name=f"ScrewHole_{x}_{y}", type='BOOLEAN')
             bool_mod.operation = 'DIFFERENCE'
+            bool_mod.solver = BOOLEAN_SOLVER
             bool_mod.object = screw_hole
 
     # Fan mounts (40mm fans)
     for x_pos in [-60, 60]:
-        bpy.ops.mesh.primitive_cube_add(size=1)
-        fan_mount = bpy.context.active_object
-        fan_mount.name = f"FanMount_{x_pos}"
+        fan_mount = add_cube(f"FanMount_{x_pos}")
         fan_mount.scale = (45/2, 45/2, 2/2)
         fan_mount.location = (x_pos, -CASE_DEPTH/2 + 30, -CASE_HEIGHT/2 + 10)
 
         # Fan screw holes
         for fx in [-16, 16]:
             for fy in [-16, 16]:
-                bpy.ops.mesh.primitive_cylinder_add(radius=2, depth=4)
-                fan_hole = bpy.context.active_object
+                fan_hole = add_cylinder(f"FanHole_{x_pos}_{fx}_{fy}", radius=2, depth=4)
                 fan_hole.location = (x_pos + fx, -CASE_DEPTH/2 + 30 + fy, -CASE_HEIGHT/2 + 10)
 
                 bool_mod = fan_mount.modifiers.new(name=f"FanHole_{x_pos}_{fx}_{fy}", type='BOOLEAN')
                 bool_mod.operation = 'DIFFERENCE'
+                bool_mod.solver = BOOLEAN_SOLVER
                 bool_mod.object = fan_hole
 
 def add_assembly_features():
@@ -270,18 +290,16 @@ def add_assembly_features():
     ]
 
     for idx, (x, y) in enumerate(positions):
-        bpy.ops.mesh.primitive_cylinder_add(radius=4, depth=CASE_HEIGHT - WALL_THICKNESS*2)
-        post = bpy.context.active_object
-        post.name = f"CornerPost_{idx}"
+        post = add_cylinder(f"CornerPost_{idx}", radius=4, depth=CASE_HEIGHT - WALL_THICKNESS*2)
         post.location = (x, y, 0)
 
         # Screw hole through post
-        bpy.ops.mesh.primitive_cylinder_add(radius=1.5, depth=CASE_HEIGHT)
-        hole = bpy.context.active_object
+        hole = add_cylinder(f"PostHole_{idx}", radius=1.5, depth=CASE_HEIGHT)
         hole.location = (x, y, 0)
 
         bool_mod = post.modifiers.new(name=f"PostHole_{idx}", type='BOOLEAN')
         bool_mod.operation = 'DIFFERENCE'
+        bool_mod.solver = BOOLEAN_SOLVER
         bool_mod.object = hole
 
 def create_cable_management():
@@ -289,9 +307,7 @@ def create_cable_management():
     print("Creating cable management...")
 
     # Cable channel along bottom
-    bpy.ops.mesh.primitive_cube_add(size=1)
-    channel = bpy.context.active_object
-    channel.name = "CableChannel"
+    channel = add_cube("CableChannel")
     channel.scale = (250/2, 10/2, 8/2)
     channel.location = (0, -CASE_DEPTH/2 + 15, -CASE_HEIGHT/2 + 8)
 
@@ -323,17 +339,21 @@ def main():
     add_assembly_features()
     create_cable_management()
 
-    # Apply all boolean modifiers
+    # Apply all boolean modifiers: evaluate the scene once and replace
+    # each cut object's mesh with its evaluated result
     print("Applying modifiers...")
-    for obj in bpy.data.objects:
-        if obj.type == 'MESH':
-            bpy.context.view_layer.objects.active = obj
-            for mod in obj.modifiers:
-                if mod.type == 'BOOLEAN':
-                    try:
-                        bpy.ops.object.modifier_apply(modifier=mod.name)
-                    except:
-                        print(f"Could not apply modifier {mod.name} on {obj.name}")
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    baked = [
+        (obj, bpy.data.meshes.new_from_object(obj.evaluated_get(depsgraph)))
+        for obj in bpy.data.objects
+        if obj.type == 'MESH' and any(mod.type == 'BOOLEAN' for mod in obj.modifiers)
+    ]
+    for obj, mesh in baked:
+        old_mesh = obj.data
+        obj.modifiers.clear()
+        obj.data = mesh
+        if old_mesh.users == 0:
+            bpy.data.meshes.remove(old_mesh)
 
     # Clean up boolean objects
     for obj in bpy.data.objects:
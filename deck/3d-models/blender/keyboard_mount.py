@@ -6,7 +6,8 @@ Creates a custom mechanical keyboard mounting plate
 
 import bpy
 import bmesh
-from math import radians
+from math import radians, cos, sin, pi
+from mathutils.geometry import tessellate_polygon
 
 # Clear scene
 bpy.ops.object.select_all(action='SELECT')
@@ -16,6 +17,7 @@ bpy.ops.object.delete(use_global=False)
 KEY_UNIT = 19.05  # 1U key spacing in mm
 PLATE_THICKNESS = 1.5
 SWITCH_HOLE_SIZE = 14  # Cherry MX switch cutout
+CORNER_RADIUS = 3
 
 # Define key layout (60% keyboard)
 LAYOUT = [
@@ -31,29 +33,64 @@ LAYOUT = [
     [(0, 4), (1.25, 4), (2.5, 4), (7, 4), (11.5, 4), (12.5, 4), (13.5, 4)]
 ]
 
-def create_switch_hole(x, y):
+def rect_outline(cx, cy, width, height):
+    """Corners of an axis-aligned rectangle, counter-clockwise"""
+    x0, x1 = cx - width/2, cx + width/2
+    y0, y1 = cy - height/2, cy + height/2
+    return [(x0, y0), (x1, y0), (x1, y1), (x0, y1)]
+
+def circle_outline(cx, cy, radius, segments=32):
+    """Points on a circle, counter-clockwise"""
+    return [(cx + radius * cos(2 * pi * i / segments),
+             cy + radius * sin(2 * pi * i / segments))
+            for i in range(segments)]
+
+def rounded_rect_outline(width, height, radius, segments=4):
+    """Centered rectangle with rounded corners, counter-clockwise"""
+    points = []
+    corners = [(1, 1), (-1, 1), (-1, -1), (1, -1)]
+    for quadrant, (sx, sy) in enumerate(corners):
+        cx = sx * (width/2 - radius)
+        cy = sy * (height/2 - radius)
+        for i in range(segments + 1):
+            angle = (quadrant + i / segments) * pi / 2
+            points.append((cx + radius * cos(angle), cy + radius * sin(angle)))
+    return points
+
+def bounds(outline):
+    xs = [p[0] for p in outline]
+    ys = [p[1] for p in outline]
+    return min(xs), min(ys), max(xs), max(ys)
+
+def add_cutout(cutouts, outline):
+    """Add a hole outline to cutouts
+
+    An outline lying inside an existing rectangular cutout is already
+    open and is dropped; any other overlap cannot be cut topologically.
+    """
+    x0, y0, x1, y1 = bounds(outline)
+    for other in cutouts:
+        ox0, oy0, ox1, oy1 = bounds(other)
+        if x1 <= ox0 or x0 >= ox1 or y1 <= oy0 or y0 >= oy1:
+            continue
+        if len(other) == 4 and ox0 <= x0 and x1 <= ox1 and oy0 <= y0 and y1 <= oy1:
+            return
+        raise ValueError(f"Cutout at ({(x0 + x1)/2:.1f}, {(y0 + y1)/2:.1f}) overlaps another")
+    cutouts.append(outline)
+
+def create_switch_hole(cutouts, x, y):
     """Create a Cherry MX switch cutout"""
-    bpy.ops.mesh.primitive_cube_add(size=SWITCH_HOLE_SIZE)
-    hole = bpy.context.active_object
-    hole.location = (x * KEY_UNIT, y * KEY_UNIT, 0)
-    hole.scale = (1, 1, PLATE_THICKNESS * 2)
-    return hole
+    add_cutout(cutouts, rect_outline(x * KEY_UNIT, y * KEY_UNIT,
+                                     SWITCH_HOLE_SIZE, SWITCH_HOLE_SIZE))
 
-def create_stabilizer_holes(x, y, key_size=2):
+def create_stabilizer_holes(cutouts, x, y, key_size=2):
     """Create stabilizer cutouts for larger keys"""
     stab_offset = (key_size * KEY_UNIT - SWITCH_HOLE_SIZE) / 2 - 12
 
-    holes = []
     for offset in [-stab_offset, stab_offset]:
-        bpy.ops.mesh.primitive_cube_add(size=1)
-        hole = bpy.context.active_object
-        hole.scale = (3.5, 6.5, PLATE_THICKNESS * 2)
-        hole.location = (x * KEY_UNIT + offset, y * KEY_UNIT, 0)
-        holes.append(hole)
+        add_cutout(cutouts, rect_outline(x * KEY_UNIT + offset, y * KEY_UNIT, 3.5, 6.5))
 
-    return holes
-
-def create_mounting_holes(plate_width, plate_height):
+def create_mounting_holes(cutouts, plate_width, plate_height):
     """Create screw holes for mounting the plate"""
     margin = 10
     positions = [
@@ -65,14 +102,37 @@ def create_mounting_holes(plate_width, plate_height):
         (plate_width/2, plate_height - margin)
     ]
 
-    holes = []
     for x, y in positions:
-        bpy.ops.mesh.primitive_cylinder_add(radius=2, depth=PLATE_THICKNESS * 2)
-        hole = bpy.context.active_object
-        hole.location = (x - plate_width/2, y - plate_height/2, 0)
-        holes.append(hole)
-
-    return holes
+        add_cutout(cutouts, circle_outline(x - plate_width/2, y - plate_height/2, 2))
+
+def build_plate(bm, outline, cutouts, thickness):
+    """Build a flat plate with through holes directly as mesh topology
+
+    The top and bottom faces are the outline triangulated around the
+    cutouts; every loop then gets a ring of wall quads.
+    """
+    loops = [outline] + cutouts
+    bottom = []
+    top = []
+    for loop in loops:
+        for x, y in loop:
+            bottom.append(bm.verts.new((x, y, -thickness/2)))
+            top.append(bm.verts.new((x, y, thickness/2)))
+
+    for a, b, c in tessellate_polygon(loops):
+        bm.faces.new((top[a], top[b], top[c]))
+        bm.faces.new((bottom[c], bottom[b], bottom[a]))
+
+    start = 0
+    for loop in loops:
+        n = len(loop)
+        for i in range(n):
+            j = start + (i + 1) % n
+            k = start + i
+            bm.faces.new((bottom[k], bottom[j], top[j], top[k]))
+        start += n
+
+    bmesh.ops.recalc_face_normals(bm, faces=bm.faces[:])
 
 def main():
     """Generate keyboard mounting plate"""
@@ -85,49 +145,30 @@ def main():
     plate_width = (max_x + 1.5) * KEY_UNIT
     plate_height = (max_y + 1.5) * KEY_UNIT
 
-    # Create base plate
-    bpy.ops.mesh.primitive_cube_add(size=1)
-    plate = bpy.context.active_object
-    plate.name = "KeyboardPlate"
-    plate.scale = (plate_width/2, plate_height/2, PLATE_THICKNESS/2)
-
-    # Add rounded corners
-    bevel = plate.modifiers.new(name="Bevel", type='BEVEL')
-    bevel.width = 3
-    bevel.segments = 4
+    cutouts = []
 
     # Create switch holes
-    all_holes = []
     for row in LAYOUT:
         for x, y in row:
-            hole = create_switch_hole(x - max_x/2, y - max_y/2)
-            all_holes.append(hole)
+            create_switch_hole(cutouts, x - max_x/2, y - max_y/2)
 
     # Add stabilizer holes for spacebar (assume 6.25U)
-    stab_holes = create_stabilizer_holes(7 - max_x/2, 4 - max_y/2, 6.25)
-    all_holes.extend(stab_holes)
+    create_stabilizer_holes(cutouts, 7 - max_x/2, 4 - max_y/2, 6.25)
 
     # Add mounting holes
-    mount_holes = create_mounting_holes(plate_width, plate_height)
-    all_holes.extend(mount_holes)
-
-    # Boolean operations to cut holes
-    for idx, hole in enumerate(all_holes):
-        bool_mod = plate.modifiers.new(name=f"Cut_{idx}", type='BOOLEAN')
-        bool_mod.operation = 'DIFFERENCE'
-        bool_mod.object = hole
-
-    # Apply modifiers
+    create_mounting_holes(cutouts, plate_width, plate_height)
+
+    # Create base plate with rounded corners and the holes already open
+    bm = bmesh.new()
+    outline = rounded_rect_outline(plate_width, plate_height, CORNER_RADIUS)
+    build_plate(bm, outline, cutouts, PLATE_THICKNESS)
+
+    mesh = bpy.data.meshes.new("KeyboardPlate")
+    bm.to_mesh(mesh)
+    bm.free()
+    plate = bpy.data.objects.new("KeyboardPlate", mesh)
+    bpy.context.collection.objects.link(plate)
     bpy.context.view_layer.objects.active = plate
-    for mod in plate.modifiers:
-        try:
-            bpy.ops.object.modifier_apply(modifier=mod.name)
-        except:
-            pass
-
-    # Clean up boolean objects
-    for hole in all_holes:
-        bpy.data.objects.remove(hole, do_unlink=True)
 
     print(f"Keyboard plate generated: {plate_width:.1f}mm x {plate_height:.1f}mm")
     print("Ready for export!")
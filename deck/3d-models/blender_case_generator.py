@@ -6,15 +6,44 @@ Parametric 3D case design using Blender Python API
 Usage:
     blender --background --python blender_case_generator.py
     or run from within Blender's scripting environment
+
+    Export STL files (one background Blender per part with --jobs):
+    blender --background --python blender_case_generator.py -- --export DIR [--jobs N]
 """
 
+import argparse
+import os
+import struct
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
 import bpy
 import bmesh
+import numpy as np
 from math import radians
+from mathutils import Matrix
 
 # Case parameters (all dimensions in mm, converted to Blender units)
 SCALE = 0.001  # mm to meters for Blender
 
+DEFAULT_STL_DIR = "/home/neil/neilerdeck/3d-models/stl/"
+
+# Same solver policy as blender/case_generator.py (see BOOLEAN_SOLVER there)
+BOOLEAN_SOLVER = 'MANIFOLD' if bpy.app.version >= (4, 5, 0) else 'FAST'
+
+# Exported objects and their STL file names
+STL_PARTS = {
+    "TopPanel": "top_panel.stl",
+    "BottomPanel": "bottom_panel.stl",
+    "LeftSidePanel": "left_side.stl",
+    "RightSidePanel": "right_side.stl",
+    "FrontPanel": "front_panel.stl",
+    "BackPanel": "back_panel.stl",
+    "PiMount": "pi_mount.stl",
+    "BatteryHolder": "battery_holder.stl"
+}
+
 class NeilerdeckCase:
     def __init__(self):
         # Main dimensions
@@ -47,25 +76,95 @@ class NeilerdeckCase:
         self.fan_diameter = 40 * SCALE
         self.vent_hole_size = 3 * SCALE
 
+        # Beveled unit cubes by bevel radius, shared by every rounded box
+        self._unit_rounded_mesh_cache = {}
+
     def clear_scene(self):
         """Remove all objects from scene"""
-        bpy.ops.object.select_all(action='SELECT')
-        bpy.ops.object.delete()
+        # Drop the data-blocks directly (no operators, no undo steps), and
+        # the meshes with them so regenerating doesn't pile up orphans
+        for obj in list(bpy.data.objects):
+            bpy.data.objects.remove(obj, do_unlink=True)
+        for mesh in list(bpy.data.meshes):
+            bpy.data.meshes.remove(mesh)
+        self._unit_rounded_mesh_cache.clear()
+
+    def add_mesh_object(self, name, bm, location):
+        """Turn bm into a new mesh object at location (bm is freed)"""
+        mesh = bpy.data.meshes.new(name)
+        bm.to_mesh(mesh)
+        bm.free()
+        return self.link_mesh(name, mesh, location)
+
+    def link_mesh(self, name, mesh, location):
+        """Link a new object using mesh into the scene at location"""
+        obj = bpy.data.objects.new(name, mesh)
+        bpy.context.collection.objects.link(obj)
+        obj.location = location
+        return obj
 
     def create_rounded_box(self, name, size, location, radius=0.005):
         """Create a rounded box primitive"""
-        bpy.ops.mesh.primitive_cube_add(size=1, location=location)
-        obj = bpy.context.active_object
-        obj.name = name
+        # Boxes differ only by transform, so all boxes with the same radius
+        # link one beveled unit cube
+        mesh = self._unit_rounded_mesh_cache.get(radius)
+        if mesh is None:
+            bm = bmesh.new()
+            bmesh.ops.create_cube(bm, size=1)
+
+            # Rounded edges, as a bevel modifier with these settings would give
+            bmesh.ops.bevel(bm, geom=bm.edges[:], offset=radius, segments=4,
+                            profile=0.5, affect='EDGES', clamp_overlap=True)
+
+            mesh = bpy.data.meshes.new(f"RoundedUnitCube_{radius}")
+            bm.to_mesh(mesh)
+            bm.free()
+            self._unit_rounded_mesh_cache[radius] = mesh
+
+        obj = self.link_mesh(name, mesh, location)
         obj.scale = size
 
-        # Add bevel modifier for rounded edges
-        bevel = obj.modifiers.new(name="Bevel", type='BEVEL')
-        bevel.width = radius
-        bevel.segments = 4
-
         return obj
 
+    def create_cylinder(self, name, radius, depth, location, segments=32):
+        """Create a capped Z-aligned cylinder"""
+        bm = bmesh.new()
+        bmesh.ops.create_cone(bm, cap_ends=True, segments=segments,
+                              radius1=radius, radius2=radius, depth=depth)
+        return self.add_mesh_object(name, bm, location)
+
+    def create_cylinders(self, name, radius, depth, positions, segments=32):
+        """Create one object holding a capped Z-aligned cylinder per position"""
+        bm = bmesh.new()
+        for pos in positions:
+            bmesh.ops.create_cone(bm, cap_ends=True, segments=segments,
+                                  radius1=radius, radius2=radius, depth=depth,
+                                  matrix=Matrix.Translation(pos))
+        return self.add_mesh_object(name, bm, (0, 0, 0))
+
+    def cut_holes(self, obj, cutters):
+        """Subtract all cutters from obj with a single boolean modifier"""
+        bpy.ops.object.select_all(action='DESELECT')
+        for cutter in cutters:
+            cutter.select_set(True)
+        bpy.context.view_layer.objects.active = cutters[0]
+        if len(cutters) > 1:
+            # Joining writes into the active object's mesh; don't let that
+            # land in a mesh other boxes still share
+            cutters[0].data = cutters[0].data.copy()
+            bpy.ops.object.join()
+        combined = bpy.context.view_layer.objects.active
+        combined.name = f"CombinedCut_{obj.name}"
+
+        mod = obj.modifiers.new(name="Cutouts", type='BOOLEAN')
+        mod.operation = 'DIFFERENCE'
+        mod.solver = BOOLEAN_SOLVER
+        mod.use_self = False
+        mod.object = combined
+        combined.hide_viewport = True
+
+        return combined
+
     def create_top_panel(self):
         """Generate top panel with display and keyboard cutouts"""
         panel = self.create_rounded_box(
@@ -82,12 +181,6 @@ class NeilerdeckCase:
             radius=0.002
         )
 
-        # Boolean difference for display
-        mod = panel.modifiers.new(name="DisplayCut", type='BOOLEAN')
-        mod.operation = 'DIFFERENCE'
-        mod.object = display_cut
-        display_cut.hide_viewport = True
-
         # Keyboard area cutout
         keyboard_cut = self.create_rounded_box(
             "KeyboardCutout",
@@ -96,13 +189,11 @@ class NeilerdeckCase:
             radius=0.002
         )
 
-        mod = panel.modifiers.new(name="KeyboardCut", type='BOOLEAN')
-        mod.operation = 'DIFFERENCE'
-        mod.object = keyboard_cut
-        keyboard_cut.hide_viewport = True
-
         # Add mounting holes (M3 screws)
-        self.add_mounting_holes(panel, 4)
+        holes = self.add_mounting_holes(panel, 4)
+
+        # One boolean for the display, keyboard and screw holes
+        self.cut_holes(panel, [display_cut, keyboard_cut, holes])
 
         return panel
 
@@ -120,12 +211,6 @@ class NeilerdeckCase:
             [0, 0, -self.case_height/2]
         )
 
-        # Boolean for ventilation
-        mod = panel.modifiers.new(name="Ventilation", type='BOOLEAN')
-        mod.operation = 'DIFFERENCE'
-        mod.object = vent_array
-        vent_array.hide_viewport = True
-
         # Battery access panel cutout
         battery_access = self.create_rounded_box(
             "BatteryAccess",
@@ -133,10 +218,7 @@ class NeilerdeckCase:
             [-80 * SCALE, -50 * SCALE, -self.case_height/2]
         )
 
-        mod = panel.modifiers.new(name="BatteryAccess", type='BOOLEAN')
-        mod.operation = 'DIFFERENCE'
-        mod.object = battery_access
-        battery_access.hide_viewport = True
+        self.cut_holes(panel, [vent_array, battery_access])
 
         return panel
 
@@ -156,6 +238,7 @@ class NeilerdeckCase:
             [-self.case_width/2, 50 * SCALE, -20 * SCALE],
         ]
 
+        usb_cuts = []
         for i, pos in enumerate(usb_positions):
             usb_cut = self.create_rounded_box(
                 f"USB_Port_{i}",
@@ -163,10 +246,9 @@ class NeilerdeckCase:
                 pos,
                 radius=0.001
             )
-            mod = left_panel.modifiers.new(name=f"USB_{i}", type='BOOLEAN')
-            mod.operation = 'DIFFERENCE'
-            mod.object = usb_cut
-            usb_cut.hide_viewport = True
+            usb_cuts.append(usb_cut)
+
+        self.cut_holes(left_panel, usb_cuts)
 
         # Right side
         right_panel = self.create_rounded_box(
@@ -182,10 +264,6 @@ class NeilerdeckCase:
             [self.case_width/2, 50 * SCALE, 0],
             radius=0.001
         )
-        mod = right_panel.modifiers.new(name="Ethernet", type='BOOLEAN')
-        mod.operation = 'DIFFERENCE'
-        mod.object = eth_cut
-        eth_cut.hide_viewport = True
 
         # Power switch cutout
         power_cut = self.create_rounded_box(
@@ -193,10 +271,8 @@ class NeilerdeckCase:
             [self.wall_thickness, 15 * SCALE, 10 * SCALE],
             [self.case_width/2, -70 * SCALE, 10 * SCALE]
         )
-        mod = right_panel.modifiers.new(name="PowerSwitch", type='BOOLEAN')
-        mod.operation = 'DIFFERENCE'
-        mod.object = power_cut
-        power_cut.hide_viewport = True
+
+        self.cut_holes(right_panel, [eth_cut, power_cut])
 
         return left_panel, right_panel
 
@@ -222,12 +298,8 @@ class NeilerdeckCase:
             [50 * SCALE, -self.case_depth/2, 0]
         ]
 
-        for i, pos in enumerate(fan_positions):
-            fan_cut = self.create_fan_cutout(f"Fan_{i}", pos)
-            mod = back_panel.modifiers.new(name=f"Fan_{i}", type='BOOLEAN')
-            mod.operation = 'DIFFERENCE'
-            mod.object = fan_cut
-            fan_cut.hide_viewport = True
+        back_cuts = [self.create_fan_cutout(f"Fan_{i}", pos)
+                     for i, pos in enumerate(fan_positions)]
 
         # HDMI port
         hdmi_cut = self.create_rounded_box(
@@ -236,70 +308,75 @@ class NeilerdeckCase:
             [0, -self.case_depth/2, -15 * SCALE],
             radius=0.001
         )
-        mod = back_panel.modifiers.new(name="HDMI", type='BOOLEAN')
-        mod.operation = 'DIFFERENCE'
-        mod.object = hdmi_cut
-        hdmi_cut.hide_viewport = True
+        back_cuts.append(hdmi_cut)
+
+        self.cut_holes(back_panel, back_cuts)
 
         return front_panel, back_panel
 
     def create_fan_cutout(self, name, position):
         """Create circular fan cutout with mounting holes"""
-        bpy.ops.mesh.primitive_cylinder_add(
-            radius=self.fan_diameter/2,
-            depth=self.wall_thickness * 2,
-            location=position
-        )
-        fan = bpy.context.active_object
-        fan.name = name
+        fan = self.create_cylinder(name, self.fan_diameter/2,
+                                   self.wall_thickness * 2, position)
         fan.rotation_euler = (0, radians(90), 0)
 
         return fan
 
-    def create_ventilation_grid(self, rows, cols, position):
+    def create_ventilation_grid(self, rows, cols, position, segments=16):
         """Create grid of ventilation holes"""
-        spacing_x = 10 * SCALE
-        spacing_y = 10 * SCALE
-
-        bpy.ops.mesh.primitive_plane_add(location=position)
-        grid = bpy.context.active_object
-        grid.name = "VentilationGrid"
-
-        # Use array modifiers for grid
-        array_x = grid.modifiers.new(name="ArrayX", type='ARRAY')
-        array_x.count = cols
-        array_x.relative_offset_displace = (1.5, 0, 0)
-
-        array_y = grid.modifiers.new(name="ArrayY", type='ARRAY')
-        array_y.count = rows
-        array_y.relative_offset_displace = (0, 1.5, 0)
-
-        grid.scale = (self.vent_hole_size, self.vent_hole_size, 1)
+        spacing_x = 3 * self.vent_hole_size
+        spacing_y = 3 * self.vent_hole_size
+        half_depth = self.wall_thickness
+
+        # Hole centers, first hole centered on position
+        xx, yy = np.meshgrid(np.arange(cols) * spacing_x,
+                             np.arange(rows) * spacing_y)
+        centers = np.column_stack([xx.ravel(), yy.ravel()])
+
+        # Every hole is the same ring moved to its center: vertices are
+        # (hole, bottom/top, segment, xyz)
+        angles = np.linspace(0, 2 * np.pi, segments, endpoint=False)
+        ring = self.vent_hole_size * np.column_stack([np.cos(angles), np.sin(angles)])
+        verts = np.empty((len(centers), 2, segments, 3))
+        verts[..., :2] = centers[:, None, None, :] + ring
+        verts[:, 0, :, 2] = -half_depth
+        verts[:, 1, :, 2] = half_depth
+
+        # Faces of one hole, wound outwards, then offset for every hole
+        i = np.arange(segments)
+        j = (i + 1) % segments
+        first = np.arange(len(centers))[:, None, None] * 2 * segments
+        sides = (np.column_stack([i, j, j + segments, i + segments]) + first).reshape(-1, 4)
+        bottoms = (i[::-1] + first).reshape(-1, segments)
+        tops = (i + segments + first).reshape(-1, segments)
+
+        mesh = bpy.data.meshes.new("VentilationGrid")
+        mesh.from_pydata(verts.reshape(-1, 3).tolist(), [],
+                         sides.tolist() + bottoms.tolist() + tops.tolist())
+        mesh.update()
+        grid = self.link_mesh("VentilationGrid", mesh, position)
 
         return grid
 
     def add_mounting_holes(self, obj, count=4):
-        """Add mounting holes to corners"""
-        hole_positions = [
-            [130 * SCALE, 90 * SCALE],
-            [-130 * SCALE, 90 * SCALE],
-            [130 * SCALE, -90 * SCALE],
-            [-130 * SCALE, -90 * SCALE]
-        ]
-
-        for i, (x, y) in enumerate(hole_positions[:count]):
-            bpy.ops.mesh.primitive_cylinder_add(
-                radius=1.5 * SCALE,  # M3 hole
-                depth=self.wall_thickness * 2,
-                location=[x, y, obj.location.z]
-            )
-            hole = bpy.context.active_object
-            hole.name = f"MountingHole_{i}"
-
-            mod = obj.modifiers.new(name=f"Hole_{i}", type='BOOLEAN')
-            mod.operation = 'DIFFERENCE'
-            mod.object = hole
-            hole.hide_viewport = True
+        """Create one cutter for mounting holes in obj's corners"""
+        hole_positions = np.array([
+            [130, 90],
+            [-130, 90],
+            [130, -90],
+            [-130, -90]
+        ]) * SCALE
+
+        positions = np.zeros((count, 3))
+        positions[:, :2] = hole_positions[:count]
+        positions[:, 2] = obj.location.z
+
+        return self.create_cylinders(
+            "MountingHoles",
+            1.5 * SCALE,  # M3 hole
+            self.wall_thickness * 2,
+            positions
+        )
 
     def create_internal_mounts(self):
         """Create internal mounting plates for components"""
@@ -312,30 +389,26 @@ class NeilerdeckCase:
         )
 
         # Add Pi mounting holes (58mm x 49mm)
-        pi_hole_positions = [
-            [3.5 * SCALE, 3.5 * SCALE],
-            [61.5 * SCALE, 3.5 * SCALE],
-            [3.5 * SCALE, 52.5 * SCALE],
-            [61.5 * SCALE, 52.5 * SCALE]
-        ]
-
-        for i, (x, y) in enumerate(pi_hole_positions):
-            bpy.ops.mesh.primitive_cylinder_add(
-                radius=1.5 * SCALE,
-                depth=self.pi_mount_size[2] * 2,
-                location=[
-                    self.pi_mount_pos[0] + x - 32 * SCALE,
-                    self.pi_mount_pos[1] + y - 28 * SCALE,
-                    self.pi_mount_pos[2]
-                ]
-            )
-            hole = bpy.context.active_object
-            hole.name = f"PiHole_{i}"
+        pi_hole_positions = np.array([
+            [3.5, 3.5],
+            [61.5, 3.5],
+            [3.5, 52.5],
+            [61.5, 52.5]
+        ]) * SCALE
+
+        # Relative to the plate center
+        positions = np.zeros((len(pi_hole_positions), 3))
+        positions[:, :2] = pi_hole_positions - np.array([32, 28]) * SCALE
+        positions += self.pi_mount_pos
+
+        pi_holes = self.create_cylinders(
+            "PiHoles",
+            1.5 * SCALE,
+            self.pi_mount_size[2] * 2,
+            positions
+        )
 
-            mod = pi_mount.modifiers.new(name=f"PiHole_{i}", type='BOOLEAN')
-            mod.operation = 'DIFFERENCE'
-            mod.object = hole
-            hole.hide_viewport = True
+        self.cut_holes(pi_mount, [pi_holes])
 
         # Battery holder
         battery_holder = self.create_rounded_box(
@@ -376,44 +449,89 @@ class NeilerdeckCase:
         print("Bottom panel: Export as bottom_panel.stl")
         print("Apply all modifiers before exporting")
 
-    def export_stl_files(self, output_dir="/home/neil/neilerdeck/3d-models/stl/"):
-        """Export all parts as STL files"""
-        import os
+    def write_stl(self, obj, filepath, depsgraph=None):
+        """Write obj's evaluated mesh (modifiers and transform applied) as binary STL"""
+        if depsgraph is None:
+            depsgraph = bpy.context.evaluated_depsgraph_get()
+        obj_eval = obj.evaluated_get(depsgraph)
+        mesh = obj_eval.to_mesh()
+        try:
+            mesh.transform(obj.matrix_world)
+            mesh.calc_loop_triangles()
+            verts = mesh.vertices
+            tris = mesh.loop_triangles
+
+            # 80-byte header, triangle count, then 50 bytes per triangle
+            buf = bytearray(84 + 50 * len(tris))
+            buf[:80] = obj.name.encode()[:80].ljust(80, b'\0')
+            struct.pack_into('<I', buf, 80, len(tris))
+            offset = 84
+            for tri in tris:
+                a, b, c = tri.vertices
+                struct.pack_into('<12fH', buf, offset, *tri.normal,
+                                 *verts[a].co, *verts[b].co, *verts[c].co, 0)
+                offset += 50
+        finally:
+            obj_eval.to_mesh_clear()
+
+        with open(filepath, 'wb') as f:
+            f.write(buf)
+
+    def export_stl_files(self, output_dir=DEFAULT_STL_DIR, parts=None):
+        """Export parts (default: all of STL_PARTS) as STL files"""
         os.makedirs(output_dir, exist_ok=True)
 
-        parts = {
-            "TopPanel": "top_panel.stl",
-            "BottomPanel": "bottom_panel.stl",
-            "LeftSidePanel": "left_side.stl",
-            "RightSidePanel": "right_side.stl",
-            "FrontPanel": "front_panel.stl",
-            "BackPanel": "back_panel.stl",
-            "PiMount": "pi_mount.stl",
-            "BatteryHolder": "battery_holder.stl"
-        }
-
-        for obj_name, filename in parts.items():
-            if obj_name in bpy.data.objects:
-                obj = bpy.data.objects[obj_name]
-                bpy.ops.object.select_all(action='DESELECT')
-                obj.select_set(True)
-                bpy.context.view_layer.objects.active = obj
-
-                # Apply modifiers
-                for mod in obj.modifiers:
-                    bpy.ops.object.modifier_apply(modifier=mod.name)
+        # Evaluate every part's booleans in one depsgraph update; Blender
+        # evaluates the independent panels in parallel
+        depsgraph = bpy.context.evaluated_depsgraph_get()
 
+        for obj_name in parts or STL_PARTS:
+            filename = STL_PARTS[obj_name]
+            if obj_name in bpy.data.objects:
                 filepath = os.path.join(output_dir, filename)
-                bpy.ops.export_mesh.stl(
-                    filepath=filepath,
-                    use_selection=True
-                )
+                self.write_stl(bpy.data.objects[obj_name], filepath, depsgraph)
                 print(f"Exported: {filepath}")
 
+    def export_stl_parallel(self, output_dir=DEFAULT_STL_DIR, jobs=None, parts=None):
+        """Export parts (default: all of STL_PARTS), one Blender process each
+
+        Parts are independent, so their boolean evaluation and export run
+        side by side; each process builds the case and writes one STL.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        script = os.path.abspath(__file__)
+
+        def export_part(obj_name):
+            subprocess.run([
+                bpy.app.binary_path, "--background", "--factory-startup",
+                "--python", script, "--",
+                "--export", output_dir, "--part", obj_name
+            ], check=True)
+
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            list(pool.map(export_part, parts or STL_PARTS))
+
+def parse_args():
+    """Parse the script's own arguments (those after Blender's '--')"""
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(prog="blender_case_generator.py")
+    parser.add_argument("--export", metavar="DIR",
+                        help="write STL files to DIR")
+    parser.add_argument("--part", action="append", choices=list(STL_PARTS),
+                        help="export only this part (repeatable)")
+    parser.add_argument("--jobs", type=int,
+                        help="export each part in its own Blender process, "
+                             "N at a time")
+    return parser.parse_args(argv)
+
 # Main execution
 if __name__ == "__main__":
+    args = parse_args()
     generator = NeilerdeckCase()
-    generator.generate_complete_case()
 
-    # Uncomment to auto-export STL files
-    # generator.export_stl_files()
+    if args.export and args.jobs:
+        generator.export_stl_parallel(args.export, args.jobs, args.part)
+    else:
+        generator.generate_complete_case()
+        if args.export:
+            generator.export_stl_files(args.export, args.part)
@@ -17,14 +17,34 @@ class Component:
     url: str
     specs: Dict
 
+VENDORS = ['adafruit', 'sparkfun', 'aliexpress', 'amazon']
+
 class ComponentResearcher:
     def __init__(self):
         self.components = []
 
+        # One keep-alive session for all vendor API calls, so repeated
+        # lookups reuse connections instead of a new TCP+TLS handshake each
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=len(VENDORS),
+                                                pool_maxsize=len(VENDORS))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def close(self):
+        """Close the pooled vendor connections"""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
     def search_component(self, query: str, category: str):
         """Search for components by query"""
         print(f"Researching: {query} in category {category}")
-        # Placeholder for actual API integration
+        # Placeholder for actual API integration (use self.session)
         # Could integrate with:
         # - AliExpress API
         # - Amazon Product API
@@ -39,9 +59,8 @@ class ComponentResearcher:
 
     def check_availability(self, component_name: str):
         """Check stock status across vendors"""
-        vendors = ['adafruit', 'sparkfun', 'aliexpress', 'amazon']
         print(f"Checking availability for {component_name}")
-        for vendor in vendors:
+        for vendor in VENDORS:
             print(f"  {vendor}: Checking...")
 
     def get_alternatives(self, component: str):
@@ -51,10 +70,9 @@ class ComponentResearcher:
         pass
 
 if __name__ == "__main__":
-    researcher = ComponentResearcher()
-
-    # Example usage
-    print("Neilerdeck Component Researcher")
-    print("================================")
-    researcher.search_component("Raspberry Pi 5 8GB", "sbc")
-    researcher.check_availability("Waveshare 7.9 inch display")
+    with ComponentResearcher() as researcher:
+        # Example usage
+        print("Neilerdeck Component Researcher")
+        print("================================")
+        researcher.search_component("Raspberry Pi 5 8GB", "sbc")
+        researcher.check_availability("Waveshare 7.9 inch display")
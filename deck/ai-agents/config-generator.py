@@ -4,24 +4,17 @@ Neilerdeck Configuration Generator Agent
 Auto-generates system configs based on hardware choices
 """
 
+import string
 import yaml
 import json
 
-class ConfigGenerator:
-    def __init__(self):
-        self.hardware_profile = {}
-
-    def detect_hardware(self):
-        """Detect installed hardware"""
-        print("Detecting hardware...")
-        # Read from /proc, /sys, lsusb, etc.
-        pass
+# libyaml's C emitter when PyYAML was built with it
+YAML_DUMPER = yaml.CSafeDumper if yaml.__with_libyaml__ else yaml.SafeDumper
 
-    def generate_boot_config(self, pi_model: str):
-        """Generate /boot/config.txt"""
-        config = """
+# Parsed once at import; only the model changes between configs
+BOOT_CONFIG_TEMPLATE = string.Template("""
 # Neilerdeck Boot Configuration
-# Generated for {model}
+# Generated for ${model}
 
 # Display
 dtoverlay=vc4-kms-v3d
@@ -41,7 +34,21 @@ arm_freq=2400
 
 # GPU
 gpu_mem=128
-""".format(model=pi_model)
+""")
+
+class ConfigGenerator:
+    def __init__(self):
+        self.hardware_profile = {}
+
+    def detect_hardware(self):
+        """Detect installed hardware"""
+        print("Detecting hardware...")
+        # Read from /proc, /sys, lsusb, etc.
+        pass
+
+    def generate_boot_config(self, pi_model: str):
+        """Generate /boot/config.txt"""
+        config = BOOT_CONFIG_TEMPLATE.substitute(model=pi_model)
 
         return config
 
@@ -61,7 +68,7 @@ gpu_mem=128
                 'autostart': False
             }
         }
-        return yaml.dump(config)
+        return yaml.dump(config, Dumper=YAML_DUMPER)
 
     def generate_power_profile(self, battery_capacity: int):
         """Generate power management profile"""
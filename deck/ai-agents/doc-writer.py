@@ -188,8 +188,9 @@ Built by Neil - {date}
         for filename, content in docs.items():
             filepath = os.path.join(self.root, filename)
             os.makedirs(os.path.dirname(filepath), exist_ok=True)
-            with open(filepath, 'w') as f:
-                f.write(content)
+            # Encode once and skip the text layer entirely
+            with open(filepath, 'wb') as f:
+                f.write(content.encode('utf-8'))
             print(f"Generated: {filepath}")
 
 if __name__ == "__main__":
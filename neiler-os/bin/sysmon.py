@@ -4,18 +4,26 @@ Neiler-64 System Monitor
 Real-time system monitoring for Neiler-OS
 """
 
+import heapq
 import time
 import psutil
 import socket
 import sys
 from datetime import datetime, timedelta
 
+# Fixed for the lifetime of the process
+CPU_COUNT = psutil.cpu_count()
+BOOT_TIME = datetime.fromtimestamp(psutil.boot_time())
+
 def get_system_info():
-    """Get comprehensive system information"""
+    """Get comprehensive system information
+
+    CPU usage is measured since the previous call, so the counter has to
+    be primed with psutil.cpu_percent(interval=None) beforehand.
+    """
 
     # CPU info
-    cpu_percent = psutil.cpu_percent(interval=1)
-    cpu_count = psutil.cpu_count()
+    cpu_percent = psutil.cpu_percent(interval=None)
     cpu_freq = psutil.cpu_freq()
 
     # Memory info
@@ -28,13 +36,12 @@ def get_system_info():
     net_io = psutil.net_io_counters()
 
     # System uptime
-    boot_time = datetime.fromtimestamp(psutil.boot_time())
-    uptime = datetime.now() - boot_time
+    uptime = datetime.now() - BOOT_TIME
 
     return {
         'cpu': {
             'percent': cpu_percent,
-            'count': cpu_count,
+            'count': CPU_COUNT,
             'freq': cpu_freq.current if cpu_freq else 0
         },
         'memory': {
@@ -56,13 +63,20 @@ def get_system_info():
         'uptime': uptime
     }
 
+BYTE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+BAR_FULL = '█' * 50
+BAR_EMPTY = '░' * 50
+
 def format_bytes(bytes_val):
     """Format bytes to human-readable format"""
-    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-        if bytes_val < 1024.0:
-            return f"{bytes_val:.2f} {unit}"
-        bytes_val /= 1024.0
-    return f"{bytes_val:.2f} PB"
+    # bit_length() - 1 is floor(log2), so every 10 bits is one 1024 step
+    i = min((int(bytes_val).bit_length() - 1) // 10, 5) if bytes_val >= 1 else 0
+    return f"{bytes_val / (1 << (10 * i)):.2f} {BYTE_UNITS[i]}"
+
+def usage_bar(percent):
+    """50-column bar for a 0-100 percentage"""
+    n = int(percent / 2)
+    return BAR_FULL[:n] + BAR_EMPTY[n:]
 
 def print_system_stats():
     """Print formatted system statistics"""
@@ -81,7 +95,7 @@ def print_system_stats():
     print(f"  • Cores: {info['cpu']['count']}")
     print(f"  • Frequency: {info['cpu']['freq']:.2f} MHz")
     print(f"  • Usage: {info['cpu']['percent']}%")
-    cpu_bar = '█' * int(info['cpu']['percent'] / 2) + '░' * (50 - int(info['cpu']['percent'] / 2))
+    cpu_bar = usage_bar(info['cpu']['percent'])
     print(f"  [{cpu_bar}]")
 
     # Memory
@@ -90,7 +104,7 @@ def print_system_stats():
     print(f"  • Used: {format_bytes(info['memory']['used'])}")
     print(f"  • Available: {format_bytes(info['memory']['available'])}")
     print(f"  • Usage: {info['memory']['percent']}%")
-    mem_bar = '█' * int(info['memory']['percent'] / 2) + '░' * (50 - int(info['memory']['percent'] / 2))
+    mem_bar = usage_bar(info['memory']['percent'])
     print(f"  [{mem_bar}]")
 
     # Disk
@@ -99,7 +113,7 @@ def print_system_stats():
     print(f"  • Used: {format_bytes(info['disk']['used'])}")
     print(f"  • Free: {format_bytes(info['disk']['free'])}")
     print(f"  • Usage: {info['disk']['percent']}%")
-    disk_bar = '█' * int(info['disk']['percent'] / 2) + '░' * (50 - int(info['disk']['percent'] / 2))
+    disk_bar = usage_bar(info['disk']['percent'])
     print(f"  [{disk_bar}]")
 
     # Network
@@ -109,6 +123,16 @@ def print_system_stats():
 
     # Processes
     print(f"\nTop Processes:")
+    # The first cpu_percent() of a process is always 0.0; prime every
+    # process and measure on a second pass (process_iter reuses the
+    # same Process objects between calls)
+    for proc in psutil.process_iter(['pid']):
+        try:
+            proc.cpu_percent()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+    time.sleep(0.1)
+
     processes = []
     for proc in psutil.process_iter(['pid', 'name', 'cpu_percent']):
         try:
@@ -116,7 +140,7 @@ def print_system_stats():
         except (psutil.NoSuchProcess, psutil.AccessDenied):
             pass
 
-    top_procs = sorted(processes, key=lambda x: x['cpu_percent'] or 0, reverse=True)[:5]
+    top_procs = heapq.nlargest(5, processes, key=lambda x: x['cpu_percent'] or 0)
     for proc in top_procs:
         print(f"  • PID {proc['pid']:5d}: {proc['name']:20s} ({proc['cpu_percent']:.1f}%)")
 
@@ -127,6 +151,9 @@ def monitor_loop(interval=10):
     print("Neiler-64 System Monitor")
     print("Press Ctrl+C to stop\n")
 
+    # Seed the CPU counter; each tick then reports usage since the last
+    psutil.cpu_percent(interval=None)
+
     try:
         while True:
             print_system_stats()
@@ -136,6 +163,9 @@ def monitor_loop(interval=10):
 
 if __name__ == "__main__":
     if len(sys.argv) > 1 and sys.argv[1] == "--once":
+        # A single sample needs a short window to measure against
+        psutil.cpu_percent(interval=None)
+        time.sleep(0.1)
         print_system_stats()
     else:
         monitor_loop()
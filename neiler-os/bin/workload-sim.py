@@ -5,10 +5,16 @@ Simulates realistic CPU and GPU workloads for the Neiler-64 system
 """
 
 import time
-import random
+import signal
 import threading
 import sys
-from datetime import datetime
+
+import numpy as np
+
+# Simulated instruction mix: MOV, ADD, SUB, LOAD, STORE, JMP, CALL
+_INSTR_CYCLES = np.array([2, 3, 3, 4, 4, 2, 5], dtype=np.int32)
+# Registers the simulated instructions write to
+_REG_NAMES = ('A', 'B', 'C', 'D')
 
 class NeilerCPU:
     """Simulates Neiler-8 CPU workload"""
@@ -20,25 +26,26 @@ class NeilerCPU:
         }
         self.cycles = 0
         self.instructions_executed = 0
+        self._rng = np.random.default_rng()
 
     def execute_instruction(self):
         """Simulate executing a single instruction"""
-        # Simulate various instruction types
-        instruction_types = ['MOV', 'ADD', 'SUB', 'LOAD', 'STORE', 'JMP', 'CALL']
-        instruction = random.choice(instruction_types)
-
-        # Simulate different cycle counts
-        cycles = {
-            'MOV': 2, 'ADD': 3, 'SUB': 3,
-            'LOAD': 4, 'STORE': 4, 'JMP': 2, 'CALL': 5
-        }
+        self.execute_batch(1)
+
+    def execute_batch(self, n=1000):
+        """Simulate executing n instructions at once"""
+        instrs = self._rng.integers(0, len(_INSTR_CYCLES), n)
+        regs = self._rng.integers(0, len(_REG_NAMES), n)
+        vals = self._rng.integers(0, 256, n)
 
-        self.cycles += cycles.get(instruction, 2)
-        self.instructions_executed += 1
+        self.cycles += int(_INSTR_CYCLES[instrs].sum())
+        self.instructions_executed += n
 
-        # Update random register
-        reg = random.choice(['A', 'B', 'C', 'D'])
-        self.registers[reg] = random.randint(0, 255)
+        # Only the last write to each register is observable
+        for i, reg in enumerate(_REG_NAMES):
+            writes = np.flatnonzero(regs == i)
+            if writes.size:
+                self.registers[reg] = int(vals[writes[-1]])
 
     def get_stats(self):
         return {
@@ -55,28 +62,30 @@ class NeilerGPU:
         self.sprite_count = 64
         self.resolution = (640, 480)
         self.fps = 0
-        self.last_frame_time = time.time()
+        # Frames since the last get_stats(), for the average FPS
+        self._window_start = time.monotonic()
+        self._window_frames = 0
+        self._rng = np.random.default_rng()
 
     def render_frame(self):
         """Simulate rendering a frame"""
-        # Simulate sprite rendering
-        for sprite in range(self.sprite_count):
-            # Simulate sprite calculations
-            x = random.randint(0, self.resolution[0])
-            y = random.randint(0, self.resolution[1])
+        # Simulate sprite calculations: all sprite positions at once
+        coords = self._rng.integers(0, self.resolution, endpoint=True,
+                                    size=(self.sprite_count, 2))
 
         # Simulate pixel fill
-        pixels_drawn = random.randint(10000, 50000)
+        pixels_drawn = self._rng.integers(10000, 50000, endpoint=True)
 
         self.frame_count += 1
-
-        # Calculate FPS
-        current_time = time.time()
-        if current_time - self.last_frame_time > 0:
-            self.fps = 1.0 / (current_time - self.last_frame_time)
-        self.last_frame_time = current_time
+        self._window_frames += 1
 
     def get_stats(self):
+        # Average FPS since the previous call
+        now = time.monotonic()
+        self.fps = self._window_frames / max(now - self._window_start, 1e-9)
+        self._window_start = now
+        self._window_frames = 0
+
         return {
             'frames': self.frame_count,
             'fps': self.fps,
@@ -86,24 +95,38 @@ class NeilerGPU:
 class WorkloadSimulator:
     """Main workload simulator"""
 
+    _HDR = "=" * 60
+
     def __init__(self):
         self.cpu = NeilerCPU()
         self.gpu = NeilerGPU()
         self.running = True
         self.start_time = time.time()
 
+    def _run_every(self, period, tick):
+        """Call tick() every period seconds until stopped
+
+        Sleeps until the next deadline rather than a fixed period, so the
+        time tick() takes doesn't slow the rate down. If a tick overruns,
+        the schedule restarts from now instead of rushing to catch up.
+        """
+        next_tick = time.monotonic()
+        while self.running:
+            tick()
+            next_tick += period
+            sleep_for = next_tick - time.monotonic()
+            if sleep_for > 0:
+                time.sleep(sleep_for)
+            else:
+                next_tick = time.monotonic()
+
     def cpu_workload(self):
         """CPU workload thread"""
-        while self.running:
-            for _ in range(1000):
-                self.cpu.execute_instruction()
-            time.sleep(0.01)  # 10ms delay
+        self._run_every(0.01, lambda: self.cpu.execute_batch(1000))  # 10ms ticks
 
     def gpu_workload(self):
         """GPU workload thread"""
-        while self.running:
-            self.gpu.render_frame()
-            time.sleep(1/60)  # Target 60 FPS
+        self._run_every(1/60, self.gpu.render_frame)  # Target 60 FPS
 
     def print_stats(self):
         """Print workload statistics"""
@@ -114,21 +137,24 @@ class WorkloadSimulator:
             gpu_stats = self.gpu.get_stats()
             uptime = time.time() - self.start_time
 
-            print(f"\n{'='*60}")
-            print(f"Neiler-64 Workload Statistics - {datetime.now().strftime('%H:%M:%S')}")
-            print(f"{'='*60}")
-            print(f"Uptime: {int(uptime)}s")
-            print(f"\nCPU (Neiler-8):")
-            print(f"  • Instructions: {cpu_stats['instructions']:,}")
-            print(f"  • Cycles: {cpu_stats['cycles']:,}")
-            print(f"  • IPS: {cpu_stats['ips']:.2f}")
-            print(f"  • Registers: A={self.cpu.registers['A']:02X} B={self.cpu.registers['B']:02X} C={self.cpu.registers['C']:02X}")
-            print(f"\nGPU (NeilerGPU):")
-            print(f"  • Frames: {gpu_stats['frames']:,}")
-            print(f"  • FPS: {gpu_stats['fps']:.1f}")
-            print(f"  • Sprites: {gpu_stats['sprites']}")
-            print(f"  • Resolution: {self.gpu.resolution[0]}x{self.gpu.resolution[1]}")
-            print(f"{'='*60}")
+            sys.stdout.write(
+                f"\n{self._HDR}\n"
+                f"Neiler-64 Workload Statistics - {time.strftime('%H:%M:%S')}\n"
+                f"{self._HDR}\n"
+                f"Uptime: {int(uptime)}s\n"
+                f"\nCPU (Neiler-8):\n"
+                f"  • Instructions: {cpu_stats['instructions']:,}\n"
+                f"  • Cycles: {cpu_stats['cycles']:,}\n"
+                f"  • IPS: {cpu_stats['ips']:.2f}\n"
+                f"  • Registers: A={self.cpu.registers['A']:02X} B={self.cpu.registers['B']:02X} C={self.cpu.registers['C']:02X}\n"
+                f"\nGPU (NeilerGPU):\n"
+                f"  • Frames: {gpu_stats['frames']:,}\n"
+                f"  • FPS: {gpu_stats['fps']:.1f}\n"
+                f"  • Sprites: {gpu_stats['sprites']}\n"
+                f"  • Resolution: {self.gpu.resolution[0]}x{self.gpu.resolution[1]}\n"
+                f"{self._HDR}\n"
+            )
+            sys.stdout.flush()
 
     def run(self):
         """Start the simulator"""
@@ -144,14 +170,16 @@ class WorkloadSimulator:
         gpu_thread.start()
         stats_thread.start()
 
-        try:
-            while True:
-                time.sleep(1)
-        except KeyboardInterrupt:
-            print("\n\nStopping simulator...")
-            self.running = False
-            time.sleep(1)
-            print("Simulator stopped.")
+        # Sleep until Ctrl+C or SIGTERM instead of waking every second
+        stop = threading.Event()
+        signal.signal(signal.SIGINT, lambda *_: stop.set())
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+        stop.wait()
+
+        print("\n\nStopping simulator...")
+        self.running = False
+        time.sleep(1)
+        print("Simulator stopped.")
 
 if __name__ == "__main__":
     start_time = time.time()
@@ -14,33 +14,51 @@ Features:
 import os
 import sys
 import time
+import heapq
+import itertools
+import shlex
 import signal
 import subprocess
 import threading
 import json
+import atexit
 import logging
+import logging.handlers
+import queue
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from dataclasses import dataclass, field
-from typing import Dict, List, Set, Optional
+from typing import Dict, List, Optional
 from enum import Enum
 
 # Configuration
 SERVICE_DIR = Path("/etc/neiler/services")
 RUNTIME_DIR = Path("/run/neiler")
 LOG_DIR = Path("/var/log/neiler")
+CACHE_DIR = Path("/var/cache/neiler")
+
+# Parsed service definitions, reused while the .service files are unchanged
+SERVICE_CACHE = CACHE_DIR / "services.cache.json"
 
 # Ensure directories exist
 RUNTIME_DIR.mkdir(parents=True, exist_ok=True)
 LOG_DIR.mkdir(parents=True, exist_ok=True)
-
-# Logging setup
+CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+# Logging setup: records are formatted by the calling thread and
+# written to the file and stdout by a background listener thread
+_log_queue = queue.SimpleQueue()
+log_listener = logging.handlers.QueueListener(
+    _log_queue,
+    logging.FileHandler(LOG_DIR / "init.log"),
+    logging.StreamHandler(sys.stdout)
+)
+log_listener.start()
+atexit.register(log_listener.stop)
 logging.basicConfig(
     level=logging.INFO,
     format='[%(asctime)s] %(levelname)s: %(message)s',
-    handlers=[
-        logging.FileHandler(LOG_DIR / "init.log"),
-        logging.StreamHandler(sys.stdout)
-    ]
+    handlers=[logging.handlers.QueueHandler(_log_queue)]
 )
 logger = logging.getLogger("neiler-init")
 
@@ -61,6 +79,7 @@ class Service:
     description: str = ""
     exec_start: str = ""
     exec_stop: Optional[str] = None
+    exec_argv: List[str] = field(default_factory=list)  # exec_start, split
     restart: str = "no"  # no, always, on-failure
     restart_delay: int = 5
     user: str = "root"
@@ -76,6 +95,12 @@ class Service:
     restart_count: int = 0
 
 
+# Service fields that come from the definition file (the rest is runtime state)
+DEFINITION_FIELDS = ('name', 'description', 'exec_start', 'exec_stop', 'exec_argv',
+                     'restart', 'restart_delay', 'user', 'group',
+                     'after', 'requires', 'wants', 'environment')
+
+
 class NeilerInit:
     """Neiler Init System (PID 1)"""
 
@@ -83,6 +108,21 @@ class NeilerInit:
         self.services: Dict[str, Service] = {}
         self.running = True
         self.shutdown_signal = None
+        # Set once shutdown completes; the main thread sleeps on it
+        self._shutdown = threading.Event()
+
+        # Pending restarts as (due time, sequence, service name), run by
+        # one scheduler thread
+        self._restarts: List[tuple] = []
+        self._restart_seq = itertools.count()
+        self._restart_cond = threading.Condition()
+
+        # Dependency order of all services, computed once they are loaded:
+        # _topo_order lists every service after its After/Requires, and
+        # _dep_mask[name] has the _topo_order index bits of name and all
+        # its transitive dependencies
+        self._topo_order: List[str] = []
+        self._dep_mask: Dict[str, int] = {}
 
         # Register signal handlers
         signal.signal(signal.SIGTERM, self.handle_signal)
@@ -98,13 +138,93 @@ class NeilerInit:
             logger.warning(f"Service directory {SERVICE_DIR} does not exist")
             return
 
-        for service_file in SERVICE_DIR.glob("*.service"):
-            try:
-                service = self.parse_service(service_file)
-                self.services[service.name] = service
-                logger.info(f"Loaded service: {service.name}")
-            except Exception as e:
-                logger.error(f"Failed to load {service_file}: {e}")
+        fingerprint = self._services_fingerprint()
+        services = self._load_service_cache(fingerprint)
+        if services is None:
+            services = []
+            for service_file in SERVICE_DIR.glob("*.service"):
+                try:
+                    services.append(self.parse_service(service_file))
+                except Exception as e:
+                    logger.error(f"Failed to load {service_file}: {e}")
+            self._save_service_cache(fingerprint, services)
+
+        for service in services:
+            self.services[service.name] = service
+            logger.info(f"Loaded service: {service.name}")
+
+        self._index_dependencies()
+
+    def _index_dependencies(self):
+        """Precompute the dependency order and closures of all services"""
+        deps = {name: [dep for dep in service.after + service.requires
+                       if dep in self.services]
+                for name, service in self.services.items()}
+
+        # Kahn's algorithm over After/Requires edges
+        in_degree = {name: len(set(d)) for name, d in deps.items()}
+        successors: Dict[str, List[str]] = {name: [] for name in deps}
+        for name, d in deps.items():
+            for dep in set(d):
+                successors[dep].append(name)
+        order = [name for name, degree in in_degree.items() if degree == 0]
+        for name in order:
+            for succ in successors[name]:
+                in_degree[succ] -= 1
+                if in_degree[succ] == 0:
+                    order.append(succ)
+
+        if len(order) < len(deps):
+            cyclic = sorted(name for name, degree in in_degree.items() if degree > 0)
+            logger.error(f"Dependency cycle between services: {', '.join(cyclic)}")
+            order.extend(cyclic)
+
+        index = {name: i for i, name in enumerate(order)}
+        masks: Dict[str, int] = {}
+        for name in order:
+            mask = 1 << index[name]
+            for dep in deps[name]:
+                mask |= masks.get(dep, 1 << index[dep])
+            masks[name] = mask
+
+        self._topo_order = order
+        self._dep_mask = masks
+
+    def _services_fingerprint(self) -> Dict[str, List[int]]:
+        """(mtime, size) of every service file, to validate the cache"""
+        fingerprint = {}
+        for path in SERVICE_DIR.glob("*.service"):
+            st = path.stat()
+            fingerprint[path.name] = [st.st_mtime_ns, st.st_size]
+        return fingerprint
+
+    def _load_service_cache(self, fingerprint: Dict[str, List[int]]) -> Optional[List[Service]]:
+        """Services from the cache, or None if it is missing or stale"""
+        try:
+            with open(SERVICE_CACHE) as f:
+                cached = json.load(f)
+            if (cached["fingerprint"] != fingerprint
+                    or cached["fields"] != list(DEFINITION_FIELDS)):
+                return None
+            return [Service(**definition) for definition in cached["services"]]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _save_service_cache(self, fingerprint: Dict[str, List[int]], services: List[Service]):
+        """Write parsed services to the cache (atomically)"""
+        cached = {
+            "fingerprint": fingerprint,
+            "fields": list(DEFINITION_FIELDS),
+            "services": [{name: getattr(service, name) for name in DEFINITION_FIELDS}
+                         for service in services]
+        }
+        tmp = SERVICE_CACHE.with_suffix(".tmp")
+        try:
+            with open(tmp, 'w') as f:
+                json.dump(cached, f)
+            os.replace(tmp, SERVICE_CACHE)
+        except OSError as e:
+            logger.warning(f"Could not write service cache: {e}")
 
     def parse_service(self, path: Path) -> Service:
         """Parse service definition file"""
@@ -131,6 +251,7 @@ class NeilerInit:
             description=config.get('Description', ''),
             exec_start=config.get('ExecStart', ''),
             exec_stop=config.get('ExecStop'),
+            exec_argv=shlex.split(config.get('ExecStart', '')),
             restart=config.get('Restart', 'no'),
             user=config.get('User', 'root'),
             group=config.get('Group', 'root'),
@@ -141,28 +262,62 @@ class NeilerInit:
 
         return service
 
-    def resolve_dependencies(self, service_name: str, visited: Set[str] = None) -> List[str]:
-        """Resolve service dependencies (topological sort)"""
-        if visited is None:
-            visited = set()
+    def resolve_dependencies(self, service_name: str) -> List[str]:
+        """Resolve service dependencies (topological sort)
 
-        if service_name in visited:
+        Returns service_name and everything it depends on, dependencies
+        first, from the order precomputed by load_services.
+        """
+        mask = self._dep_mask.get(service_name)
+        if mask is None:
             return []
-
-        visited.add(service_name)
-        service = self.services.get(service_name)
-        if not service:
-            return []
-
-        order = []
-
-        # Process dependencies
-        for dep in service.after + service.requires:
-            if dep in self.services:
-                order.extend(self.resolve_dependencies(dep, visited))
-
-        order.append(service_name)
-        return order
+        return [name for i, name in enumerate(self._topo_order) if mask >> i & 1]
+
+    def _compute_levels(self, service_names: List[str]) -> List[List[str]]:
+        """Group service_names and everything they require into start levels
+
+        Each level only depends (After/Requires) on services in earlier
+        levels, so the services within a level can start in parallel.
+        """
+        # Targets plus their transitive requirements
+        wanted = set()
+        pending = [name for name in service_names if name in self.services]
+        while pending:
+            name = pending.pop()
+            if name not in wanted:
+                wanted.add(name)
+                pending.extend(dep for dep in self.services[name].requires
+                               if dep in self.services)
+
+        # Walk the precomputed order, so every dependency has its level
+        # before the services that need it (a dependency cycle was already
+        # reported by _index_dependencies; its members go wherever the
+        # order placed them)
+        level_of: Dict[str, int] = {}
+        levels: List[List[str]] = []
+        for name in self._topo_order:
+            if name not in wanted:
+                continue
+            service = self.services[name]
+            level = 1 + max((level_of[dep] for dep in service.after + service.requires
+                             if dep in level_of), default=-1)
+            level_of[name] = level
+            if level == len(levels):
+                levels.append([])
+            levels[level].append(name)
+
+        for level in levels:
+            level.sort()
+
+        return levels
+
+    def start_with_dependencies(self, service_name: str) -> bool:
+        """Start a service after any required service that is not running"""
+        started = False
+        for level in self._compute_levels([service_name]):
+            for name in level:
+                started = self.start_service(name)
+        return started
 
     def start_service(self, service_name: str) -> bool:
         """Start a service"""
@@ -175,13 +330,13 @@ class NeilerInit:
             logger.info(f"Service {service_name} already running")
             return True
 
-        # Check dependencies
+        # Required services are started first (see _compute_levels and
+        # start_with_dependencies)
         for dep in service.requires:
             dep_service = self.services.get(dep)
             if not dep_service or dep_service.state != ServiceState.RUNNING:
-                if not self.start_service(dep):
-                    logger.error(f"Failed to start required dependency {dep}")
-                    return False
+                logger.error(f"Required dependency {dep} of {service_name} is not running")
+                return False
 
         logger.info(f"Starting service: {service.description or service_name}")
         service.state = ServiceState.STARTING
@@ -191,27 +346,30 @@ class NeilerInit:
             env = os.environ.copy()
             env.update(service.environment)
 
-            # Start process
-            service.process = subprocess.Popen(
-                service.exec_start,
-                shell=True,
-                env=env,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                preexec_fn=self.drop_privileges(service.user, service.group)
-            )
+            # The service writes stdout and stderr straight to its log
+            log_fd = os.open(LOG_DIR / f"{service.name}.log",
+                             os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o640)
+
+            # Start process: exec directly (no /bin/sh in between) and
+            # without preexec_fn, so subprocess can use vfork. Descriptors
+            # opened by Python are close-on-exec already.
+            try:
+                service.process = subprocess.Popen(
+                    service.exec_argv or shlex.split(service.exec_start),
+                    env=env,
+                    stdout=log_fd,
+                    stderr=log_fd,
+                    close_fds=False,
+                    start_new_session=True,
+                    **self.drop_privileges(service.user, service.group)
+                )
+            finally:
+                os.close(log_fd)
 
             service.state = ServiceState.RUNNING
             service.start_time = time.time()
             logger.info(f"Service {service_name} started (PID: {service.process.pid})")
 
-            # Monitor output in background
-            threading.Thread(
-                target=self.monitor_service_output,
-                args=(service,),
-                daemon=True
-            ).start()
-
             return True
 
         except Exception as e:
@@ -231,7 +389,8 @@ class NeilerInit:
         try:
             if service.exec_stop:
                 # Use custom stop command
-                subprocess.run(service.exec_stop, shell=True, timeout=timeout)
+                subprocess.run(shlex.split(service.exec_stop), close_fds=False,
+                               timeout=timeout)
             elif service.process:
                 # Send SIGTERM
                 service.process.terminate()
@@ -252,18 +411,6 @@ class NeilerInit:
             logger.error(f"Failed to stop {service_name}: {e}")
             return False
 
-    def monitor_service_output(self, service: Service):
-        """Monitor service stdout/stderr"""
-        if not service.process:
-            return
-
-        log_file = LOG_DIR / f"{service.name}.log"
-
-        with open(log_file, 'a') as log:
-            for line in service.process.stdout:
-                log.write(line.decode('utf-8', errors='replace'))
-                log.flush()
-
     def handle_sigchld(self, signum, frame):
         """Handle child process termination"""
         while True:
@@ -297,25 +444,39 @@ class NeilerInit:
             service.restart_count += 1
 
             logger.info(f"Restarting {service.name} in {service.restart_delay} seconds...")
-
-            threading.Timer(
-                service.restart_delay,
-                self.start_service,
-                args=(service.name,)
-            ).start()
+            self.schedule_restart(service.name, service.restart_delay)
         else:
             service.state = ServiceState.FAILED if status != 0 else ServiceState.STOPPED
 
-    def drop_privileges(self, user: str, group: str):
-        """Return preexec_fn for dropping privileges"""
-        def set_ids():
-            if user != 'root':
-                import pwd
-                import grp
-                pw_record = pwd.getpwnam(user)
-                os.setgid(pw_record.pw_gid)
-                os.setuid(pw_record.pw_uid)
-        return set_ids
+    def schedule_restart(self, service_name: str, delay: float):
+        """Have the restart scheduler start service_name after delay seconds"""
+        with self._restart_cond:
+            heapq.heappush(self._restarts, (time.monotonic() + delay,
+                                            next(self._restart_seq), service_name))
+            self._restart_cond.notify()
+
+    def run_restart_scheduler(self):
+        """Start services as their restarts come due (scheduler thread)"""
+        while self.running:
+            with self._restart_cond:
+                while self.running:
+                    now = time.monotonic()
+                    if self._restarts and self._restarts[0][0] <= now:
+                        _, _, service_name = heapq.heappop(self._restarts)
+                        break
+                    timeout = self._restarts[0][0] - now if self._restarts else None
+                    self._restart_cond.wait(timeout)
+                else:
+                    return
+            self.start_with_dependencies(service_name)
+
+    def drop_privileges(self, user: str, group: str) -> Dict[str, int]:
+        """Return Popen arguments for dropping privileges"""
+        if user == 'root':
+            return {}
+        import pwd
+        pw_record = pwd.getpwnam(user)
+        return {'user': pw_record.pw_uid, 'group': pw_record.pw_gid}
 
     def handle_signal(self, signum, frame):
         """Handle shutdown signals"""
@@ -334,6 +495,9 @@ class NeilerInit:
 
         logger.info("All services stopped")
         self.running = False
+        with self._restart_cond:
+            self._restart_cond.notify()
+        self._shutdown.set()
 
     def run(self):
         """Main init loop"""
@@ -349,19 +513,21 @@ class NeilerInit:
             "workload-sim"
         ]
 
-        for service_name in default_services:
-            if service_name in self.services:
-                threading.Thread(
-                    target=self.start_service,
-                    args=(service_name,),
-                    daemon=True
-                ).start()
+        # One thread restarts services that exited
+        threading.Thread(target=self.run_restart_scheduler, daemon=True).start()
+
+        # Start level by level; services within a level start in parallel
+        levels = self._compute_levels(default_services)
+        if levels:
+            with ThreadPoolExecutor(max_workers=max(map(len, levels))) as pool:
+                for level in levels:
+                    list(pool.map(self.start_service, level))
 
         logger.info("Neiler-OS boot complete")
 
-        # Main loop (as PID 1, we must never exit)
-        while self.running:
-            time.sleep(1)
+        # As PID 1, we must never exit: block until a shutdown signal has
+        # been handled (signal handlers still run during the wait)
+        self._shutdown.wait()
 
         logger.info("Neiler Init exiting")
         sys.exit(0)